@@ -8,73 +8,140 @@ It uses pytest-cov for coverage analysis and custom metrics for test quality.
 
 import os
 import sys
+import io
 import json
+import contextlib
 import subprocess
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import argparse
 from datetime import datetime
 import re
 
+from consolidate import remove_tests
+from impact import ImpactMap, IMPACT_MAP_FILE, lines_by_test, purge_sources
+from profiling import span, profiled, profiling, DEFAULT_TOP
+
+JUNIT_XML_FILE = "junit.xml"
+DEFAULT_SLOWEST = 10
+# Tests running at least this long (seconds) are pruning candidates
+DEFAULT_SLOW_THRESHOLD = 1.0
+# Command that runs pytest in the project's environment
+DEFAULT_PYTEST_COMMAND = ("uv", "run", "pytest")
+
 
 class BenchmarkAnalyzer:
     """Analyzes test coverage and quality metrics."""
     
-    def __init__(self, project_path: str, test_path: str = "tests"):
+    def __init__(self, project_path: str, test_path: str = "tests", keep_output: bool = True,
+                 impact: bool = False, slowest: int = DEFAULT_SLOWEST, prune: bool = False,
+                 slow_threshold: float = DEFAULT_SLOW_THRESHOLD,
+                 pytest_command: Optional[List[str]] = None):
         self.project_path = Path(project_path)
         self.test_path = Path(test_path)
+        # When False, pytest stdout/stderr is discarded instead of being kept in the results
+        self.keep_output = keep_output
+        # When True, only tests impacted by source changes since the last run are executed
+        self.impact = impact
+        # Number of tests listed in the slowest-tests report
+        self.slowest = slowest
+        # When True, slow tests whose covered lines are all covered by other tests are deleted
+        self.prune = prune
+        self.slow_threshold = slow_threshold
+        self.pytest_command = list(pytest_command or DEFAULT_PYTEST_COMMAND)
+        # {node id: {"duration", "outcome"}} of the last run, from the JUnit XML report
+        self.test_durations: Dict[str, Dict[str, Any]] = {}
         self.results = {}
         
     def run_coverage_analysis(self, source_dir: str = "src") -> Dict[str, Any]:
         """Run pytest with coverage analysis."""
         print("🔍 Running coverage analysis...")
         
-        # Auto-detect source structure
-        source_path = self.project_path / source_dir
-        if (source_path / "calculator").exists():
-            # Structure: src/calculator/
-            cov_target = f"{source_dir}/calculator"
-        elif source_path.exists() and any(source_path.glob("*.py")):
-            # Structure: src/ with Python files
-            cov_target = source_dir
-        else:
-            # Fallback: try to find Python package
-            cov_target = "calculator"
-        
-        print(f"📦 Coverage target: {cov_target}")
+        cov_targets = self._coverage_targets(source_dir)
+        print(f"📦 Coverage target: {', '.join(cov_targets)}")
         
-        # Run pytest with coverage using uv
+        # Run pytest with coverage (through uv by default)
         cmd = [
-            "uv", "run",
-            "pytest", 
-            f"--cov={cov_target}",
+            *self.pytest_command,
+            *(f"--cov={cov_target}" for cov_target in cov_targets),
             "--cov-report=xml",
             "--cov-report=term-missing",
             "--cov-report=html",
+            f"--junitxml={JUNIT_XML_FILE}",
+            # Node ids (impact map, coverage contexts, JUnit) are relative to the
+            # project even when an ini file in a parent directory would move the rootdir
+            f"--rootdir={self.project_path.resolve()}",
             "-v"
         ]
+        if self.impact or self.prune:
+            # Per-test contexts: the impact map and pruning need the lines of each test
+            cmd.append("--cov-context=test")
+        
+        impact_selection = None
+        if self.impact:
+            impact_map = ImpactMap.load(self.project_path / IMPACT_MAP_FILE)
+            impact_selection = impact_map.select(self.project_path, [self.test_path])
+            if impact_selection is None:
+                print("🎯 No usable impact map, running the full suite")
+            elif not impact_selection["tests"]:
+                print("🎯 No tests impacted by changes, reusing previous coverage")
+                coverage_data = {"exit_code": 0, "success": True, "impacted_tests": []}
+                xml_report_path = self.project_path / "coverage.xml"
+                if xml_report_path.exists():
+                    coverage_data.update(self._parse_coverage_xml(xml_report_path))
+                # No test ran: durations are those of the previous run, if any
+                junit_report_path = self.project_path / JUNIT_XML_FILE
+                if junit_report_path.exists():
+                    coverage_data.update(self._parse_junit_xml(junit_report_path))
+                    coverage_data["durations_from_previous_run"] = True
+                if self.prune:
+                    coverage_data["pruning"] = {"error": "Skipped: no tests ran in this incremental run"}
+                return coverage_data
+            else:
+                print(f"🎯 Running {len(impact_selection['tests'])} impacted test(s)")
+                purge_sources(self.project_path / ".coverage", self.project_path,
+                              impact_selection["changed_sources"])
+                cmd.append("--cov-append")
+                cmd.extend(impact_selection["tests"])
         
         try:
-            result = subprocess.run(
-                cmd, 
-                cwd=self.project_path, 
-                capture_output=True, 
-                text=True,
-                timeout=300
-            )
+            if self.keep_output:
+                output_options = {"capture_output": True, "text": True}
+            else:
+                output_options = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+            
+            with span("pytest", tests=len(impact_selection["tests"]) if impact_selection else None):
+                result = subprocess.run(
+                    cmd, 
+                    cwd=self.project_path, 
+                    timeout=300,
+                    **output_options
+                )
             
             coverage_data = {
                 "exit_code": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
                 "success": result.returncode == 0
             }
+            if self.keep_output:
+                coverage_data["stdout"] = result.stdout
+                coverage_data["stderr"] = result.stderr
+            if impact_selection is not None:
+                coverage_data["impacted_tests"] = impact_selection["tests"]
+            if self.impact and result.returncode == 0:
+                # A map saved after failures would let the next run skip the failing tests
+                self._update_impact_map()
             
             # Parse XML coverage report if it exists
             xml_report_path = self.project_path / "coverage.xml"
             if xml_report_path.exists():
                 coverage_data.update(self._parse_coverage_xml(xml_report_path))
+            junit_report_path = self.project_path / JUNIT_XML_FILE
+            if junit_report_path.exists():
+                coverage_data.update(self._parse_junit_xml(junit_report_path))
+            if self.prune:
+                coverage_data["pruning"] = self.prune_slow_tests()
             
             return coverage_data
             
@@ -83,33 +150,70 @@ class BenchmarkAnalyzer:
         except Exception as e:
             return {"error": str(e), "success": False}
     
+    def _coverage_targets(self, source_dir: str) -> List[str]:
+        """
+        Auto-detect the source structure to measure.
+
+        - ``src/`` holding only packages (``src/pkg/__init__.py``): each package
+        - ``src/`` with modules of its own: ``src`` itself
+        - no source directory: the packages at the project root, else the root
+        """
+        source_path = self.project_path / source_dir
+        if source_path.is_dir():
+            packages = sorted(path for path in source_path.iterdir() if (path / "__init__.py").is_file())
+            modules = [path for path in source_path.glob("*.py") if path.name != "__init__.py"]
+            if packages and not modules:
+                return [f"{source_dir}/{path.name}" for path in packages]
+            return [source_dir]
+        
+        skipped = {self.test_path.name, "tests", "test", "docs", "build", "dist"}
+        packages = sorted(
+            path.name for path in self.project_path.iterdir()
+            if (path / "__init__.py").is_file() and path.name not in skipped and not path.name.startswith(".")
+        )
+        return packages or ["."]
+    
+    @profiled("impact_map")
+    def _update_impact_map(self) -> None:
+        """Rebuild the stored test impact map from the latest coverage contexts."""
+        data_file = self.project_path / ".coverage"
+        if not data_file.exists():
+            return
+        try:
+            impact_map = ImpactMap.from_coverage(self.project_path, data_file, [self.test_path])
+            impact_map.save(self.project_path / IMPACT_MAP_FILE)
+        except Exception as e:
+            print(f"⚠️ Could not update impact map: {e}")
+    
+    @profiled("coverage_xml")
     def _parse_coverage_xml(self, xml_path: Path) -> Dict[str, Any]:
-        """Parse coverage XML report."""
+        """
+        Parse coverage XML report incrementally.
+
+        The report is streamed with ``iterparse`` and every ``class`` and
+        ``package`` element is cleared as soon as its rates are aggregated,
+        so memory stays flat regardless of the number of measured files.
+        """
+        line_rate = branch_rate = 0
+        files_coverage = []
+        
         try:
-            tree = ET.parse(xml_path)
-            root = tree.getroot()
-            
-            # Extract overall coverage
-            coverage_elem = root.find('.//coverage')
-            if coverage_elem is not None:
-                line_rate = float(coverage_elem.get('line-rate', 0)) * 100
-                branch_rate = float(coverage_elem.get('branch-rate', 0)) * 100
-            else:
-                line_rate = branch_rate = 0
-            
-            # Extract file-level coverage
-            files_coverage = []
-            for package in root.findall('.//package'):
-                for cls in package.findall('.//class'):
-                    filename = cls.get('filename', '')
-                    line_rate_file = float(cls.get('line-rate', 0)) * 100
-                    branch_rate_file = float(cls.get('branch-rate', 0)) * 100
-                    
+            for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == "coverage":
+                        line_rate = float(elem.get('line-rate', 0)) * 100
+                        branch_rate = float(elem.get('branch-rate', 0)) * 100
+                    continue
+                
+                if elem.tag == "class":
                     files_coverage.append({
-                        'filename': filename,
-                        'line_coverage': line_rate_file,
-                        'branch_coverage': branch_rate_file
+                        'filename': elem.get('filename', ''),
+                        'line_coverage': float(elem.get('line-rate', 0)) * 100,
+                        'branch_coverage': float(elem.get('branch-rate', 0)) * 100
                     })
+                    elem.clear()
+                elif elem.tag in ("package", "sources"):
+                    elem.clear()
             
             return {
                 'overall_line_coverage': line_rate,
@@ -120,6 +224,96 @@ class BenchmarkAnalyzer:
         except Exception as e:
             return {'xml_parse_error': str(e)}
     
+    @profiled("junit_xml")
+    def _parse_junit_xml(self, xml_path: Path) -> Dict[str, Any]:
+        """
+        Parse per-test durations from a JUnit XML report incrementally.
+
+        Like the coverage report, the file is streamed with ``iterparse`` and
+        each ``testcase`` element is cleared once its duration is recorded.
+        """
+        self.test_durations = {}
+        try:
+            for _, elem in ET.iterparse(xml_path):
+                if elem.tag != "testcase":
+                    continue
+                outcome = "passed"
+                for child in elem:
+                    if child.tag in ("failure", "error", "skipped"):
+                        outcome = "failed" if child.tag == "failure" else child.tag
+                node_id = self._junit_node_id(elem.get('classname', ''), elem.get('name', ''))
+                self.test_durations[node_id] = {
+                    'duration': float(elem.get('time', 0) or 0),
+                    'outcome': outcome
+                }
+                elem.clear()
+        except Exception as e:
+            return {'junit_parse_error': str(e)}
+        
+        ranked = sorted(self.test_durations.items(), key=lambda item: -item[1]['duration'])
+        return {
+            'tests_timed': len(ranked),
+            'test_seconds': round(sum(test['duration'] for _, test in ranked), 3),
+            'slowest_tests': [{'test': node_id, **test} for node_id, test in ranked[:self.slowest]]
+        }
+    
+    def _junit_node_id(self, classname: str, name: str) -> str:
+        """Turn a JUnit ``classname`` (``tests.test_a.TestA``) and test name into a pytest node id."""
+        parts = classname.split(".") if classname else []
+        # The longest dotted prefix naming an existing file is the module
+        for end in range(len(parts), 0, -1):
+            module = "/".join(parts[:end]) + ".py"
+            if (self.project_path / module).exists():
+                return "::".join([module, *parts[end:], name])
+        return "::".join([*parts, name])
+    
+    @profiled("prune")
+    def prune_slow_tests(self) -> Dict[str, Any]:
+        """
+        Delete slow tests whose coverage is fully redundant.
+
+        Tests that passed and ran for at least ``slow_threshold`` seconds are
+        visited slowest first; one is deleted when every line it executes is
+        also executed by some other test still kept, so line coverage does
+        not drop. Needs the per-test contexts of the last coverage run.
+        """
+        data_file = self.project_path / ".coverage"
+        if not data_file.exists() or not self.test_durations:
+            return {"error": "No per-test coverage or durations to prune with"}
+        try:
+            lines = lines_by_test(self.project_path, data_file)
+        except Exception as e:
+            return {"error": f"Could not read per-test coverage: {e}"}
+        
+        # How many kept tests execute each line
+        counts: Dict[Any, int] = {}
+        for covered in lines.values():
+            for line in covered:
+                counts[line] = counts.get(line, 0) + 1
+        
+        candidates = sorted(
+            (node_id for node_id, test in self.test_durations.items()
+             if test['outcome'] == "passed" and test['duration'] >= self.slow_threshold
+             and node_id in lines and "[" not in node_id),
+            key=lambda node_id: -self.test_durations[node_id]['duration']
+        )
+        pruned = []
+        for node_id in candidates:
+            if all(counts[line] > 1 for line in lines[node_id]):
+                for line in lines[node_id]:
+                    counts[line] -= 1
+                pruned.append(node_id)
+        
+        removed = remove_tests(str(self.project_path), pruned) if pruned else 0
+        if removed:
+            print(f"✂️ Pruned {removed} slow test(s) with redundant coverage")
+        return {
+            "pruned_tests": pruned,
+            "removed": removed,
+            "seconds_saved": round(sum(self.test_durations[node_id]['duration'] for node_id in pruned), 3)
+        }
+    
+    @profiled("test_quality")
     def analyze_test_quality(self) -> Dict[str, Any]:
         """Analyze test quality metrics."""
         print("📊 Analyzing test quality...")
@@ -189,6 +383,7 @@ class BenchmarkAnalyzer:
                 'has_docstrings': False
             }
     
+    @profiled("quality_score")
     def calculate_quality_score(self, coverage_data: Dict, quality_data: Dict) -> Dict[str, Any]:
         """Calculate overall quality score."""
         print("🎯 Calculating quality scores...")
@@ -219,16 +414,22 @@ class BenchmarkAnalyzer:
             best_practices * 0.2
         )
         
+        # Efficiency: line coverage bought per second of test runtime (not part of the overall score)
+        test_seconds = coverage_data.get('test_seconds')
+        coverage_per_second = coverage_score / test_seconds if test_seconds else None
+        
         return {
             'overall_score': round(overall_score, 2),
             'coverage_score': round(coverage_score, 2),
             'test_density_score': round(test_density, 2),
             'assertion_quality_score': round(assertion_quality, 2),
             'best_practices_score': round(best_practices, 2),
+            'coverage_per_second': round(coverage_per_second, 2) if coverage_per_second is not None else None,
             'grade': self._get_grade(overall_score)
         }
     
-    def _get_grade(self, score: float) -> str:
+    @staticmethod
+    def _get_grade(score: float) -> str:
         """Convert score to letter grade."""
         if score >= 90:
             return "A"
@@ -241,11 +442,11 @@ class BenchmarkAnalyzer:
         else:
             return "F"
     
-    def generate_report(self, output_file: Optional[str] = None) -> str:
+    def generate_report(self, output_file: Optional[str] = None, source_dir: str = "src") -> str:
         """Generate comprehensive report."""
         print("📋 Generating report...")
         
-        coverage_data = self.run_coverage_analysis()
+        coverage_data = self.run_coverage_analysis(source_dir)
         quality_data = self.analyze_test_quality()
         scores = self.calculate_quality_score(coverage_data, quality_data)
         
@@ -277,12 +478,31 @@ Project: {self.project_path.name}
 - Assertion Quality Score: {scores['assertion_quality_score']}/100
 - Best Practices Score: {scores['best_practices_score']}/100
 
+### Test Runtime{' (previous run)' if coverage_data.get('durations_from_previous_run') else ''}
+- Timed Tests: {coverage_data.get('tests_timed', 0)}
+- Total Test Time: {coverage_data.get('test_seconds', 0):.2f}s
+- Coverage per Second: {scores['coverage_per_second'] if scores['coverage_per_second'] is not None else 'n/a'}
+
 ### File-by-File Coverage"""
 
         if 'files_coverage' in coverage_data:
             for file_cov in coverage_data['files_coverage']:
                 report += f"\n- {file_cov['filename']}: {file_cov['line_coverage']:.1f}% lines"
 
+        report += "\n\n### Slowest Tests"
+        for test in coverage_data.get('slowest_tests', []):
+            report += f"\n- {test['test']}: {test['duration']:.3f}s ({test['outcome']})"
+
+        pruning = coverage_data.get('pruning')
+        if pruning:
+            report += "\n\n### Pruned Tests"
+            if 'error' in pruning:
+                report += f"\n- ⚠️ {pruning['error']}"
+            else:
+                report += f"\n- Removed {pruning['removed']} test(s), saving {pruning['seconds_saved']:.2f}s per run"
+                for node_id in pruning['pruned_tests']:
+                    report += f"\n- {node_id}"
+
         report += "\n\n### Test Files Analysis"
         for file_analysis in quality_data['files_analysis']:
             report += f"\n- {Path(file_analysis['filename']).name}:"
@@ -302,6 +522,137 @@ Project: {self.project_path.name}
         return report
 
 
+def load_manifest(manifest_path: str) -> List[Dict[str, str]]:
+    """
+    Load the projects of a benchmark manifest.
+
+    The manifest is a JSON list (or an object with a ``projects`` list) whose
+    entries are project paths or objects with ``project`` and optional
+    ``name``, ``tests`` and ``source`` keys. Relative paths are resolved
+    from the manifest's directory; ``tests`` is relative to its project.
+
+    Returns:
+        Entries with every key filled in
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("projects", [])
+    
+    base = Path(manifest_path).resolve().parent
+    entries = []
+    for item in data:
+        if isinstance(item, str):
+            item = {"project": item}
+        project = base / item["project"]
+        entries.append({
+            "name": item.get("name") or project.name,
+            "project": str(project),
+            "tests": str(project / item.get("tests", "tests")),
+            "source": item.get("source", "src"),
+        })
+    return entries
+
+
+def benchmark_project(entry: Dict[str, str], options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the coverage and quality analysis of one manifest project.
+
+    Runs in a worker process; the analyzer's progress output is dropped so
+    the projects running concurrently do not interleave on the console.
+
+    Args:
+        entry: Manifest entry (see ``load_manifest``)
+        options: Keyword arguments for ``BenchmarkAnalyzer``
+
+    Returns:
+        The entry with its coverage, quality and scores, or an "error"
+    """
+    result: Dict[str, Any] = dict(entry)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer = BenchmarkAnalyzer(entry["project"], entry["tests"], **options)
+            coverage_data = analyzer.run_coverage_analysis(entry["source"])
+            quality_data = analyzer.analyze_test_quality()
+            scores = analyzer.calculate_quality_score(coverage_data, quality_data)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    result.update({"coverage": coverage_data, "quality": quality_data, "scores": scores})
+    return result
+
+
+def run_manifest(entries: List[Dict[str, str]], jobs: Optional[int] = None,
+                 options: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Benchmark several projects concurrently in a bounded process pool.
+
+    Args:
+        entries: Manifest entries
+        jobs: Maximum number of projects analyzed at once (default: CPU count)
+        options: Keyword arguments for every ``BenchmarkAnalyzer``
+
+    Returns:
+        Results in manifest order
+    """
+    if not entries:
+        return []
+    workers = max(min(jobs or os.cpu_count() or 1, len(entries)), 1)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(entries)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(benchmark_project, entry, options or {}): index
+                   for index, entry in enumerate(entries)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # The worker process itself died
+                result = {**entries[index], "error": str(e)}
+            results[index] = result
+            if "error" in result:
+                print(f"❌ {result['name']}: {result['error']}")
+            else:
+                print(f"✅ {result['name']}: {result['scores']['overall_score']}/100 "
+                      f"(Grade: {result['scores']['grade']})")
+    return results
+
+
+def combined_report(results: List[Dict[str, Any]]) -> str:
+    """Render the results of a manifest run as one report."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    succeeded = [result for result in results if "error" not in result]
+    
+    report = f"""
+# Combined Test Quality and Coverage Benchmark Report
+Generated: {timestamp}
+Projects: {len(results)} ({len(results) - len(succeeded)} failed)
+"""
+    if succeeded:
+        average = sum(result['scores']['overall_score'] for result in succeeded) / len(succeeded)
+        line_coverage = sum(result['coverage'].get('overall_line_coverage', 0) for result in succeeded) / len(succeeded)
+        test_seconds = sum(result['coverage'].get('test_seconds', 0) for result in succeeded)
+        report += f"""
+## Average Quality Score: {average:.2f}/100 (Grade: {BenchmarkAnalyzer._get_grade(average)})
+- Average Line Coverage: {line_coverage:.2f}%
+- Total Test Time: {test_seconds:.2f}s
+"""
+
+    report += "\n### Projects\n"
+    report += "\n| Project | Score | Grade | Line Cov. | Branch Cov. | Tests | Test Time | Cov./s |"
+    report += "\n|---|---|---|---|---|---|---|---|"
+    for result in results:
+        if "error" in result:
+            report += f"\n| {result['name']} | ❌ {result['error']} | | | | | | |"
+            continue
+        coverage, quality, scores = result['coverage'], result['quality'], result['scores']
+        status = "" if coverage.get('success') else " ❌"
+        per_second = scores['coverage_per_second'] if scores['coverage_per_second'] is not None else "n/a"
+        report += (f"\n| {result['name']}{status} | {scores['overall_score']} | {scores['grade']} "
+                   f"| {coverage.get('overall_line_coverage', 0):.2f}% | {coverage.get('overall_branch_coverage', 0):.2f}% "
+                   f"| {quality['test_methods_count']} | {coverage.get('test_seconds', 0):.2f}s | {per_second} |")
+    return report
+
+
 def main():
     """Main function with CLI interface."""
     parser = argparse.ArgumentParser(description="Test Quality and Coverage Benchmark")
@@ -310,15 +661,45 @@ def main():
     parser.add_argument("--source", "-s", default="src", help="Source code directory")
     parser.add_argument("--output", "-o", help="Output report file")
     parser.add_argument("--json", action="store_true", help="Output results as JSON")
+    parser.add_argument("--no-pytest-output", action="store_true",
+                        help="Leave raw pytest stdout/stderr out of the results")
+    parser.add_argument("--impact", action="store_true",
+                        help="Only run tests impacted by source changes since the last run")
+    parser.add_argument("--slowest", type=int, default=DEFAULT_SLOWEST, metavar="N",
+                        help=f"Tests listed in the slowest-tests report (default: {DEFAULT_SLOWEST})")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete slow tests whose covered lines are all covered by other tests")
+    parser.add_argument("--slow-threshold", type=float, default=DEFAULT_SLOW_THRESHOLD, metavar="SECONDS",
+                        help=f"Minimum duration of a test pruned by --prune (default: {DEFAULT_SLOW_THRESHOLD})")
+    parser.add_argument("--manifest", metavar="PATH",
+                        help="JSON list of projects to benchmark concurrently into one combined report")
+    parser.add_argument("--jobs", "-j", type=int, metavar="N",
+                        help="Projects analyzed at once with --manifest (default: CPU count)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Profile the run: Chrome trace of the stages (.json) or cProfile dump (.prof)")
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_TOP,
+                        help=f"Entries in the printed profile summary (default: {DEFAULT_TOP})")
     
     args = parser.parse_args()
+    with profiling(args.profile, args.profile_top):
+        run(args)
+
+
+def run(args: argparse.Namespace) -> None:
+    """Run the benchmark selected on the command line."""
+    
+    if args.manifest:
+        run_manifest_report(args)
+        return
     
     print("🚀 Starting Test Quality and Coverage Benchmark")
     print(f"📁 Project: {args.project}")
     print(f"🧪 Tests: {args.tests}")
     print(f"💻 Source: {args.source}")
     
-    analyzer = BenchmarkAnalyzer(args.project, args.tests)
+    analyzer = BenchmarkAnalyzer(args.project, args.tests, keep_output=not args.no_pytest_output,
+                                 impact=args.impact, slowest=args.slowest, prune=args.prune,
+                                 slow_threshold=args.slow_threshold)
     
     if args.json:
         # Generate JSON output
@@ -341,11 +722,34 @@ def main():
             print(output)
     else:
         # Generate text report
-        report = analyzer.generate_report(args.output)
+        report = analyzer.generate_report(args.output, args.source)
         if not args.output:
             print("\n" + "="*60)
             print(report)
 
 
+
+def run_manifest_report(args: argparse.Namespace) -> None:
+    """Benchmark every project of the manifest and output the combined results."""
+    entries = load_manifest(args.manifest)
+    print(f"🚀 Benchmarking {len(entries)} project(s) from {args.manifest}")
+    
+    options = {"keep_output": not args.no_pytest_output, "impact": args.impact, "slowest": args.slowest,
+               "prune": args.prune, "slow_threshold": args.slow_threshold}
+    results = run_manifest(entries, args.jobs, options)
+    
+    if args.json:
+        output = json.dumps({"timestamp": datetime.now().isoformat(), "projects": results}, indent=2)
+    else:
+        output = combined_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"📄 Report saved to: {args.output}")
+    else:
+        print("\n" + "="*60)
+        print(output)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
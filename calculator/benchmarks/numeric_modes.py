@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Numeric Mode Throughput Benchmark
+
+Compares the cost of the calculator's numeric backends (float, decimal,
+fraction) on bulk workloads, so each job can use the cheapest mode that is
+still correct for it. Reports operations per second and the slowdown
+relative to float mode, plus the accumulated error of a chained sum.
+"""
+
+import argparse
+import json
+import random
+import time
+from decimal import Context, Decimal
+from typing import Any, Dict, List
+
+from calculator import Calculator
+from calculator.numeric import MODES
+
+
+def make_operands(count: int, seed: int) -> List[tuple]:
+    """Generate reproducible operand pairs with up to 6 decimal places."""
+    rng = random.Random(seed)
+    return [(round(rng.uniform(-1000, 1000), 6), round(rng.uniform(1, 1000), 6)) for _ in range(count)]
+
+
+def time_operation(calculator: Calculator, name: str, operands: List[tuple]) -> float:
+    """Return operations per second for one Calculator method."""
+    method = getattr(calculator, name)
+    start = time.perf_counter()
+    for a, b in operands:
+        method(a, b)
+    return len(operands) / (time.perf_counter() - start)
+
+
+def chained_sum_error(mode: str, context: Context) -> str:
+    """Add 0.1 a million times and report the distance from the exact result."""
+    calculator = Calculator(mode=mode, context=context if mode == "decimal" else None)
+    total = calculator.numeric.convert(0)
+    step = calculator.numeric.convert(0.1)
+    add = calculator.numeric.add
+    for _ in range(1_000_000):
+        total = add(total, step)
+    return str(abs(Decimal(str(total)) - Decimal(100000)))
+
+
+def run(count: int, precision: int, seed: int) -> Dict[str, Any]:
+    operands = make_operands(count, seed)
+    # Small integral exponents keep power() representable in every mode
+    power_operands = [(a, int(b) % 5) for a, b in operands]
+    context = Context(prec=precision)
+
+    results = {}
+    for mode in MODES:
+        calculator = Calculator(mode=mode, context=context if mode == "decimal" else None)
+        rates = {
+            name: time_operation(calculator, name, operands)
+            for name in ("add", "subtract", "multiply", "divide")
+        }
+        rates["power"] = time_operation(calculator, "power", power_operands)
+
+        start = time.perf_counter()
+        calculator.evaluate_many("(a + b) * a / b", ({"a": a, "b": b} for a, b in operands))
+        rates["evaluate_many"] = count / (time.perf_counter() - start)
+
+        results[mode] = {name: round(rate) for name, rate in rates.items()}
+        results[mode]["chained_sum_error"] = chained_sum_error(mode, context)
+
+    for mode, rates in results.items():
+        rates["slowdown_vs_float"] = {
+            name: round(results["float"][name] / rate, 2)
+            for name, rate in rates.items() if isinstance(rate, int)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Numeric mode throughput benchmark")
+    parser.add_argument("--count", "-n", type=int, default=100_000, help="Operations per measurement")
+    parser.add_argument("--precision", type=int, default=28, help="Decimal context precision")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for operands")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.count, args.precision, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for mode, rates in results.items():
+        print(f"\n## {mode}")
+        for name, rate in rates.items():
+            if isinstance(rate, int):
+                print(f"- {name}: {rate:,} ops/s ({rates['slowdown_vs_float'][name]}x float)")
+        print(f"- chained sum error (0.1 x 1,000,000): {rates['chained_sum_error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+CLI Cold-Start Benchmark
+
+Measures how long the calculator CLI takes to start, using ``-X importtime``
+for a per-module import breakdown and wall-clock timing of complete
+``calc add`` invocations. Use ``--max-ms`` in CI to fail when the median
+cold start regresses past a budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into per-module timings (microseconds)."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return modules
+
+
+def measure_imports(module: str, env: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Import ``module`` in a fresh interpreter and return its import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure_cold_start(args: List[str], runs: int, env: Dict[str, str]) -> List[float]:
+    """Time complete CLI invocations in fresh interpreters (milliseconds)."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "calculator.main", *args],
+                       capture_output=True, env=env, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calculator CLI cold-start benchmark")
+    parser.add_argument("--runs", "-n", type=int, default=10, help="Number of timed invocations")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to report")
+    parser.add_argument("--max-ms", type=float, help="Fail if the median cold start exceeds this budget")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = {**os.environ, "CALC_HISTORY_FILE": os.path.join(tmpdir, "history.bin")}
+        fast_imports = measure_imports("calculator.main", env)
+        full_imports = measure_imports("calculator.cli", env)
+        fast_runs = measure_cold_start(["add", "1", "2"], args.runs, env)
+        full_runs = measure_cold_start(["history"], args.runs, env)
+
+    def total_ms(modules):
+        return sum(module["self_us"] for module in modules) / 1000
+
+    results = {
+        "fast_path": {
+            "import_ms": round(total_ms(fast_imports), 2),
+            "median_ms": round(statistics.median(fast_runs), 2),
+            "min_ms": round(min(fast_runs), 2),
+        },
+        "full_cli": {
+            "import_ms": round(total_ms(full_imports), 2),
+            "median_ms": round(statistics.median(full_runs), 2),
+            "min_ms": round(min(full_runs), 2),
+        },
+        "slowest_imports": sorted(full_imports, key=lambda m: m["self_us"], reverse=True)[:args.top],
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for label, key in (("Fast path (calc add 1 2)", "fast_path"), ("Full CLI (calc history)", "full_cli")):
+            data = results[key]
+            print(f"{label}: median {data['median_ms']} ms, min {data['min_ms']} ms, "
+                  f"imports {data['import_ms']} ms")
+        print("\nSlowest imports of the full CLI:")
+        for module in results["slowest_imports"]:
+            print(f"- {module['module']}: {module['self_us'] / 1000:.2f} ms")
+
+    if args.max_ms is not None and results["fast_path"]["median_ms"] > args.max_ms:
+        print(f"❌ Median cold start {results['fast_path']['median_ms']} ms exceeds budget of {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
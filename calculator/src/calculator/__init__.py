@@ -1,4 +1,12 @@
 from .calculator import Calculator
-from .cli import app
 
-__all__ = ["Calculator", "app"]
\ No newline at end of file
+__all__ = ["Calculator", "app"]
+
+
+def __getattr__(name):
+    # The Typer app loads Typer, Rich and every command, so it is only
+    # imported when something actually asks for it
+    if name == "app":
+        from .cli import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,39 +1,219 @@
-from typing import Union
+from collections.abc import Iterable, Mapping
+from itertools import repeat
+from decimal import Context
+from typing import Any, Iterator, Literal, Optional, Union
+
+from .expression import compile_expression
+from .history import ADD, BATCH, DIVIDE, EXPRESSION, MULTIPLY, POWER, SUBTRACT, HistoryLog
+from .numeric import get_backend
+
+_UNLOADED = object()
+# NumPy is optional and only imported by the first batch operation, so that
+# plain arithmetic does not pay for loading it
+np = _UNLOADED
+
+
+def _numpy():
+    global np
+    if np is _UNLOADED:
+        try:
+            import numpy
+        except ImportError:  # Batch operations fall back to lists
+            numpy = None
+        np = numpy
+    return np
+
+Operands = Union[int, float, Iterable[Union[int, float]], Any]
+
+_INT64_MAX = 2 ** 63 - 1
 
 
 class Calculator:
-    def __init__(self):
-        self.history = []
+    """Calculator with history.
+    
+    ``mode`` selects the numeric backend: ``"float"`` (native numbers, the
+    fastest), ``"decimal"`` (``decimal.Decimal`` in ``context``, 28 digits by
+    default) or ``"fraction"`` (exact rationals). The history log stores
+    Decimal and Fraction values as their nearest float.
+    """
+    
+    def __init__(self, history: Optional[HistoryLog] = None, mode: str = "float",
+                 context: Optional[Context] = None):
+        self.history = history if history is not None else HistoryLog()
+        self.numeric = get_backend(mode, context)
     
     def add(self, a: Union[int, float], b: Union[int, float]) -> Union[int, float]:
-        result = a + b
-        self.history.append(f"{a} + {b} = {result}")
+        result = self.numeric.add(a, b)
+        self.history.append(ADD, a, b, result)
         return result
     
     def subtract(self, a: Union[int, float], b: Union[int, float]) -> Union[int, float]:
-        result = a - b
-        self.history.append(f"{a} - {b} = {result}")
+        result = self.numeric.subtract(a, b)
+        self.history.append(SUBTRACT, a, b, result)
         return result
     
     def multiply(self, a: Union[int, float], b: Union[int, float]) -> Union[int, float]:
-        result = a * b
-        self.history.append(f"{a} * {b} = {result}")
+        result = self.numeric.multiply(a, b)
+        self.history.append(MULTIPLY, a, b, result)
         return result
     
     def divide(self, a: Union[int, float], b: Union[int, float]) -> Union[int, float]:
-        if b == 0:
-            raise ValueError("Cannot divide by zero")
-        result = a / b
-        self.history.append(f"{a} / {b} = {result}")
+        result = self.numeric.divide(a, b)
+        self.history.append(DIVIDE, a, b, result)
         return result
     
     def power(self, a: Union[int, float], b: Union[int, float]) -> Union[int, float]:
-        result = a ** b
-        self.history.append(f"{a} ^ {b} = {result}")
+        result = self.numeric.power(a, b)
+        self.history.append(POWER, a, b, result)
+        return result
+    
+    def evaluate(self, expression: str, **variables: Union[int, float]) -> Union[int, float]:
+        """Evaluate an infix expression such as ``(a+b)^c/d``.
+        
+        The compiled form is cached by expression text, and every binary
+        operation is recorded in the history just like calling the methods.
+        """
+        compiled = compile_expression(expression)
+        return compiled.evaluate_with(self, variables, self._constants(compiled))
+    
+    def evaluate_many(self, expression: str, bindings: Iterable[Mapping[str, Any]]) -> list:
+        """Evaluate one expression for many variable bindings.
+        
+        Operations are applied directly and a single summary entry is recorded.
+        """
+        compiled = compile_expression(expression)
+        if self.numeric.native:
+            results = [compiled(variables) for variables in bindings]
+        else:
+            constants = self._constants(compiled)
+            results = [compiled.evaluate_with(self.numeric, variables, constants) for variables in bindings]
+        self.history.append(EXPRESSION | BATCH, len(results), 0, 0)
+        return results
+    
+    def _constants(self, compiled) -> Optional[tuple]:
+        if self.numeric.native:
+            return None
+        return tuple(map(self.numeric.convert, compiled.constants))
+    
+    def add_batch(self, a: Operands, b: Operands) -> Any:
+        return self._batch(ADD, self.numeric.add, a, b)
+    
+    def subtract_batch(self, a: Operands, b: Operands) -> Any:
+        return self._batch(SUBTRACT, self.numeric.subtract, a, b)
+    
+    def multiply_batch(self, a: Operands, b: Operands) -> Any:
+        return self._batch(MULTIPLY, self.numeric.multiply, a, b)
+    
+    def divide_batch(self, a: Operands, b: Operands, on_zero: Literal["raise", "mask"] = "raise") -> Any:
+        """Divide element-wise.
+        
+        With ``on_zero="raise"`` any zero divisor raises ValueError before
+        anything is recorded; with ``"mask"`` those elements are masked
+        (``numpy.ma.MaskedArray``, or None entries without NumPy).
+        """
+        if on_zero not in ("raise", "mask"):
+            raise ValueError("on_zero must be 'raise' or 'mask'")
+        
+        np = self._vectorizer()
+        if np is not None:
+            a_arr, b_arr = np.asarray(a), np.asarray(b)
+            zero = b_arr == 0
+            masked = int(np.broadcast_to(zero, np.broadcast_shapes(a_arr.shape, b_arr.shape)).sum())
+            if masked and on_zero == "raise":
+                raise ValueError("Cannot divide by zero")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result = np.true_divide(a_arr, b_arr)
+            if on_zero == "mask":
+                result = np.ma.masked_array(result, mask=np.broadcast_to(zero, result.shape))
+        else:
+            a_vals, b_vals = self._pair(a, b)
+            if on_zero == "raise" and 0 in b_vals:
+                raise ValueError("Cannot divide by zero")
+            divide = self.numeric.divide
+            result = [divide(x, y) if y != 0 else None for x, y in zip(a_vals, b_vals)]
+            masked = result.count(None)
+        
+        self.history.append(DIVIDE | BATCH, self._size(result), masked, 0)
+        return result
+    
+    def power_batch(self, a: Operands, b: Operands) -> Any:
+        np = self._vectorizer()
+        if np is not None:
+            a_arr, b_arr = np.asarray(a), np.asarray(b)
+            if np.issubdtype(np.result_type(a_arr, b_arr), np.integer):
+                # Integer powers would wrap around or reject negative exponents
+                result = np.float_power(a_arr, b_arr)
+            else:
+                result = np.power(a_arr, b_arr)
+            self.history.append(POWER | BATCH, result.size, 0, 0)
+            return result
+        return self._batch(POWER, self.numeric.power, a, b)
+    
+    def _batch(self, code: int, func, a: Operands, b: Operands) -> Any:
+        """Apply ``func`` element-wise and record one summary entry.
+        
+        Inputs may be scalars, sequences or NumPy arrays and are broadcast
+        against each other. Returns a NumPy array (at least one-dimensional)
+        when NumPy is installed and the float mode is used, otherwise a list.
+        Integer results that could leave the int64 range are computed on
+        Python ints (``dtype=object``) instead of wrapping around.
+        """
+        np = self._vectorizer()
+        if np is not None:
+            a_arr, b_arr = np.asarray(a), np.asarray(b)
+            if np.issubdtype(np.result_type(a_arr, b_arr), np.integer):
+                if self._int64_safe(code, a_arr, b_arr):
+                    # Small integer dtypes (and uint64) would wrap in their own width
+                    a_arr, b_arr = a_arr.astype(np.int64), b_arr.astype(np.int64)
+                else:
+                    a_arr, b_arr = a_arr.astype(object), b_arr.astype(object)
+            result = np.atleast_1d(func(a_arr, b_arr))
+        else:
+            result = list(map(func, *self._pair(a, b)))
+        self.history.append(code | BATCH, self._size(result), 0, 0)
         return result
     
+    @staticmethod
+    def _int64_safe(code: int, a_arr: Any, b_arr: Any) -> bool:
+        """True if no element-wise result of ``code`` can exceed the int64 range."""
+        if not a_arr.size or not b_arr.size:
+            return True
+        # Python ints, so the bound itself cannot overflow
+        bound_a = max(int(a_arr.max()), -int(a_arr.min()))
+        bound_b = max(int(b_arr.max()), -int(b_arr.min()))
+        if code == MULTIPLY:
+            return bound_a * bound_b <= _INT64_MAX
+        return bound_a + bound_b <= _INT64_MAX
+    
+    def _vectorizer(self):
+        """NumPy, when installed and the numeric mode allows vectorizing."""
+        return _numpy() if self.numeric.native else None
+    
+    @staticmethod
+    def _pair(a: Operands, b: Operands) -> tuple[list, list]:
+        a_many, b_many = isinstance(a, Iterable), isinstance(b, Iterable)
+        a_vals = list(a) if a_many else a
+        b_vals = list(b) if b_many else b
+        if a_many and b_many:
+            if len(a_vals) != len(b_vals):
+                raise ValueError("Batch operands must have the same length")
+            return a_vals, b_vals
+        if a_many:
+            return a_vals, list(repeat(b_vals, len(a_vals)))
+        if b_many:
+            return list(repeat(a_vals, len(b_vals))), b_vals
+        return [a_vals], [b_vals]
+    
+    @staticmethod
+    def _size(result: Any) -> int:
+        np = _numpy()
+        return int(np.size(result)) if np is not None and isinstance(result, (np.ndarray, np.generic)) else len(result)
+    
     def get_history(self) -> list[str]:
-        return self.history.copy()
+        return list(self.history)
+    
+    def iter_history(self) -> Iterator[str]:
+        return iter(self.history)
     
     def clear_history(self) -> None:
         self.history.clear()
\ No newline at end of file
@@ -1,10 +1,35 @@
+import csv
+import json
 import typer
+from enum import Enum
+from pathlib import Path
 from typing import Annotated
 from .calculator import Calculator
+from .history import DEFAULT_CAPACITY, DEFAULT_PATH, HistoryLog
 
 app = typer.Typer(help="A simple calculator CLI application")
 
-state = {"calc": Calculator()}
+# The calculator is created on first use so that its history log is shared
+# between invocations through the configured history file
+state = {"calc": None}
+
+
+@app.callback()
+def configure(
+    history_file: Annotated[Path, typer.Option(
+        envvar="CALC_HISTORY_FILE", help="File where the calculation history is stored"
+    )] = DEFAULT_PATH,
+    history_size: Annotated[int, typer.Option(
+        envvar="CALC_HISTORY_SIZE", min=1, help="Maximum number of calculations kept in history"
+    )] = DEFAULT_CAPACITY,
+):
+    """A simple calculator CLI application"""
+    if state["calc"] is None:
+        try:
+            history = HistoryLog(history_file, history_size)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--history-file")
+        state["calc"] = Calculator(history=history)
 
 
 @app.command()
@@ -60,15 +85,101 @@ def power(
     typer.echo(f"Result: {result}")
 
 
+class OutputFormat(str, Enum):
+    text = "text"
+    csv = "csv"
+    jsonl = "jsonl"
+
+
+# Operation names and symbols accepted by the batch command
+BATCH_OPERATIONS = {
+    "add": "add", "+": "add",
+    "subtract": "subtract", "-": "subtract",
+    "multiply": "multiply", "*": "multiply",
+    "divide": "divide", "/": "divide",
+    "power": "power", "^": "power",
+}
+
+
+def parse_operation(line: str) -> tuple[str, float, float]:
+    """Parse ``add 2 3`` or ``2 + 3`` into an operation name and operands"""
+    parts = line.split()
+    if len(parts) == 3:
+        if parts[0] in BATCH_OPERATIONS:
+            return BATCH_OPERATIONS[parts[0]], float(parts[1]), float(parts[2])
+        if parts[1] in BATCH_OPERATIONS:
+            return BATCH_OPERATIONS[parts[1]], float(parts[0]), float(parts[2])
+    raise ValueError(f"Invalid operation: {line}")
+
+
+@app.command()
+def batch(
+    source: Annotated[typer.FileText, typer.Argument(
+        help="File with one operation or expression per line, e.g. 'add 2 3' or '(2 + 3) ^ 2' (default: stdin)"
+    )] = "-",
+    output: Annotated[typer.FileTextWrite, typer.Option(
+        "--output", "-o", help="Where to write results (default: stdout)"
+    )] = "-",
+    output_format: Annotated[OutputFormat, typer.Option(
+        "--format", "-f", help="Output format"
+    )] = OutputFormat.text,
+):
+    """Evaluate operations and expressions line by line from a file or stdin"""
+    calc = state["calc"]
+    methods = {name: getattr(calc, name) for name in set(BATCH_OPERATIONS.values())}
+    write = output.write
+    if output_format is OutputFormat.csv:
+        writer = csv.writer(output)
+        writer.writerow(["line", "operation", "a", "b", "result", "error"])
+    
+    failures = 0
+    for number, line in enumerate(source, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        
+        name = a = b = result = error = None
+        try:
+            try:
+                name, a, b = parse_operation(line)
+            except ValueError:
+                # Anything that is not a single operation is an expression
+                name = "expression"
+                result = calc.evaluate(line)
+            else:
+                result = methods[name](a, b)
+        except (ValueError, ArithmeticError) as e:
+            # Overflow and zero-division errors fail only their own line;
+            # float overflow carries (errno, message) as its arguments
+            error = str(e.args[-1]) if isinstance(e, OverflowError) and e.args else str(e)
+            failures += 1
+        
+        if output_format is OutputFormat.text:
+            if error is None:
+                write(f"{result}\n")
+            else:
+                typer.echo(f"Error: line {number}: {error}", err=True)
+        elif output_format is OutputFormat.csv:
+            writer.writerow([number, name, a, b, result, error])
+        else:
+            record = {"line": number, "operation": name, "a": a, "b": b}
+            record.update({"result": result} if error is None else {"error": error})
+            write(json.dumps(record, default=str) + "\n")
+    
+    output.flush()
+    if failures:
+        raise typer.Exit(1)
+
+
 @app.command()
 def history():
     """Show calculation history"""
-    history = state["calc"].get_history()
-    if not history:
+    calc = state["calc"]
+    if not len(calc.history):
         typer.echo("No calculations in history")
     else:
         typer.echo("Calculation History:")
-        for calculation in history:
+        for calculation in calc.iter_history():
             typer.echo(f"  {calculation}")
 
 
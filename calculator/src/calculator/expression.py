@@ -0,0 +1,203 @@
+import re
+from functools import lru_cache
+from typing import Any, Mapping, Optional, Union
+
+Number = Union[int, float]
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<op>\*\*|[-+*/^()])
+    )""", re.VERBOSE)
+
+# Infix operators mapped to the Calculator method that records them
+_METHODS = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide", "^": "power"}
+
+
+class Constant:
+    __slots__ = ("index",)
+
+    def __init__(self, index: int):
+        self.index = index
+
+
+class Variable:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class BinaryOp:
+    __slots__ = ("op", "left", "right")
+
+    def __init__(self, op: str, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class Negate:
+    __slots__ = ("operand",)
+
+    def __init__(self, operand):
+        self.operand = operand
+
+
+class _Parser:
+    """Recursive-descent parser for ``+ - * / ^`` expressions with parentheses.
+
+    ``^`` (or ``**``) binds tighter than unary minus and is right-associative,
+    so ``-2^2`` is ``-4`` and ``2^3^2`` is ``2^9``.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+        self.constants: list[str] = []
+        self.variables: list[str] = []
+
+    def _tokenize(self, text: str) -> list[tuple[str, str]]:
+        tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if match is None:
+                raise self._error()
+            kind = match.lastgroup
+            value = match.group(kind)
+            tokens.append((kind, "^" if value == "**" else value))
+            pos = match.end()
+        return tokens
+
+    def _error(self) -> ValueError:
+        return ValueError(f"Invalid expression: {self.text}")
+
+    def _peek(self) -> tuple[str, str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("end", "")
+
+    def _take(self) -> tuple[str, str]:
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self._sum()
+        if self.pos != len(self.tokens):
+            raise self._error()
+        return node
+
+    def _sum(self):
+        node = self._product()
+        while self._peek() in (("op", "+"), ("op", "-")):
+            node = BinaryOp(self._take()[1], node, self._product())
+        return node
+
+    def _product(self):
+        node = self._unary()
+        while self._peek() in (("op", "*"), ("op", "/")):
+            node = BinaryOp(self._take()[1], node, self._unary())
+        return node
+
+    def _unary(self):
+        if self._peek() == ("op", "-"):
+            self._take()
+            return Negate(self._unary())
+        if self._peek() == ("op", "+"):
+            self._take()
+            return self._unary()
+        return self._power()
+
+    def _power(self):
+        node = self._atom()
+        if self._peek() == ("op", "^"):
+            self._take()
+            node = BinaryOp("^", node, self._unary())
+        return node
+
+    def _atom(self):
+        kind, value = self._take()
+        if kind == "number":
+            self.constants.append(value)
+            return Constant(len(self.constants) - 1)
+        if kind == "name":
+            if value not in self.variables:
+                self.variables.append(value)
+            return Variable(value)
+        if (kind, value) == ("op", "("):
+            node = self._sum()
+            if self._take() != ("op", ")"):
+                raise self._error()
+            return node
+        raise self._error()
+
+
+def _divide(a, b):
+    if b == 0:
+        raise ValueError("Cannot divide by zero")
+    return a / b
+
+
+def _parse_constant(text: str) -> Number:
+    return int(text) if text.isdigit() else float(text)
+
+
+class CompiledExpression:
+    """An expression parsed once and compiled to Python code objects.
+
+    Two evaluators are generated from the same AST: a plain one that applies
+    the operators directly, and a traced one that routes every binary
+    operation through a Calculator so it is recorded in its history.
+    Constants are passed in at call time so numeric backends can convert them.
+    """
+
+    def __init__(self, text: str):
+        parser = _Parser(text)
+        tree = parser.parse()
+        self.text = text
+        self.variables = tuple(parser.variables)
+        self.constants = tuple(_parse_constant(value) for value in parser.constants)
+
+        params = ", ".join(["_c", *(f"v_{name}" for name in self.variables)])
+        namespace = {"__builtins__": {}, "_divide": _divide}
+        self._plain = eval(f"lambda {params}: {self._emit(tree, traced=False)}", namespace)
+        self._traced = eval(f"lambda _calc, {params}: {self._emit(tree, traced=True)}", namespace)
+
+    def _emit(self, node, traced: bool) -> str:
+        if isinstance(node, Constant):
+            return f"_c[{node.index}]"
+        if isinstance(node, Variable):
+            return f"v_{node.name}"
+        if isinstance(node, Negate):
+            return f"(-{self._emit(node.operand, traced)})"
+        left = self._emit(node.left, traced)
+        right = self._emit(node.right, traced)
+        if traced:
+            return f"_calc.{_METHODS[node.op]}({left}, {right})"
+        if node.op == "/":
+            return f"_divide({left}, {right})"
+        return f"({left} {'**' if node.op == '^' else node.op} {right})"
+
+    def _arguments(self, bindings: Mapping[str, Any]) -> list:
+        try:
+            return [bindings[name] for name in self.variables]
+        except KeyError as e:
+            raise ValueError(f"Missing value for variable {e.args[0]!r}") from None
+
+    def __call__(self, bindings: Mapping[str, Any], constants: Optional[tuple] = None) -> Any:
+        """Evaluate without recording history."""
+        return self._plain(self.constants if constants is None else constants, *self._arguments(bindings))
+
+    def evaluate_with(self, calculator, bindings: Mapping[str, Any], constants: Optional[tuple] = None) -> Any:
+        """Evaluate through ``calculator`` so each operation is recorded."""
+        return self._traced(calculator, self.constants if constants is None else constants,
+                            *self._arguments(bindings))
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text: str) -> CompiledExpression:
+    """Parse and compile ``text``, reusing the compiled form for repeated text."""
+    return CompiledExpression(text)
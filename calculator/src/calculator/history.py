@@ -0,0 +1,249 @@
+import contextlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are not serialized between processes
+    fcntl = None
+
+Number = Union[int, float, complex]
+
+# Operation codes stored in each record
+ADD, SUBTRACT, MULTIPLY, DIVIDE, POWER, EXPRESSION = range(1, 7)
+
+SYMBOLS = {ADD: "+", SUBTRACT: "-", MULTIPLY: "*", DIVIDE: "/", POWER: "^"}
+
+# Flag combined with an operation code for batch summaries, whose record
+# holds the element count and the number of masked elements as operands
+BATCH = 0x80
+
+DEFAULT_CAPACITY = 10_000
+DEFAULT_PATH = Path.home() / ".calculator_history"
+
+# Value kinds, two bits per operand in the record's kind byte
+_INT, _FLOAT, _COMPLEX = range(3)
+
+_MAGIC = b"CALH"
+_VERSION = 1
+# magic, version, capacity, total number of records ever appended
+_HEADER = struct.Struct("<4sHIQ")
+# operation, value kinds, a, b, result (16 bytes each, enough for a complex)
+_RECORD = struct.Struct("<BB16s16s16s")
+_INT64 = struct.Struct("<q")
+_DOUBLE = struct.Struct("<d")
+_COMPLEX_PAIR = struct.Struct("<dd")
+_INT64_MIN, _INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+
+
+def _lock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def format_record(operation: int, a: Number, b: Number, result: Number) -> str:
+    if operation == EXPRESSION | BATCH:
+        return f"batch expression ({a} evaluations)"
+    if operation & BATCH:
+        summary = f"batch a {SYMBOLS[operation & ~BATCH]} b ({a} values"
+        return summary + (f", {b} masked)" if b else ")")
+    return f"{a} {SYMBOLS[operation]} {b} = {result}"
+
+
+def _encode(value: Number) -> tuple[int, bytes]:
+    if isinstance(value, int) and _INT64_MIN <= value <= _INT64_MAX:
+        return _INT, _INT64.pack(value)
+    if isinstance(value, complex):
+        return _COMPLEX, _COMPLEX_PAIR.pack(value.real, value.imag)
+    try:
+        return _FLOAT, _DOUBLE.pack(float(value))
+    except OverflowError:
+        return _FLOAT, _DOUBLE.pack(float("inf") if value > 0 else float("-inf"))
+
+
+def _decode(kind: int, raw: bytes) -> Number:
+    if kind == _INT:
+        return _INT64.unpack_from(raw)[0]
+    if kind == _COMPLEX:
+        return complex(*_COMPLEX_PAIR.unpack_from(raw))
+    return _DOUBLE.unpack_from(raw)[0]
+
+
+class HistoryLog:
+    """Fixed-size ring of compact calculation records.
+
+    Each record holds an operation code, both operands and the result in a
+    fixed 50-byte slot, so memory use depends only on ``capacity``. With a
+    ``path`` the ring is a memory-mapped file shared by every process that
+    opens it, with appends serialized by an exclusive ``flock``; without one
+    it lives in anonymous memory. Integers outside the 64-bit range are kept
+    as floats. Records are formatted only when read.
+
+    A log opened with another capacity is rewritten to a new file that
+    replaces the old one, so processes still mapping the old file keep a
+    valid mapping. A file that is neither empty nor a history log is never
+    overwritten: opening it raises ``ValueError``.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.path = Path(path) if path is not None else None
+        self.capacity = capacity
+        self._size = _HEADER.size + capacity * _RECORD.size
+        self._fd: Optional[int] = None
+
+        if self.path is None:
+            self._map = mmap.mmap(-1, self._size)
+            self._write_header(0)
+        else:
+            self._map = self._open_file()
+
+    def _open_file(self) -> mmap.mmap:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = self._open_locked()
+        try:
+            existing = os.fstat(fd).st_size
+            header = os.pread(fd, _HEADER.size, 0) if existing >= _HEADER.size else b""
+            if header and _HEADER.unpack(header)[:3] == (_MAGIC, _VERSION, self.capacity) \
+                    and existing == self._size:
+                self._fd = fd
+                return mmap.mmap(fd, self._size)
+            if existing and (not header or _HEADER.unpack(header)[0] != _MAGIC):
+                raise ValueError(f"{self.path} exists and is not a calculator history file")
+
+            if not existing:
+                # New log: nobody can have mapped an empty file yet
+                os.ftruncate(fd, self._size)
+                self._fd = fd
+                self._map = mmap.mmap(fd, self._size)
+                self._write_header(0)
+                return self._map
+
+            # Resized log: keep the newest records that still fit in a new file
+            kept = list(self._read_foreign(fd, existing, header))[-self.capacity:]
+            return self._replace_file(kept)
+        finally:
+            _unlock(fd)
+            if fd != self._fd:
+                os.close(fd)
+
+    def _open_locked(self) -> int:
+        """Open the log file and lock it, retrying if it was replaced meanwhile."""
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            _lock(fd)
+            try:
+                if os.path.samestat(os.stat(self.path), os.fstat(fd)):
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+    def _replace_file(self, records: list[bytes]) -> mmap.mmap:
+        """Write ``records`` to a new file, then move it over the log."""
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(temporary, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, self._size)
+            self._map = mmap.mmap(fd, self._size)
+            self._write_header(0)
+            for record in records:
+                self._append_raw(record)
+            self._map.flush()
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.close(fd)
+            with contextlib.suppress(OSError):
+                os.unlink(temporary)
+            raise
+        self._fd = fd
+        return self._map
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the exclusive lock of a file log (no-op in memory)."""
+        if self._fd is None:
+            yield
+            return
+        _lock(self._fd)
+        try:
+            yield
+        finally:
+            _unlock(self._fd)
+
+    @staticmethod
+    def _read_foreign(fd: int, size: int, header: bytes) -> Iterator[bytes]:
+        if not header:
+            return
+        magic, version, capacity, total = _HEADER.unpack(header)
+        if magic != _MAGIC or version != _VERSION or size != _HEADER.size + capacity * _RECORD.size:
+            return
+        count = min(total, capacity)
+        for index in range(total - count, total):
+            offset = _HEADER.size + (index % capacity) * _RECORD.size
+            yield os.pread(fd, _RECORD.size, offset)
+
+    def _write_header(self, total: int) -> None:
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, self.capacity, total)
+
+    @property
+    def total(self) -> int:
+        """Number of records appended since the log was created or cleared."""
+        return _HEADER.unpack_from(self._map, 0)[3]
+
+    def _append_raw(self, record: bytes) -> None:
+        total = self.total
+        offset = _HEADER.size + (total % self.capacity) * _RECORD.size
+        self._map[offset:offset + _RECORD.size] = record
+        self._write_header(total + 1)
+
+    def append(self, operation: int, a: Number, b: Number, result: Number) -> None:
+        """Record one calculation, overwriting the oldest record when full."""
+        kind_a, raw_a = _encode(a)
+        kind_b, raw_b = _encode(b)
+        kind_r, raw_r = _encode(result)
+        kinds = kind_a | kind_b << 2 | kind_r << 4
+        record = _RECORD.pack(operation, kinds, raw_a, raw_b, raw_r)
+        # Reading the total and claiming its slot must not interleave with other processes
+        with self._locked():
+            self._append_raw(record)
+
+    def records(self) -> Iterator[tuple[int, Number, Number, Number]]:
+        """Yield ``(operation, a, b, result)`` tuples, oldest first."""
+        total = self.total
+        for index in range(total - len(self), total):
+            offset = _HEADER.size + (index % self.capacity) * _RECORD.size
+            operation, kinds, raw_a, raw_b, raw_r = _RECORD.unpack_from(self._map, offset)
+            yield (
+                operation,
+                _decode(kinds & 3, raw_a),
+                _decode(kinds >> 2 & 3, raw_b),
+                _decode(kinds >> 4 & 3, raw_r),
+            )
+
+    def __iter__(self) -> Iterator[str]:
+        for record in self.records():
+            yield format_record(*record)
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def clear(self) -> None:
+        with self._locked():
+            self._write_header(0)
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
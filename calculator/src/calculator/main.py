@@ -1,4 +1,58 @@
-from .cli import app
+import os
+import sys
+from typing import Optional
+
+# Commands simple enough to run without loading Typer
+FAST_COMMANDS = ("add", "subtract", "multiply", "divide", "power")
+
+
+def run_fast_path(args: list[str]) -> Optional[int]:
+    """Run ``<command> <a> <b>`` directly, returning the exit code.
+    
+    Returns None when the arguments need the full Typer application (help,
+    options, other commands or anything that fails to parse), so behaviour
+    and error messages stay identical to the regular CLI.
+    """
+    separated = args[1:2] == ["--"]
+    if separated:
+        args = [args[0], *args[2:]]
+    if len(args) != 3 or args[0] not in FAST_COMMANDS:
+        return None
+    if not separated and any(arg.startswith("-") for arg in args[1:]):
+        return None
+    try:
+        a, b = float(args[1]), float(args[2])
+        capacity = int(os.environ.get("CALC_HISTORY_SIZE", 0)) or None
+    except ValueError:
+        return None
+    
+    from .calculator import Calculator
+    from .history import DEFAULT_CAPACITY, DEFAULT_PATH, HistoryLog
+    
+    try:
+        history = HistoryLog(os.environ.get("CALC_HISTORY_FILE") or DEFAULT_PATH, capacity or DEFAULT_CAPACITY)
+    except (ValueError, OSError):
+        # Invalid history settings: the Typer application reports them cleanly
+        return None
+    try:
+        result = getattr(Calculator(history=history), args[0])(a, b)
+    except ValueError as e:
+        sys.stderr.write(f"Error: {e}\n")
+        return 1
+    finally:
+        history.close()
+    sys.stdout.write(f"Result: {result}\n")
+    return 0
+
+
+def main() -> None:
+    exit_code = run_fast_path(sys.argv[1:])
+    if exit_code is None:
+        from .cli import app
+        app()
+    else:
+        sys.exit(exit_code)
+
 
 if __name__ == "__main__":
-    app()
\ No newline at end of file
+    main()
\ No newline at end of file
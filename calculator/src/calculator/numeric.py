@@ -0,0 +1,122 @@
+import operator
+from decimal import Context, Decimal
+from fractions import Fraction
+from typing import Any, Optional
+
+
+def _divide(a, b):
+    if b == 0:
+        raise ValueError("Cannot divide by zero")
+    return a / b
+
+
+class FloatBackend:
+    """Native Python numbers: fastest, inputs are used unchanged."""
+
+    name = "float"
+    # Results can be computed with NumPy kernels and native operators
+    native = True
+
+    add = staticmethod(operator.add)
+    subtract = staticmethod(operator.sub)
+    multiply = staticmethod(operator.mul)
+    divide = staticmethod(_divide)
+    power = staticmethod(operator.pow)
+
+    @staticmethod
+    def convert(value: Any) -> Any:
+        return value
+
+
+class DecimalBackend:
+    """``decimal.Decimal`` arithmetic in an explicit context.
+
+    Every operation goes through the context's methods, so precision,
+    rounding and traps (e.g. ``decimal.Overflow``) never depend on the
+    thread's global context. Floats are converted from their shortest
+    ``repr``, so ``0.1`` becomes ``Decimal("0.1")``.
+    """
+
+    name = "decimal"
+    native = False
+
+    def __init__(self, context: Optional[Context] = None):
+        self.context = context if context is not None else Context()
+
+    def convert(self, value: Any) -> Decimal:
+        if isinstance(value, Decimal):
+            return value
+        if isinstance(value, float):
+            return self.context.create_decimal(repr(value))
+        if isinstance(value, Fraction):
+            return self.context.divide(Decimal(value.numerator), Decimal(value.denominator))
+        return self.context.create_decimal(value)
+
+    def add(self, a: Any, b: Any) -> Decimal:
+        return self.context.add(self.convert(a), self.convert(b))
+
+    def subtract(self, a: Any, b: Any) -> Decimal:
+        return self.context.subtract(self.convert(a), self.convert(b))
+
+    def multiply(self, a: Any, b: Any) -> Decimal:
+        return self.context.multiply(self.convert(a), self.convert(b))
+
+    def divide(self, a: Any, b: Any) -> Decimal:
+        if b == 0:
+            raise ValueError("Cannot divide by zero")
+        return self.context.divide(self.convert(a), self.convert(b))
+
+    def power(self, a: Any, b: Any) -> Decimal:
+        return self.context.power(self.convert(a), self.convert(b))
+
+
+class FractionBackend:
+    """Exact rational arithmetic with ``fractions.Fraction``.
+
+    Floats are converted from their shortest ``repr`` (``0.1`` is ``1/10``).
+    Only integral exponents are accepted, since other powers are irrational
+    in general and cannot be represented exactly.
+    """
+
+    name = "fraction"
+    native = False
+
+    @staticmethod
+    def convert(value: Any) -> Fraction:
+        if isinstance(value, Fraction):
+            return value
+        if isinstance(value, float):
+            return Fraction(repr(value))
+        return Fraction(value)
+
+    def add(self, a: Any, b: Any) -> Fraction:
+        return self.convert(a) + self.convert(b)
+
+    def subtract(self, a: Any, b: Any) -> Fraction:
+        return self.convert(a) - self.convert(b)
+
+    def multiply(self, a: Any, b: Any) -> Fraction:
+        return self.convert(a) * self.convert(b)
+
+    def divide(self, a: Any, b: Any) -> Fraction:
+        if b == 0:
+            raise ValueError("Cannot divide by zero")
+        return self.convert(a) / self.convert(b)
+
+    def power(self, a: Any, b: Any) -> Fraction:
+        exponent = self.convert(b)
+        if exponent.denominator != 1:
+            raise ValueError("Fraction mode only supports integer exponents")
+        return self.convert(a) ** exponent.numerator
+
+
+MODES = {"float": FloatBackend, "decimal": DecimalBackend, "fraction": FractionBackend}
+
+
+def get_backend(mode: str = "float", context: Optional[Context] = None):
+    """Create the numeric backend for ``mode`` ("float", "decimal" or "fraction")."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown numeric mode: {mode!r} (expected one of {', '.join(MODES)})")
+    if context is not None and mode != "decimal":
+        raise ValueError("A decimal context can only be used with mode='decimal'")
+    return DecimalBackend(context) if mode == "decimal" else MODES[mode]()
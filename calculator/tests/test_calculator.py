@@ -1,6 +1,12 @@
 import unittest
+from unittest.mock import patch
 from calculator import Calculator  # Supondo que o código esteja em calculator.py
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class TestCalculator(unittest.TestCase):
 
@@ -134,5 +140,94 @@ class TestCalculator(unittest.TestCase):
         self.assertEqual(self.calculator.get_history(), expected_history)
 
 
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestCalculatorBatchNumpy(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = Calculator()
+
+    def test_add_batch(self):
+        result = self.calculator.add_batch(np.array([1, 2, 3]), np.array([4, 5, 6]))
+        np.testing.assert_array_equal(result, [5, 7, 9])
+        self.assertEqual(self.calculator.get_history(), ["batch a + b (3 values)"])
+
+    def test_subtract_batch_with_scalar(self):
+        result = self.calculator.subtract_batch([10, 20, 30], 5)
+        np.testing.assert_array_equal(result, [5, 15, 25])
+
+    def test_multiply_batch(self):
+        result = self.calculator.multiply_batch([1.5, 2.0], [2, 4])
+        np.testing.assert_array_equal(result, [3.0, 8.0])
+
+    def test_scalar_operands(self):
+        result = self.calculator.add_batch(2, 3)
+        np.testing.assert_array_equal(result, [5])
+        self.calculator.divide_batch(6, 3)
+        self.assertEqual(self.calculator.get_history(), ["batch a + b (1 values)", "batch a / b (1 values)"])
+
+    def test_integer_batch_does_not_wrap_around(self):
+        result = self.calculator.multiply_batch([2 ** 62, 3], [4, 5])
+        self.assertEqual(list(result), [2 ** 64, 15])
+        result = self.calculator.add_batch([2 ** 63 - 1], [1])
+        self.assertEqual(list(result), [2 ** 63])
+        result = self.calculator.subtract_batch(np.array([1], dtype=np.uint8), np.array([2], dtype=np.uint8))
+        self.assertEqual(list(result), [-1])
+
+    def test_power_batch_integer_inputs(self):
+        result = self.calculator.power_batch([2, 4, 10], [-1, 0.5, 20])
+        np.testing.assert_allclose(result, [0.5, 2.0, 1e20])
+        result = self.calculator.power_batch([2, 3], [-1, 40])
+        np.testing.assert_allclose(result, [0.5, 3.0 ** 40])
+
+    def test_divide_batch(self):
+        result = self.calculator.divide_batch([6, 9], [3, 2])
+        np.testing.assert_array_equal(result, [2.0, 4.5])
+
+    def test_divide_batch_by_zero_raises(self):
+        with self.assertRaises(ValueError) as context:
+            self.calculator.divide_batch([1, 2], [1, 0])
+        self.assertEqual(str(context.exception), "Cannot divide by zero")
+        self.assertEqual(self.calculator.get_history(), [])
+
+    def test_divide_batch_by_zero_mask(self):
+        result = self.calculator.divide_batch([1, 2, 3], [1, 0, 3], on_zero="mask")
+        self.assertEqual(result.mask.tolist(), [False, True, False])
+        self.assertEqual(result.compressed().tolist(), [1.0, 1.0])
+        self.assertEqual(self.calculator.get_history(), ["batch a / b (3 values, 1 masked)"])
+
+    def test_divide_batch_invalid_on_zero(self):
+        with self.assertRaises(ValueError):
+            self.calculator.divide_batch([1], [1], on_zero="ignore")
+
+
+@patch("calculator.calculator.np", None)
+class TestCalculatorBatchPython(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = Calculator()
+
+    def test_add_batch(self):
+        self.assertEqual(self.calculator.add_batch([1, 2], [3, 4]), [4, 6])
+        self.assertEqual(self.calculator.get_history(), ["batch a + b (2 values)"])
+
+    def test_scalar_broadcast(self):
+        self.assertEqual(self.calculator.multiply_batch(2, [1, 2, 3]), [2, 4, 6])
+        self.assertEqual(self.calculator.power_batch([2, 3], 2), [4, 9])
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.calculator.subtract_batch([1, 2], [1])
+
+    def test_divide_batch_by_zero_raises(self):
+        with self.assertRaises(ValueError):
+            self.calculator.divide_batch([1, 2], [0, 1])
+
+    def test_divide_batch_by_zero_mask(self):
+        result = self.calculator.divide_batch([1, 2], [0, 4], on_zero="mask")
+        self.assertEqual(result, [None, 0.5])
+        self.assertEqual(self.calculator.get_history(), ["batch a / b (2 values, 1 masked)"])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
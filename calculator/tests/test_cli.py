@@ -1,3 +1,6 @@
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
 from typer.testing import CliRunner
@@ -96,5 +99,109 @@ class TestCalculatorCLI(unittest.TestCase):
         self.assertEqual(result.exit_code, 0)
         self.assertIn("Result: 2.0", result.output)
 
+
+class TestCalculatorCLIBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = CliRunner()
+        state["calc"] = Calculator()
+
+    def test_batch_text_from_stdin(self):
+        result = self.runner.invoke(app, ["batch"], input="add 1 2\n# comment\n\n3 * 4\n2 ^ 3\n")
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, "3.0\n12.0\n8.0\n")
+
+    def test_batch_records_history(self):
+        self.runner.invoke(app, ["batch"], input="add 1 2\n-5 - -3\n")
+        self.assertEqual(state["calc"].get_history(), ["1.0 + 2.0 = 3.0", "-5.0 - -3.0 = -2.0"])
+
+    def test_batch_from_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "ops.txt")
+            with open(path, "w") as f:
+                f.write("multiply 6 7\n")
+            result = self.runner.invoke(app, ["batch", path])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, "42.0\n")
+
+    def test_batch_errors_continue(self):
+        result = self.runner.invoke(app, ["batch"], input="divide 1 0\nfoo +\nadd 1 1\n")
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Error: line 1: Cannot divide by zero", result.output)
+        self.assertIn("Error: line 2: Invalid expression: foo +", result.output)
+        self.assertIn("2.0", result.output)
+
+    def test_batch_arithmetic_errors_continue(self):
+        result = self.runner.invoke(app, ["batch"], input="add 1 2\npower 10 400\n0 ^ -1\nmultiply 2 3\n")
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Error: line 2: Numerical result out of range", result.output)
+        self.assertIn("Error: line 3:", result.output)
+        self.assertIn("3.0\n", result.output)
+        self.assertIn("6.0\n", result.output)
+
+    def test_batch_csv(self):
+        result = self.runner.invoke(app, ["batch", "--format", "csv"], input="add 1 2\n1 / 0\n")
+        lines = result.output.splitlines()
+        self.assertEqual(lines[0], "line,operation,a,b,result,error")
+        self.assertEqual(lines[1], "1,add,1.0,2.0,3.0,")
+        self.assertEqual(lines[2], "2,divide,1.0,0.0,,Cannot divide by zero")
+
+    def test_batch_jsonl(self):
+        result = self.runner.invoke(app, ["batch", "-f", "jsonl"], input="power 2 10\nbad line\n")
+        records = [json.loads(line) for line in result.output.splitlines()]
+        self.assertEqual(records[0], {"line": 1, "operation": "power", "a": 2.0, "b": 10.0, "result": 1024.0})
+        self.assertEqual(records[1]["error"], "Invalid expression: bad line")
+
+    def test_batch_expressions(self):
+        result = self.runner.invoke(app, ["batch", "-f", "jsonl"], input="(1 + 2) ^ 2 / 3\n")
+        record = json.loads(result.output)
+        self.assertEqual(record["operation"], "expression")
+        self.assertEqual(record["result"], 3.0)
+        self.assertEqual(state["calc"].get_history(), ["1 + 2 = 3", "3 ^ 2 = 9", "9 / 3 = 3.0"])
+
+
+class TestCalculatorCLIHistoryFile(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = CliRunner()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.history_file = os.path.join(self.tmpdir.name, "history.bin")
+
+    def tearDown(self):
+        if state["calc"] is not None:
+            state["calc"].history.close()
+        state["calc"] = None
+        self.tmpdir.cleanup()
+
+    def invoke_new_process(self, *args):
+        # Each CLI process starts without a calculator and opens the history file
+        if state["calc"] is not None:
+            state["calc"].history.close()
+        state["calc"] = None
+        return self.runner.invoke(app, ["--history-file", self.history_file, *args])
+
+    def test_history_persists_between_invocations(self):
+        self.invoke_new_process("add", "1", "2")
+        self.invoke_new_process("multiply", "2", "5")
+        result = self.invoke_new_process("history")
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("1.0 + 2.0 = 3.0", result.output)
+        self.assertIn("2.0 * 5.0 = 10.0", result.output)
+
+    def test_history_size_limits_entries(self):
+        for i in range(3):
+            self.invoke_new_process("--history-size", "2", "add", str(i), "1")
+        result = self.invoke_new_process("--history-size", "2", "history")
+        self.assertNotIn("0.0 + 1.0 = 1.0", result.output)
+        self.assertIn("1.0 + 1.0 = 2.0", result.output)
+        self.assertIn("2.0 + 1.0 = 3.0", result.output)
+
+    def test_clear_persists(self):
+        self.invoke_new_process("add", "1", "2")
+        self.invoke_new_process("clear")
+        result = self.invoke_new_process("history")
+        self.assertIn("No calculations in history", result.output)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
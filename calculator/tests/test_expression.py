@@ -0,0 +1,69 @@
+import unittest
+from calculator import Calculator
+from calculator.expression import compile_expression
+
+
+class TestCompileExpression(unittest.TestCase):
+
+    def test_precedence(self):
+        self.assertEqual(compile_expression("1 + 2 * 3")({}), 7)
+        self.assertEqual(compile_expression("(1 + 2) * 3")({}), 9)
+        self.assertEqual(compile_expression("8 / 2 / 2")({}), 2.0)
+        self.assertEqual(compile_expression("10 - 4 - 3")({}), 3)
+
+    def test_power_is_right_associative_and_binds_tighter_than_negation(self):
+        self.assertEqual(compile_expression("2 ^ 3 ^ 2")({}), 512)
+        self.assertEqual(compile_expression("-2 ^ 2")({}), -4)
+        self.assertEqual(compile_expression("2 ** -1")({}), 0.5)
+
+    def test_numbers(self):
+        self.assertEqual(compile_expression("1.5e1 + .5")({}), 15.5)
+        self.assertIsInstance(compile_expression("3")({}), int)
+
+    def test_variables(self):
+        compiled = compile_expression("(a + b) ^ c / d")
+        self.assertEqual(compiled.variables, ("a", "b", "c", "d"))
+        self.assertEqual(compiled({"a": 1, "b": 2, "c": 2, "d": 3}), 3.0)
+
+    def test_compiled_forms_are_cached(self):
+        self.assertIs(compile_expression("x * y + 1"), compile_expression("x * y + 1"))
+
+    def test_missing_variable(self):
+        with self.assertRaises(ValueError) as context:
+            compile_expression("x + y")({"x": 1})
+        self.assertEqual(str(context.exception), "Missing value for variable 'y'")
+
+    def test_divide_by_zero(self):
+        with self.assertRaises(ValueError) as context:
+            compile_expression("a / (b - 1)")({"a": 1, "b": 1})
+        self.assertEqual(str(context.exception), "Cannot divide by zero")
+
+    def test_invalid_expressions(self):
+        for text in ["", "1 +", "(1 + 2", "1 2", "2 $ 3", "()"]:
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    compile_expression(text)
+
+
+class TestCalculatorEvaluate(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = Calculator()
+
+    def test_evaluate_records_each_operation(self):
+        result = self.calculator.evaluate("(a + b) ^ c / d", a=1, b=2, c=2, d=3)
+        self.assertEqual(result, 3.0)
+        self.assertEqual(self.calculator.get_history(), ["1 + 2 = 3", "3 ^ 2 = 9", "9 / 3 = 3.0"])
+
+    def test_evaluate_divide_by_zero(self):
+        with self.assertRaises(ValueError):
+            self.calculator.evaluate("x / 0", x=1)
+
+    def test_evaluate_many(self):
+        results = self.calculator.evaluate_many("x * x - 1", ({"x": x} for x in range(4)))
+        self.assertEqual(results, [-1, 0, 3, 8])
+        self.assertEqual(self.calculator.get_history(), ["batch expression (4 evaluations)"])
+
+
+if __name__ == '__main__':
+    unittest.main()
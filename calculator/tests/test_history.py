@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from calculator import Calculator
+from calculator.history import ADD, DIVIDE, POWER, HistoryLog
+
+
+def _append_many(path, count):
+    log = HistoryLog(path, capacity=20000)
+    for i in range(count):
+        log.append(ADD, i, 0, i)
+    log.close()
+
+
+class TestHistoryLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "history.bin")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_formats_records_like_calculator(self):
+        log = HistoryLog()
+        log.append(ADD, 5, 3, 8)
+        log.append(DIVIDE, 7.5, 2.5, 3.0)
+        self.assertEqual(list(log), ["5 + 3 = 8", "7.5 / 2.5 = 3.0"])
+
+    def test_records_keep_value_types(self):
+        log = HistoryLog()
+        log.append(POWER, -8, 0.5, (-8) ** 0.5)
+        self.assertEqual(list(log.records()), [(POWER, -8, 0.5, (-8) ** 0.5)])
+
+    def test_capacity_keeps_newest_records(self):
+        log = HistoryLog(capacity=3)
+        for i in range(10):
+            log.append(ADD, i, 1, i + 1)
+        self.assertEqual(len(log), 3)
+        self.assertEqual(log.total, 10)
+        self.assertEqual(list(log), ["7 + 1 = 8", "8 + 1 = 9", "9 + 1 = 10"])
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            HistoryLog(capacity=0)
+
+    def test_clear(self):
+        log = HistoryLog()
+        log.append(ADD, 1, 2, 3)
+        log.clear()
+        self.assertEqual(len(log), 0)
+        self.assertEqual(list(log), [])
+
+    def test_file_log_persists_between_instances(self):
+        log = HistoryLog(self.path, capacity=5)
+        log.append(ADD, 1, 2, 3)
+        log.close()
+        reopened = HistoryLog(self.path, capacity=5)
+        self.assertEqual(list(reopened), ["1 + 2 = 3"])
+        reopened.close()
+
+    def test_file_size_is_bounded(self):
+        log = HistoryLog(self.path, capacity=4)
+        size = os.path.getsize(self.path)
+        for i in range(100):
+            log.append(ADD, i, i, 2 * i)
+        log.close()
+        self.assertEqual(os.path.getsize(self.path), size)
+
+    def test_resizing_keeps_newest_records(self):
+        log = HistoryLog(self.path, capacity=5)
+        for i in range(5):
+            log.append(ADD, i, 0, i)
+        log.close()
+        smaller = HistoryLog(self.path, capacity=2)
+        self.assertEqual(list(smaller), ["3 + 0 = 3", "4 + 0 = 4"])
+        smaller.close()
+
+    def test_resizing_replaces_file_mapped_by_other_logs(self):
+        log = HistoryLog(self.path, capacity=5)
+        log.append(ADD, 1, 1, 2)
+        resized = HistoryLog(self.path, capacity=3)
+        # The first log still maps the replaced file instead of a truncated one
+        self.assertEqual(list(log), ["1 + 1 = 2"])
+        self.assertEqual(list(resized), ["1 + 1 = 2"])
+        self.assertFalse(os.path.samestat(os.fstat(log._fd), os.stat(self.path)))
+        log.close()
+        resized.close()
+
+    def test_foreign_file_is_not_overwritten(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a history log at all")
+        with self.assertRaises(ValueError):
+            HistoryLog(self.path)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"not a history log at all")
+
+    def test_concurrent_processes_keep_every_record(self):
+        context = multiprocessing.get_context("spawn")
+        HistoryLog(self.path, capacity=20000).close()
+        workers = [context.Process(target=_append_many, args=(self.path, 5000)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        log = HistoryLog(self.path, capacity=20000)
+        self.assertEqual(log.total, 20000)
+        self.assertEqual(len(set(log)), 5000)
+        log.close()
+
+    def test_calculator_shares_log(self):
+        log = HistoryLog(self.path)
+        Calculator(history=log).add(2, 2)
+        Calculator(history=log).multiply(3, 3)
+        self.assertEqual(list(log), ["2 + 2 = 4", "3 * 3 = 9"])
+        log.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
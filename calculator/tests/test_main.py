@@ -1,7 +1,12 @@
 import unittest
 from unittest.mock import patch
 from io import StringIO
+import os
+import subprocess
 import sys
+import tempfile
+
+from calculator.main import main, run_fast_path
 
 # Supondo que 'app' esteja em um módulo chamado 'cli'
 # from your_project import cli  # Ajuste o import conforme necessário
@@ -59,5 +64,70 @@ class TestCLIApp(unittest.TestCase):
     #     # self.assertEqual(result, expected_edge_case_output)
     #     self.assertTrue(True) # Substitua esta linha com assertions REAIS.
 
+
+class TestFastPath(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.history_file = os.path.join(self.tmpdir.name, "history.bin")
+        patcher = patch.dict(os.environ, {"CALC_HISTORY_FILE": self.history_file})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_add(self, stdout):
+        self.assertEqual(run_fast_path(["add", "2", "3"]), 0)
+        self.assertEqual(stdout.getvalue(), "Result: 5.0\n")
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_negative_numbers_after_separator(self, stdout):
+        self.assertEqual(run_fast_path(["subtract", "--", "-5", "-3"]), 0)
+        self.assertEqual(stdout.getvalue(), "Result: -2.0\n")
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_divide_by_zero(self, stderr):
+        self.assertEqual(run_fast_path(["divide", "1", "0"]), 1)
+        self.assertEqual(stderr.getvalue(), "Error: Cannot divide by zero\n")
+
+    def test_falls_back_to_full_cli(self):
+        for args in (["history"], ["add", "1"], ["add", "-5", "3"], ["add", "x", "1"], ["--help"],
+                     ["add", "1", "2", "--help"]):
+            with self.subTest(args=args):
+                self.assertIsNone(run_fast_path(args))
+
+    def test_invalid_history_settings_fall_back_to_full_cli(self):
+        with patch.dict(os.environ, {"CALC_HISTORY_SIZE": "-5"}):
+            self.assertIsNone(run_fast_path(["add", "1", "2"]))
+        with open(self.history_file, "wb") as f:
+            f.write(b"not a history log")
+        self.assertIsNone(run_fast_path(["add", "1", "2"]))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_records_history_file(self, stdout):
+        run_fast_path(["multiply", "2", "4"])
+        from calculator.history import HistoryLog
+        history = HistoryLog(self.history_file)
+        self.assertEqual(list(history), ["2.0 * 4.0 = 8.0"])
+        history.close()
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_main_exits_with_fast_path_code(self, stdout):
+        with patch('sys.argv', ['calc', 'power', '2', '3']):
+            with self.assertRaises(SystemExit) as context:
+                main()
+        self.assertEqual(context.exception.code, 0)
+        self.assertEqual(stdout.getvalue(), "Result: 8.0\n")
+
+    def test_fast_path_does_not_import_typer(self):
+        code = ("import sys; from calculator.main import run_fast_path; "
+                "run_fast_path(['add', '1', '2']); print('typer' in sys.modules)")
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+        self.assertEqual(result.stdout.splitlines()[-1], "False")
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,98 @@
+import unittest
+from decimal import Context, Decimal, Overflow
+from fractions import Fraction
+from calculator import Calculator
+from calculator.numeric import get_backend
+
+
+class TestGetBackend(unittest.TestCase):
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            get_backend("complex")
+
+    def test_context_requires_decimal_mode(self):
+        with self.assertRaises(ValueError):
+            get_backend("fraction", Context(prec=10))
+
+
+class TestDecimalMode(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = Calculator(mode="decimal")
+
+    def test_add_floats_exactly(self):
+        self.assertEqual(self.calculator.add(0.1, 0.2), Decimal("0.3"))
+
+    def test_chained_operations_do_not_drift(self):
+        total = 0
+        for _ in range(10):
+            total = self.calculator.add(total, 0.1)
+        self.assertEqual(total, Decimal("1.0"))
+
+    def test_context_precision(self):
+        calculator = Calculator(mode="decimal", context=Context(prec=5))
+        self.assertEqual(calculator.divide(1, 3), Decimal("0.33333"))
+
+    def test_large_power(self):
+        result = self.calculator.power(2, 1000)
+        self.assertEqual(result, Decimal(2 ** 1000).quantize(Decimal("1e274")))
+
+    def test_overflow_raises(self):
+        calculator = Calculator(mode="decimal", context=Context(Emax=10))
+        with self.assertRaises(Overflow):
+            calculator.power(10, 20)
+
+    def test_divide_by_zero(self):
+        with self.assertRaises(ValueError) as context:
+            self.calculator.divide(1, 0)
+        self.assertEqual(str(context.exception), "Cannot divide by zero")
+
+    def test_history_records_operation(self):
+        self.calculator.multiply(2, 3)
+        self.assertEqual(self.calculator.get_history(), ["2 * 3 = 6.0"])
+
+    def test_evaluate(self):
+        self.assertEqual(self.calculator.evaluate("x + 0.2", x=0.1), Decimal("0.3"))
+        results = self.calculator.evaluate_many("x / 3", [{"x": 1}, {"x": 3}])
+        self.assertEqual(results, [Decimal(1) / Decimal(3), Decimal(1)])
+
+    def test_batch_uses_backend(self):
+        self.assertEqual(self.calculator.add_batch([0.1, 0.2], 0.2), [Decimal("0.3"), Decimal("0.4")])
+
+
+class TestFractionMode(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = Calculator(mode="fraction")
+
+    def test_exact_division(self):
+        result = self.calculator.divide(1, 3)
+        self.assertEqual(result, Fraction(1, 3))
+        self.assertEqual(self.calculator.multiply(result, 3), 1)
+
+    def test_floats_use_shortest_repr(self):
+        self.assertEqual(self.calculator.add(0.1, 0.2), Fraction(3, 10))
+
+    def test_integer_power(self):
+        self.assertEqual(self.calculator.power(Fraction(1, 2), -3), 8)
+
+    def test_non_integer_exponent(self):
+        with self.assertRaises(ValueError):
+            self.calculator.power(2, 0.5)
+
+    def test_divide_batch_mask(self):
+        result = self.calculator.divide_batch([1, 2], [3, 0], on_zero="mask")
+        self.assertEqual(result, [Fraction(1, 3), None])
+
+
+class TestFloatMode(unittest.TestCase):
+
+    def test_native_results_are_unchanged(self):
+        calculator = Calculator(mode="float")
+        self.assertEqual(calculator.add(0.1, 0.2), 0.1 + 0.2)
+        self.assertIsInstance(calculator.add(1, 2), int)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,528 @@
+"""
+Test Suite Consolidation
+
+Post-processing pass over a directory of generated test files:
+
+- ``setUp`` methods repeated by test classes of several files become
+  fixtures in a ``conftest.py`` at the root of the directory; the classes
+  apply them with ``pytest.mark.usefixtures`` and the fixture sets the same
+  attributes on ``request.instance``;
+- tests whose body repeats another test with the same setup and imports are
+  removed;
+- tests of one module or class that differ only in their literal values
+  are merged into a single ``pytest.mark.parametrize`` test (a ``subTest``
+  loop for ``unittest`` methods, only in classes without setUp or tearDown
+  hooks, since the cases of a loop share one instance).
+
+Edits are spliced into the original text, so the rest of each file keeps
+its formatting and comments. ``remove_tests`` uses the same edits to drop
+tests by pytest node id. The consolidated suite relies on pytest
+fixtures and is meant to run under pytest, like the verification of
+generated tests.
+"""
+
+import ast
+import builtins
+import copy
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from impact import find_test_files
+from watch import merge_tests
+
+CONFTEST = "conftest.py"
+# A setUp must appear in test classes of at least this many files to become a shared fixture
+MIN_SHARED_SETUP = 2
+
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+_HOOKS = {"setUp", "tearDown", "setUpClass", "tearDownClass", "asyncSetUp", "asyncTearDown"}
+_BUILTINS = set(dir(builtins))
+
+
+def _start(node: ast.AST) -> int:
+    return min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", [])])
+
+
+def _body(node: ast.AST) -> List[ast.stmt]:
+    """Statements of a function or class without its docstring."""
+    body = node.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        body = body[1:]
+    return body
+
+
+def _dump(statements: List[ast.stmt]) -> str:
+    return "\n".join(ast.dump(statement) for statement in statements)
+
+
+def _loaded_names(nodes: List[ast.AST]) -> Set[str]:
+    return {node.id for statement in nodes for node in ast.walk(statement)
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)}
+
+
+def _import_bindings(tree: ast.Module) -> Dict[str, str]:
+    """Map each name bound by a top-level import to a statement importing only it."""
+    bindings = {}
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                statement = copy.copy(node)
+                statement.names = [alias]
+                name = alias.asname or alias.name.split(".")[0]
+                bindings[name] = ast.unparse(statement)
+    return bindings
+
+
+class _TestFile:
+    """A parsed test file and the edits planned for it."""
+
+    def __init__(self, path: Path, source: str):
+        self.path = path
+        self.source = source
+        self.tree = ast.parse(source)
+        self.lines = source.splitlines(keepends=True)
+        self.bindings = _import_bindings(self.tree)
+        self.edits: List[Tuple[int, int, str]] = []
+        # First lines of the nodes planned for removal
+        self.removed: Set[int] = set()
+        self.needs_pytest = False
+
+    def context(self, nodes: List[ast.AST], local: str = "self") -> Optional[Tuple[Tuple[str, str], ...]]:
+        """
+        Imports the names used by ``nodes`` resolve to, or None if some
+        name other than ``local`` is defined in this file rather than imported.
+        """
+        context = []
+        for name in sorted(_loaded_names(nodes) - {local}):
+            if name in self.bindings:
+                context.append((name, self.bindings[name]))
+            elif name not in _BUILTINS:
+                return None
+        return tuple(context)
+
+    def remove(self, node: ast.AST) -> None:
+        """Plan the removal of a node and of the blank lines it leaves doubled."""
+        self.removed.add(_start(node))
+        start, end = _start(node) - 1, node.end_lineno
+        following = end
+        while following < len(self.lines) and not self.lines[following].strip():
+            following += 1
+        next_line = self.lines[following] if following < len(self.lines) else ""
+        if next_line and len(next_line) - len(next_line.lstrip()) < node.col_offset:
+            # Last statement of its block: the blank lines before it go instead
+            while start > 0 and not self.lines[start - 1].strip():
+                start -= 1
+        elif not start or not self.lines[start - 1].strip() or self.lines[start - 1].rstrip().endswith(":"):
+            end = following
+        self.edits.append((start, end, ""))
+
+    def replace(self, node: ast.AST, text: str) -> None:
+        self.edits.append((_start(node) - 1, node.end_lineno, text))
+
+    def insert(self, line: int, text: str) -> None:
+        self.edits.append((line, line, text))
+
+    def emptied(self) -> bool:
+        """True if the planned edits leave nothing but imports (and a ``__main__`` guard)."""
+        if not self.removed:
+            return False
+        for index, node in enumerate(self.tree.body):
+            if isinstance(node, (ast.Import, ast.ImportFrom)) or _start(node) in self.removed:
+                continue
+            if index == 0 and isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+                continue  # Module docstring
+            if isinstance(node, ast.If) and "__name__" in _loaded_names([node.test]):
+                continue
+            return False
+        return True
+
+    def save(self) -> None:
+        """Write the edited file, or delete it if no test is left in it."""
+        if self.emptied():
+            self.path.unlink()
+        else:
+            self.path.write_text(self.render(), encoding="utf-8")
+
+    def render(self) -> str:
+        lines = list(self.lines)
+        if self.needs_pytest and "pytest" not in self.bindings:
+            imports = [node for node in self.tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+            self.insert(imports[-1].end_lineno if imports else 0, "import pytest\n")
+        # Applied bottom-up so earlier line numbers stay valid; removals may
+        # share the blank lines between them, which are only removed once
+        floor = len(lines)
+        for start, end, text in sorted(self.edits, key=lambda edit: (edit[0], edit[1]), reverse=True):
+            end = min(end, max(floor, start))
+            lines[start:end] = [text] if text else []
+            floor = start
+        return "".join(lines)
+
+
+def _indent(text: str, column: int) -> str:
+    return "".join(" " * column + line if line.strip() else line for line in text.splitlines(keepends=True))
+
+
+def _test_classes(test_file: _TestFile) -> List[ast.ClassDef]:
+    return [node for node in test_file.tree.body if isinstance(node, ast.ClassDef) and node.name.startswith("Test")]
+
+
+def _tests(body: List[ast.stmt]) -> List[ast.AST]:
+    return [node for node in body if isinstance(node, _FUNCTIONS) and node.name.startswith("test")]
+
+
+def _setup(cls: ast.ClassDef) -> Optional[ast.FunctionDef]:
+    return next((node for node in cls.body if isinstance(node, ast.FunctionDef) and node.name == "setUp"), None)
+
+
+def _has_state(cls: ast.ClassDef) -> bool:
+    """True if the tests of a class share state a subTest loop would carry across cases."""
+    return bool(cls.decorator_list) or any(isinstance(node, _FUNCTIONS) and node.name in _HOOKS for node in cls.body)
+
+
+def _is_attribute_setup(setup: ast.FunctionDef) -> bool:
+    """True if setUp only assigns attributes of ``self``."""
+    body = _body(setup)
+    return bool(body) and all(
+        isinstance(statement, ast.Assign) and len(statement.targets) == 1
+        and isinstance(statement.targets[0], ast.Attribute)
+        and isinstance(statement.targets[0].value, ast.Name) and statement.targets[0].value.id == "self"
+        for statement in body
+    )
+
+
+class _SelfToInstance(ast.NodeTransformer):
+    def visit_Name(self, node):
+        if node.id == "self":
+            return ast.copy_location(ast.Attribute(ast.Name("request", ast.Load()), "instance", ast.Load()), node)
+        return node
+
+
+def _instance_body(setup: ast.FunctionDef) -> List[ast.stmt]:
+    """Statements of a setUp as a fixture runs them, on ``request.instance``."""
+    return [_SelfToInstance().visit(copy.deepcopy(statement)) for statement in _body(setup)]
+
+
+def _existing_fixtures(conftest: str) -> Dict[Tuple[str, Tuple], str]:
+    """Fixtures of a conftest keyed like the setUp groups, so reruns reuse them."""
+    conftest_file = _TestFile(Path(CONFTEST), conftest)
+    fixtures = {}
+    for node in conftest_file.tree.body:
+        if isinstance(node, ast.FunctionDef) and [arg.arg for arg in node.args.args] == ["request"]:
+            context = conftest_file.context(_body(node), local="request")
+            if context is not None:
+                fixtures.setdefault((_dump(_body(node)), context), node.name)
+    return fixtures
+
+
+def _uses_fixture(cls: ast.ClassDef, name: str) -> bool:
+    return any(f'usefixtures("{name}")' in ast.unparse(decorator) or f"usefixtures('{name}')" in ast.unparse(decorator)
+               for decorator in cls.decorator_list)
+
+
+def _fixture_source(name: str, setup: ast.FunctionDef, classes: List[str]) -> str:
+    body = _instance_body(setup)
+    lines = [
+        "@pytest.fixture",
+        f"def {name}(request):",
+        f'    """setUp shared by {", ".join(classes)}."""',
+    ]
+    lines.extend("    " + ast.unparse(ast.fix_missing_locations(statement)) for statement in body)
+    return "\n".join(lines) + "\n"
+
+
+def _extract_fixtures(files: List[_TestFile], conftest: Optional[str]) -> Tuple[int, str]:
+    """
+    Plan the shared setUp fixtures; returns their count and the new conftest text.
+
+    A setUp matching a fixture already in the conftest (same statements and
+    imports, e.g. from an earlier run) uses that fixture, even in one file,
+    instead of adding a copy under a new name.
+    """
+    groups: Dict[Tuple[str, Tuple], List[Tuple[_TestFile, ast.ClassDef, ast.FunctionDef]]] = {}
+    for test_file in files:
+        for cls in _test_classes(test_file):
+            setup = _setup(cls)
+            if setup is None or not _is_attribute_setup(setup):
+                continue
+            context = test_file.context(_body(setup))
+            if context is not None:
+                groups.setdefault((_dump(_instance_body(setup)), context), []).append((test_file, cls, setup))
+
+    taken, existing = set(), {}
+    if conftest:
+        taken = {node.name for node in ast.parse(conftest).body if isinstance(node, _FUNCTIONS)}
+        existing = _existing_fixtures(conftest)
+    imports, fixtures = set(), []
+    applied = 0
+    for key, members in groups.items():
+        name = existing.get(key)
+        if name is None:
+            if len({test_file.path for test_file, _, _ in members}) < MIN_SHARED_SETUP:
+                continue
+            setup = members[0][2]
+            attributes = [statement.targets[0].attr for statement in _body(setup)]
+            name = base = f"setup_{'_'.join(attributes[:3])}"
+            index = 2
+            while name in taken:
+                name, index = f"{base}_{index}", index + 1
+            taken.add(name)
+            imports.update(statement for _, statement in key[1])
+            fixtures.append(_fixture_source(name, setup, [cls.name for _, cls, _ in members]))
+        applied += 1
+        for test_file, cls, setup in members:
+            test_file.remove(setup)
+            if not _uses_fixture(cls, name):
+                test_file.insert(_start(cls) - 1, _indent(f'@pytest.mark.usefixtures("{name}")\n', cls.col_offset))
+            test_file.needs_pytest = True
+
+    if not fixtures:
+        return applied, conftest
+    header = "\n".join(["import pytest", *sorted(imports)]) + "\n"
+    generated = header + "".join("\n\n" + fixture for fixture in fixtures)
+    return applied, merge_tests(conftest, generated) if conftest else generated
+
+
+def _scopes(test_file: _TestFile) -> List[Tuple[Optional[ast.ClassDef], List[ast.AST]]]:
+    """Module-level tests and each test class with its tests."""
+    scopes = [(None, _tests(test_file.tree.body))]
+    scopes.extend((cls, _tests(cls.body)) for cls in _test_classes(test_file))
+    return scopes
+
+
+def _scope_key(cls: Optional[ast.ClassDef]) -> str:
+    """Everything of a class a test may depend on besides its own body, docstrings aside."""
+    if cls is None:
+        return ""
+    others = []
+    for node in _body(cls):
+        if isinstance(node, _FUNCTIONS):
+            if node.name.startswith("test"):
+                continue
+            node = copy.copy(node)
+            node.body = _body(node)
+        others.append(node)
+    return _dump(cls.bases) + _dump([*cls.decorator_list, *others])
+
+
+def _remove_duplicates(files: List[_TestFile], emptied: Set[Tuple[Path, str]]) -> int:
+    """Plan the removal of tests repeating an earlier test; returns how many."""
+    seen = set()
+    removed = 0
+    for test_file in files:
+        for cls, tests in _scopes(test_file):
+            setup = _setup(cls) if cls is not None else None
+            kept = 0
+            for test in tests:
+                context = test_file.context([*_body(test), *(_body(setup) if setup else [])])
+                key = (_dump(_body(test)), _dump(test.decorator_list), _dump(test.args.args[1:] if cls else test.args.args),
+                       _scope_key(cls), context if context is not None else str(test_file.path))
+                if key in seen:
+                    test_file.remove(test)
+                    removed += 1
+                else:
+                    seen.add(key)
+                    kept += 1
+            if cls is not None and tests and not kept:
+                emptied.add((test_file.path, cls.name))
+    return removed
+
+
+class _Literals(ast.NodeTransformer):
+    """Replace literals with placeholders (or parameters), recording them in order."""
+
+    def __init__(self, parameters: Optional[Dict[int, str]] = None):
+        self.values: List[Any] = []
+        self.parameters = parameters
+
+    def visit_JoinedStr(self, node):
+        # f-string parts must stay literal
+        return node
+
+    def visit_Constant(self, node):
+        index = len(self.values)
+        self.values.append(node.value)
+        if self.parameters is None:
+            return ast.copy_location(ast.Name("__literal__", ast.Load()), node)
+        if index in self.parameters:
+            return ast.copy_location(ast.Name(self.parameters[index], ast.Load()), node)
+        return node
+
+
+def _shape(test: ast.AST) -> Tuple[str, List[Any]]:
+    literals = _Literals()
+    body = [literals.visit(copy.deepcopy(statement)) for statement in _body(test)]
+    return _dump(body), literals.values
+
+
+def _merged_name(names: List[str], taken: Set[str]) -> str:
+    prefix = os.path.commonprefix(names)
+    if "_" in prefix and not prefix.endswith("_") and not all(name == prefix for name in names):
+        prefix = prefix[:prefix.rindex("_")]
+    name = prefix.rstrip("_")
+    if name in ("", "test"):
+        name = names[0]
+    return name if name not in taken else f"{name}_cases"
+
+
+def _merged_test(group: List[ast.AST], varying: List[int], rows: List[Tuple[Any, ...]],
+                 name: str, method: bool) -> ast.AST:
+    parameters = {index: f"param{position}" for position, index in enumerate(varying)}
+    literals = _Literals(parameters)
+    body = [literals.visit(copy.deepcopy(statement)) for statement in _body(group[0])]
+    names = list(parameters.values())
+    test = copy.deepcopy(group[0])
+    test.name = name
+
+    if method:
+        # pytest cannot parametrize unittest methods: loop over the cases in subTests
+        cases = ast.List([ast.Tuple([ast.Constant(original.name), *map(ast.Constant, row)], ast.Load())
+                          for original, row in zip(group, rows)], ast.Load())
+        subtest = ast.With([ast.withitem(ast.Call(ast.Attribute(ast.Name("self", ast.Load()), "subTest", ast.Load()),
+                                                  [ast.Name("case", ast.Load())], []))], body)
+        target = ast.Tuple([ast.Name(name_, ast.Store()) for name_ in ["case", *names]], ast.Store())
+        test.body = [ast.For(target, cases, [subtest], [])]
+    else:
+        values = ast.List([ast.Tuple(list(map(ast.Constant, row)), ast.Load()) if len(row) > 1 else ast.Constant(row[0])
+                           for row in rows], ast.Load())
+        ids = ast.List([ast.Constant(original.name) for original in group], ast.Load())
+        decorator = ast.Call(ast.Attribute(ast.Attribute(ast.Name("pytest", ast.Load()), "mark", ast.Load()),
+                                           "parametrize", ast.Load()),
+                             [ast.Constant(", ".join(names)), values], [ast.keyword("ids", ids)])
+        test.decorator_list = [decorator]
+        test.args.args.extend(ast.arg(name_) for name_ in names)
+        test.body = body
+    return ast.fix_missing_locations(test)
+
+
+def _parametrize(files: List[_TestFile], emptied: Set[Tuple[Path, str]]) -> Tuple[int, int]:
+    """Plan the merge of literal-only variants; returns merged groups and tests."""
+    groups_merged = tests_merged = 0
+    for test_file in files:
+        for cls, tests in _scopes(test_file):
+            if cls is not None and ((test_file.path, cls.name) in emptied or _has_state(cls)):
+                continue
+            method = cls is not None
+            taken = {test.name for test in tests}
+            groups: Dict[str, List[Tuple[ast.AST, List[Any]]]] = {}
+            for test in tests:
+                if test.decorator_list or _start(test) in test_file.removed:
+                    continue
+                if method and any(isinstance(node, (ast.Return, ast.Yield, ast.YieldFrom)) for node in ast.walk(test)):
+                    continue
+                # The merged test binds "case" and "paramN"
+                if any(name == "case" or name.startswith("param") for name in _loaded_names(_body(test))):
+                    continue
+                shape, values = _shape(test)
+                groups.setdefault(shape, []).append((test, values))
+
+            for members in groups.values():
+                if len(members) < 2:
+                    continue
+                group = [test for test, _ in members]
+                columns = list(zip(*(values for _, values in members)))
+                varying = [index for index, column in enumerate(columns) if len(set(map(repr, column))) > 1]
+                if not varying:
+                    continue
+                rows = [tuple(values[index] for index in varying) for _, values in members]
+                name = _merged_name([test.name for test in group], taken - {test.name for test in group})
+                merged = _merged_test(group, varying, rows, name, method)
+                test_file.replace(group[0], _indent(ast.unparse(merged) + "\n", group[0].col_offset))
+                for test in group[1:]:
+                    test_file.remove(test)
+                test_file.needs_pytest = test_file.needs_pytest or not method
+                groups_merged += 1
+                tests_merged += len(group)
+    return groups_merged, tests_merged
+
+
+def consolidate_tests(test_dir: str) -> Dict[str, int]:
+    """
+    Consolidate the test files of a directory in place.
+
+    Args:
+        test_dir: Directory of generated test files; the shared fixtures go
+            to its ``conftest.py``
+
+    Returns:
+        Counts of changed files (and of those deleted because every test in
+        them was a duplicate), applied fixtures, removed duplicate tests and
+        parametrized groups (and the tests merged into them)
+    """
+    root = Path(test_dir)
+    files = []
+    for path in find_test_files(root):
+        try:
+            files.append(_TestFile(path, path.read_text(encoding="utf-8")))
+        except (OSError, UnicodeDecodeError, SyntaxError):
+            continue
+
+    conftest_path = root / CONFTEST
+    conftest = conftest_path.read_text(encoding="utf-8") if conftest_path.exists() else ""
+    fixtures, new_conftest = _extract_fixtures(files, conftest)
+
+    emptied: Set[Tuple[Path, str]] = set()
+    duplicates = _remove_duplicates(files, emptied)
+    for test_file in files:
+        for cls in _test_classes(test_file):
+            if (test_file.path, cls.name) in emptied:
+                # Every test of the class repeats another one: drop the whole class
+                test_file.edits = [edit for edit in test_file.edits
+                                   if not (_start(cls) - 1 <= edit[0] < cls.end_lineno)]
+                test_file.remove(cls)
+    groups, merged = _parametrize(files, emptied)
+
+    changed = deleted = 0
+    for test_file in files:
+        if test_file.edits:
+            deleted += test_file.emptied()
+            test_file.save()
+            changed += 1
+    if new_conftest != conftest:
+        conftest_path.write_text(new_conftest, encoding="utf-8")
+        changed += 1
+    return {"files": changed, "deleted_files": deleted, "fixtures": fixtures, "duplicates": duplicates,
+            "parametrized": groups, "merged_tests": merged}
+
+
+def remove_tests(project_dir: str, node_ids: Iterable[str]) -> int:
+    """
+    Delete tests from their files by pytest node id.
+
+    Classes left without tests are removed as well, and files left without
+    any test are deleted. Single cases of a
+    parametrized test (``test_x[1]``) cannot be removed and are skipped.
+
+    Args:
+        project_dir: Directory the node ids are relative to
+        node_ids: Ids such as ``tests/test_a.py::TestA::test_b``
+
+    Returns:
+        Number of tests removed
+    """
+    wanted: Dict[str, Set[Tuple[str, ...]]] = {}
+    for node_id in node_ids:
+        if "[" not in node_id:
+            path, *names = node_id.split("::")
+            wanted.setdefault(path, set()).add(tuple(names))
+
+    removed = 0
+    for relative, names in wanted.items():
+        path = Path(project_dir) / relative
+        try:
+            test_file = _TestFile(path, path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError, SyntaxError):
+            continue
+        for cls, tests in _scopes(test_file):
+            prefix = (cls.name,) if cls is not None else ()
+            doomed = [test for test in tests if prefix + (test.name,) in names]
+            if cls is not None and doomed and len(doomed) == len(tests):
+                test_file.remove(cls)
+            else:
+                for test in doomed:
+                    test_file.remove(test)
+            removed += len(doomed)
+        if test_file.edits:
+            test_file.save()
+    return removed
@@ -0,0 +1,144 @@
+"""
+Source Deduplication
+
+Finds source files that are copies of each other (vendored packages,
+generated modules, boilerplate) by hashing their normalized AST, so that
+only one representative per group is sent to the LLM. The tests generated
+for the representative are then fanned out to every duplicate, with the
+module paths they import rewritten to the duplicate's.
+
+Two files are only copies if the local modules they import, as resolved by
+the ``ImportGraph``, are copies too: the same ``from .util import f`` in two
+packages is a different dependency when the ``util`` modules differ.
+Deduplication is file-level only; functions shared by otherwise different
+files are still sent to the LLM once per file.
+"""
+
+import ast
+import copy
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from import_graph import ImportGraph, module_name
+
+
+class _StripDocstrings(ast.NodeTransformer):
+    """Drop module, class and function docstrings."""
+
+    def _strip(self, node):
+        self.generic_visit(node)
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            node.body = body[1:] or [ast.Pass()]
+        return node
+
+    visit_Module = visit_ClassDef = visit_FunctionDef = visit_AsyncFunctionDef = _strip
+
+
+def normalized_hash(source: str) -> Optional[str]:
+    """
+    Hash a module independently of formatting, comments and docstrings.
+
+    Args:
+        source: Python source code
+
+    Returns:
+        Hex digest, or None if the source does not parse (never deduplicated)
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    normalized = ast.dump(_StripDocstrings().visit(tree), annotate_fields=False)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _dependency_hash(filename: str, graph: ImportGraph, memo: Dict[str, Optional[str]],
+                     visiting: Set[str]) -> Optional[str]:
+    """Normalized hash of a module combined with those of the local modules it imports."""
+    if filename in memo:
+        return memo[filename]
+    own = normalized_hash(graph.sources[filename])
+    if own is None or filename in visiting:
+        # Import cycles fall back to the module's own hash
+        return own
+    visiting.add(filename)
+    parts = [own]
+    for target, names in graph.dependencies(filename):
+        # A dependency that does not parse is only equal to itself
+        parts.append(f"{_dependency_hash(target, graph, memo, visiting) or target}:{names}")
+    visiting.discard(filename)
+    memo[filename] = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+    return memo[filename]
+
+
+def find_duplicates(python_files: List[Dict[str, str]], graph: ImportGraph) -> Dict[str, str]:
+    """
+    Group equivalent files, keeping the first of each group as representative.
+
+    Args:
+        python_files: Files as returned by ``read_python_files``
+        graph: Import graph of the same tree, used to resolve local imports
+
+    Returns:
+        Dictionary mapping each duplicate's filename to its representative's
+    """
+    representatives: Dict[str, str] = {}
+    duplicates = {}
+    memo: Dict[str, Optional[str]] = {}
+    for file_info in python_files:
+        digest = _dependency_hash(file_info['filename'], graph, memo, set())
+        if digest is None:
+            continue
+        if digest in representatives:
+            duplicates[file_info['filename']] = representatives[digest]
+        else:
+            representatives[digest] = file_info['filename']
+    return duplicates
+
+
+def rewrite_imports(test_code: str, source_module: str, target_module: str) -> str:
+    """
+    Point a test written for ``source_module`` at ``target_module``.
+
+    Rewrites ``import``/``from`` statements and dotted string targets such as
+    ``mock.patch("pkg.mod.name")``; other identifiers are left alone.
+    """
+    if source_module == target_module or not source_module:
+        return test_code
+
+    name = re.escape(source_module)
+    # Module path at the start of an import statement
+    import_pattern = re.compile(rf"^(\s*(?:from|import)\s+){name}(?=[\s.,;]|$)", re.MULTILINE)
+    # "source.module.attr" inside a string literal
+    string_pattern = re.compile(rf"(['\"]){name}(?=\.)")
+
+    rewritten = import_pattern.sub(lambda match: match.group(1) + target_module, test_code)
+    return string_pattern.sub(lambda match: match.group(1) + target_module, rewritten)
+
+
+def fan_out(result: Dict[str, Any], source_filename: str, target_filename: str) -> Dict[str, Any]:
+    """
+    Derive the result of a duplicate from its representative's.
+
+    Args:
+        result: Test generation result of the representative
+        source_filename: Representative's filename
+        target_filename: Duplicate's filename
+
+    Returns:
+        Copy of the result whose generated tests import the duplicate
+    """
+    fanned = copy.copy(result)
+    fanned["duplicate_of"] = source_filename
+    # No LLM work was spent on the duplicate itself
+    fanned.pop("usage", None)
+    fanned.pop("seconds", None)
+    if "generated_tests" in result:
+        generated = dict(result["generated_tests"])
+        generated["text"] = rewrite_imports(generated.get("text", ""),
+                                            module_name(source_filename), module_name(target_filename))
+        fanned["generated_tests"] = generated
+    return fanned
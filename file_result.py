@@ -0,0 +1,116 @@
+"""
+Compact File Results
+
+Holds the outcome of one processed file without keeping its agent
+responses in memory. LLMChain outputs echo their inputs (the source code
+and the dependency stubs) next to the response text; only the text is
+kept, and it is spilled to a temporary file shared by the run as soon as
+the result is created. A ``FileResult`` still reads like the result
+dictionaries used elsewhere (``result["generated_tests"]["text"]``,
+``"error" in result``, ``result.get("usage")``), loading a text from disk
+only while it is being used, so memory no longer grows with the length of
+the responses of every file in the run.
+"""
+
+import os
+import tempfile
+import threading
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+AGENT_KEYS = ("code_analysis", "generated_tests", "pattern_evaluation", "quality_evaluation")
+
+
+class TextSpill:
+    """Append-only temporary file of texts, addressed by (offset, length)."""
+
+    def __init__(self, directory: Optional[str] = None):
+        # Deleted by the OS when closed or when the process exits
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._lock = threading.Lock()
+
+    def put(self, text: str) -> Tuple[int, int]:
+        data = text.encode("utf-8")
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(data)
+        return offset, len(data)
+
+    def get(self, ref: Tuple[int, int]) -> str:
+        offset, length = ref
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length).decode("utf-8")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class FileResult(MutableMapping):
+    """
+    Result of one file with its agent texts spilled to disk.
+
+    Agent entries are stored as text references and read back as
+    ``{"text": ...}``; every other entry (usage, timings, paths,
+    verification, errors) is kept as given.
+    """
+
+    __slots__ = ("_fields", "_texts", "_spill")
+
+    def __init__(self, result: Optional[Mapping] = None, spill: Optional[TextSpill] = None):
+        """
+        Compact a result.
+
+        Args:
+            result: Result dictionary, e.g. from ``generate_tests``
+            spill: File the agent texts are written to (kept in memory if None)
+        """
+        self._fields: Dict[str, Any] = {}
+        self._texts: Dict[str, Union[str, Tuple[int, int]]] = {}
+        self._spill = spill
+        for key, value in (result or {}).items():
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._texts:
+            text = self._texts[key]
+            return {"text": self._spill.get(text) if isinstance(text, tuple) else text}
+        return self._fields[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in AGENT_KEYS and isinstance(value, Mapping):
+            self._fields.pop(key, None)
+            text = value.get("text", "")
+            self._texts[key] = self._spill.put(text) if self._spill is not None else text
+        else:
+            self._texts.pop(key, None)
+            self._fields[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._texts:
+            del self._texts[key]
+        else:
+            del self._fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        yield from self._texts
+
+    def __len__(self) -> int:
+        return len(self._fields) + len(self._texts)
+
+    def __contains__(self, key: object) -> bool:
+        # Avoids reading a spilled text just to test membership
+        return key in self._fields or key in self._texts
+
+    def __copy__(self) -> "FileResult":
+        """Shallow copy sharing the spilled texts."""
+        copy = FileResult.__new__(FileResult)
+        copy._fields = dict(self._fields)
+        copy._texts = dict(self._texts)
+        copy._spill = self._spill
+        return copy
+
+    def __repr__(self) -> str:
+        return f"FileResult(fields={sorted(self._fields)}, texts={sorted(self._texts)})"
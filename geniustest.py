@@ -5,41 +5,481 @@ A system that analyzes Python code and generates comprehensive unit tests
 using multiple specialized agents working together.
 """
 import os
+import re
+import json
+import time
+import socket
+import hashlib
 import argparse
+import tempfile
+import threading
+import subprocess
+import multiprocessing
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Callable, Tuple
 from dotenv import load_dotenv
 
 from langchain_google_genai import GoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
+from langchain_core.caches import BaseCache
+from langchain_core.outputs import Generation
+
+from impact import ImpactMap, purge_sources
+from import_graph import ImportGraph
+from dedup import find_duplicates, fan_out
+from routing import ModelRouter, TEMPLATE, FAST
+from templates import template_units, template_result
+from pytest_pool import PytestPool
+from consolidate import consolidate_tests
+from file_result import FileResult, TextSpill
+from profiling import span, profiled, profiling, DEFAULT_TOP
+from watch import SourceWatcher, DEFAULT_DEBOUNCE, changed_units, focus_source, merge_tests
+from job_queue import JobQueue, DEFAULT_QUEUE_FILE, DEFAULT_MAX_ATTEMPTS, PENDING, LEASED, DONE, FAILED
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Coverage data and impact map used to re-verify only impacted generated tests
+VERIFY_COVERAGE_FILE = ".geniustest.coverage"
+VERIFY_IMPACT_MAP_FILE = ".geniustest_impact.json"
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_CACHE_DIR = ".geniustest_cache"
+DEFAULT_CHECKPOINT_FILE = ".geniustest_checkpoint.jsonl"
+# Tier of the configured model, used when a template-tested file fails without routing
+DEFAULT_TIER = "default"
+
+
+class DiskCache(BaseCache):
+    """LLM response cache storing one JSON file per prompt and model settings."""
+    
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, prompt: str, llm_string: str) -> Path:
+        # llm_string serializes the model name and every sampling parameter
+        key = hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json"
+    
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        path = self._path(prompt, llm_string)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return [Generation(**generation) for generation in json.load(f)]
+        except (OSError, ValueError):
+            return None
+    
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        path = self._path(prompt, llm_string)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump([{"text": g.text, "generation_info": g.generation_info} for g in return_val], f)
+        os.replace(tmp_path, path)
+    
+    def clear(self, **kwargs: Any) -> None:
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink()
+
+
+class CheckpointJournal:
+    """
+    Append-only JSON-lines journal of finished files.
+    
+    Each line holds a file name, the hash of the content it was generated
+    from and its per-agent results. Lines are flushed and fsynced as soon as
+    a file finishes, so a crash loses at most the files still in flight.
+    Only the hash and position of each line are kept in memory; a result is
+    read back from the journal when it is resumed.
+    """
+    
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_FILE, resume: bool = False):
+        """
+        Open the journal.
+        
+        Args:
+            path: Journal file
+            resume: Keep the entries of a previous run; otherwise start empty
+        """
+        self.path = Path(path)
+        # File name -> (content hash, byte offset of its latest line)
+        self.entries: Dict[str, Tuple[str, int]] = self._load() if resume else {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab' if resume else 'wb')
+        if resume and self._file.tell() > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Keep new entries off a line cut short by a crash
+                    self._file.write(b"\n")
+    
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def _load(self) -> Dict[str, Tuple[str, int]]:
+        entries = {}
+        try:
+            with open(self.path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Last line cut short by a crash
+                        pass
+                    else:
+                        entries[entry["filename"]] = (entry["hash"], offset)
+                    offset += len(line)
+        except OSError:
+            pass
+        return entries
+    
+    def completed(self, filename: str, content: str) -> Optional[Dict[str, Any]]:
+        """Return the stored result if ``filename`` was finished from the same content."""
+        entry = self.entries.get(filename)
+        if entry is None or entry[0] != self.content_hash(content):
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(entry[1])
+            return json.loads(f.readline())["result"]
+    
+    def record(self, filename: str, content: str, result: Dict[str, Any]) -> None:
+        """Durably append the result of one file."""
+        content_hash = self.content_hash(content)
+        entry = {"filename": filename, "hash": content_hash, "result": dict(result)}
+        offset = self._file.tell()
+        self._file.write((json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.entries[filename] = (content_hash, offset)
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def parse_score(text: str) -> Optional[float]:
+    """Extract the 1-10 'NOTA GERAL' from the pattern specialist's review."""
+    match = re.search(r"NOTA GERAL[^0-9]{0,20}(\d+(?:[.,]\d+)?)", text, re.IGNORECASE)
+    if match is None:
+        return None
+    score = float(match.group(1).replace(",", "."))
+    return score if 0 <= score <= 10 else None
+
+
+def parse_recommendation(text: str) -> Optional[str]:
+    """Extract the quality auditor's verdict (Aprovado/Precisa ajustes/Refazer)."""
+    match = re.search(r"RECOMENDAÇÃO[^A-Za-z]*(Aprovado|Precisa ajustes|Refazer)", text, re.IGNORECASE)
+    return match.group(1).capitalize() if match else None
+
+
+class RunReport:
+    """
+    Machine-readable run report.
+    
+    Writes one JSON-lines record per file as soon as it completes (status,
+    paths, timings, estimated tokens, score) and keeps only the run totals
+    in memory for the console summary.
+    """
+    
+    def __init__(self, path: str, output_dir: Optional[str] = None):
+        """
+        Open the report.
+        
+        Args:
+            path: JSON-lines file to write
+            output_dir: Test output directory, to report where each test goes
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._paths = TestFileWriter(output_dir) if output_dir else None
+        self.counts = {"generated": 0, "resumed": 0, "duplicate": 0, "error": 0}
+        self.tokens = 0
+        self.seconds = 0.0
+        self.scores: List[float] = []
+        self._start = time.perf_counter()
+    
+    def record(self, file_info: Dict[str, str], result: Dict[str, Any], status: str) -> Dict[str, Any]:
+        """
+        Append the record of one finished file.
+        
+        Args:
+            file_info: File being processed (``filename``, ``full_path``)
+            result: Its test generation result
+            status: "generated", "resumed", "duplicate" or "error"
+            
+        Returns:
+            The record written
+        """
+        usage = result.get("usage", {})
+        record = {
+            "file": file_info['filename'],
+            "source_path": file_info.get('full_path'),
+            "status": status,
+            "test_file_path": str(self._paths.test_path(file_info['filename']))
+                              if self._paths and status != "error" else None,
+            "seconds": result.get("seconds"),
+            "agents": usage,
+            "prompt_tokens": sum(agent["prompt_tokens"] for agent in usage.values()),
+            "completion_tokens": sum(agent["completion_tokens"] for agent in usage.values()),
+            "score": parse_score(result.get("pattern_evaluation", {}).get("text", "")),
+            "recommendation": parse_recommendation(result.get("quality_evaluation", {}).get("text", "")),
+            "duplicate_of": result.get("duplicate_of"),
+            "error": result.get("error"),
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        
+        self.counts[status] = self.counts.get(status, 0) + 1
+        if status == "generated":
+            self.tokens += record["prompt_tokens"] + record["completion_tokens"]
+            self.seconds += record["seconds"] or 0.0
+        if record["score"] is not None:
+            self.scores.append(record["score"])
+        return record
+    
+    def summary(self) -> Dict[str, Any]:
+        """Totals of the run so far."""
+        return {
+            "files": sum(self.counts.values()),
+            **self.counts,
+            "estimated_tokens": self.tokens,
+            "llm_seconds": round(self.seconds, 3),
+            "wall_seconds": round(time.perf_counter() - self._start, 3),
+            "average_score": round(sum(self.scores) / len(self.scores), 2) if self.scores else None,
+        }
+    
+    def close(self) -> None:
+        self._file.close()
+
 
-def get_llm():
-    """Initialize the LLM with configuration from environment variables."""
+class TestFileWriter:
+    """
+    Output stage for generated test files.
+    
+    Test files mirror the source layout (``pkg/cli.py`` -> ``<output>/pkg/test_cli.py``),
+    so modules with the same name in different packages do not collide. Files
+    are staged and flushed in batches: each one is written to a temporary file
+    in its target directory and renamed over the destination, so an interrupted
+    run never leaves a partial test file. Unchanged files are not rewritten.
+    """
+    
+    def __init__(self, output_dir: str, batch_size: int = 32):
+        self.output_dir = Path(output_dir)
+        self.batch_size = batch_size
+        self._pending: Dict[Path, str] = {}
+        self._known_dirs = set()
+        # Test file path -> "written" or "unchanged", for every flushed batch
+        self.statuses: Dict[str, str] = {}
+    
+    def test_path(self, original_filename: str) -> Path:
+        """Path of the test file for a source file relative to the scanned directory."""
+        source = Path(original_filename)
+        return self.output_dir / source.parent / f"test_{source.stem}.py"
+    
+    def add(self, test_content: str, original_filename: str) -> Path:
+        """
+        Stage a test file, flushing when the batch is full.
+        
+        Args:
+            test_content: Cleaned test code
+            original_filename: Source path relative to the scanned directory
+            
+        Returns:
+            Path the test file is (or will be) written to
+        """
+        path = self.test_path(original_filename)
+        self._pending[path] = test_content
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return path
+    
+    def _ensure_dir(self, directory: Path) -> None:
+        if directory in self._known_dirs:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        parts = directory.relative_to(self.output_dir).parts
+        if parts:
+            # Mirrored directories are packages so equal test names stay
+            # importable; the output root must be one too, or a mirrored
+            # package would shadow the source package of the same name
+            for depth in range(len(parts) + 1):
+                init_file = self.output_dir.joinpath(*parts[:depth], "__init__.py")
+                if not init_file.exists():
+                    init_file.touch()
+        self._known_dirs.add(directory)
+    
+    @profiled("write")
+    def flush(self) -> Dict[str, str]:
+        """
+        Write every staged file.
+        
+        Returns:
+            Dictionary mapping this batch's test file paths to "written" or "unchanged"
+        """
+        pending, self._pending = self._pending, {}
+        statuses = {}
+        staged = []
+        try:
+            for path, content in pending.items():
+                try:
+                    if path.read_text(encoding='utf-8') == content:
+                        statuses[str(path)] = "unchanged"
+                        continue
+                except (OSError, UnicodeDecodeError):
+                    pass
+                self._ensure_dir(path.parent)
+                fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+                staged.append((tmp_name, path))
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+            # Renames come last so the batch is all-or-nothing on write errors
+            while staged:
+                tmp_name, path = staged.pop(0)
+                os.replace(tmp_name, path)
+                statuses[str(path)] = "written"
+        finally:
+            for tmp_name, _ in staged:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+            self.statuses.update(statuses)
+        return statuses
+
+
+def _env(name: str, cast):
+    """Read an optional typed setting from the environment."""
+    value = os.getenv(name)
+    return cast(value) if value not in (None, "") else None
+
+
+def get_llm(model: Optional[str] = None,
+            temperature: Optional[float] = None,
+            top_p: Optional[float] = None,
+            top_k: Optional[int] = None,
+            max_output_tokens: Optional[int] = None,
+            deterministic: bool = False,
+            cache_dir: Optional[str] = None):
+    """
+    Initialize the LLM with configuration from arguments or environment variables.
+    
+    Arguments take precedence over GEMINI_MODEL, TEMPERATURE, TOP_P, TOP_K,
+    MAX_OUTPUT_TOKENS and GENIUSTEST_DETERMINISTIC.
+    
+    Args:
+        model: Gemini model name
+        temperature: Sampling temperature
+        top_p: Nucleus sampling probability mass
+        top_k: Number of candidate tokens considered at each step
+        max_output_tokens: Maximum length of each response
+        deterministic: Use greedy decoding and cache every response on disk,
+            so identical prompts always produce identical output
+        cache_dir: Directory for the response cache (deterministic mode)
+        
+    Returns:
+        Configured GoogleGenerativeAI instance
+    """
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY environment variable is required")
     
+    deterministic = deterministic or os.getenv("GENIUSTEST_DETERMINISTIC", "").lower() in ("1", "true", "yes")
+    options = {
+        "model": model or os.getenv("GEMINI_MODEL") or DEFAULT_MODEL,
+        "temperature": temperature if temperature is not None else _env("TEMPERATURE", float),
+        "top_p": top_p if top_p is not None else _env("TOP_P", float),
+        "top_k": top_k if top_k is not None else _env("TOP_K", int),
+        "max_output_tokens": max_output_tokens if max_output_tokens is not None else _env("MAX_OUTPUT_TOKENS", int),
+    }
+    
+    if deterministic:
+        options.update(temperature=0.0, top_k=1, n=1)
+        options["cache"] = DiskCache(cache_dir or os.getenv("GENIUSTEST_CACHE_DIR") or DEFAULT_CACHE_DIR)
+    elif options["temperature"] is None:
+        options["temperature"] = DEFAULT_TEMPERATURE
+    
     return GoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        temperature=0.7,
         google_api_key=api_key,
+        **{key: value for key, value in options.items() if value is not None},
     )
 
 class MultiAgentTestGenerator:
     """Multi-agent system for generating comprehensive unit tests."""
     
-    def __init__(self):
-        """Initialize all agents with their specific prompts."""
-        self.llm = get_llm()
+    def __init__(self, llm_config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize all agents with their specific prompts.
+        
+        Args:
+            llm_config: Keyword arguments for get_llm (model, sampling
+                parameters, deterministic mode), plus ``route=True`` to pick
+                the model per file by complexity (see ``ModelRouter``) and
+                ``templates=True`` to test pure numeric files from templates
+                without an LLM call (implied by routing); ``template_style``
+                is "unittest" or "pytest"
+        """
+        self.llm_config = dict(llm_config or {})
+        self.router = ModelRouter() if self.llm_config.pop("route", False) else None
+        self.templates = bool(self.llm_config.pop("templates", False)) or self.router is not None
+        self.template_style = self.llm_config.pop("template_style", None) or "unittest"
+        # Agent texts of directory runs, spilled to disk instead of kept per file
+        self._spill: Optional[TextSpill] = None
+        self.llm = get_llm(**self.llm_config)
+        # Agents per routing tier, built on first use; None is the default model
+        self._agents = {None: self._build_agents(self.llm)}
         self._setup_agents()
     
     def _setup_agents(self):
-        """Setup all specialized agents."""
+        """Expose the default model's agents as attributes."""
+        agents = self._agents[None]
+        self.code_analyzer = agents["code_analyzer"]
+        self.test_specialist = agents["test_specialist"]
+        self.test_generator = agents["test_generator"]
+        self.quality_evaluator = agents["quality_evaluator"]
+    
+    def _agents_for(self, tier: Optional[str]) -> Dict[str, LLMChain]:
+        """Agents running on the model of a routing tier."""
+        if tier == DEFAULT_TIER:
+            return self._agents[None]
+        if tier not in self._agents:
+            llm = get_llm(**{**self.llm_config, "model": self.router.model_for(tier)})
+            self._agents[tier] = self._build_agents(llm)
+        return self._agents[tier]
+    
+    def _model_name(self, tier: Optional[str]) -> Optional[str]:
+        """Model generating a tier's tests; None for template tests."""
+        if tier == TEMPLATE:
+            return None
+        if tier is None or tier == DEFAULT_TIER:
+            return self.llm.model
+        return self.router.model_for(tier)
+    
+    def _next_tier(self, tier: Optional[str]) -> Optional[str]:
+        """Tier to retry a file on after ``tier`` failed, or None."""
+        if tier == TEMPLATE:
+            return FAST if self.router is not None else DEFAULT_TIER
+        return self.router.escalate(tier) if self.router is not None else None
+    
+    def _compact(self, result: Dict[str, Any]) -> FileResult:
+        """Result with its agent texts moved to the spill file."""
+        if isinstance(result, FileResult):
+            return result
+        if self._spill is None:
+            self._spill = TextSpill()
+        return FileResult(result, self._spill)
+    
+    def _build_agents(self, llm: GoogleGenerativeAI) -> Dict[str, LLMChain]:
+        """Build all specialized agents on one model."""
+        agents = {}
         # Agent 1: Code Analyzer
         code_analysis_prompt = PromptTemplate.from_template("""
         Você é um assistente especializado em análise de código Python para geração de testes.
@@ -72,9 +512,13 @@ class MultiAgentTestGenerator:
         Código a analisar:
         {code}
         
+        Assinaturas dos símbolos locais que este código importa (apenas para
+        entender as APIs usadas; não as analise como código a testar):
+        {dependencies}
+        
         Forneça uma análise detalhada focada em identificar exatamente o que precisa ser testado.
         """)
-        self.code_analyzer = LLMChain(llm=self.llm, prompt=code_analysis_prompt)
+        agents["code_analyzer"] = LLMChain(llm=llm, prompt=code_analysis_prompt)
         
         # Agent 2: Test Pattern Specialist
         test_review_prompt = PromptTemplate.from_template("""
@@ -118,7 +562,7 @@ class MultiAgentTestGenerator:
         Testes para avaliar:
         {test_code}
         """)
-        self.test_specialist = LLMChain(llm=self.llm, prompt=test_review_prompt)
+        agents["test_specialist"] = LLMChain(llm=llm, prompt=test_review_prompt)
         
         # Agent 3: Test Generator
         test_gen_prompt = PromptTemplate.from_template("""
@@ -208,9 +652,14 @@ class MultiAgentTestGenerator:
         
         {code}
         
+        Contexto do projeto (caminho de import do módulo e assinaturas dos símbolos
+        locais que ele importa). Use-o para escrever imports corretos e chamar as
+        dependências com as assinaturas reais; não gere testes para elas:
+        {dependencies}
+        
         LEMBRE-SE: Os testes devem ser executáveis e testar o comportamento REAL do código!
         """)
-        self.test_generator = LLMChain(llm=self.llm, prompt=test_gen_prompt)
+        agents["test_generator"] = LLMChain(llm=llm, prompt=test_gen_prompt)
         
         # Agent 4: Quality Evaluator
         quality_eval_prompt = PromptTemplate.from_template("""
@@ -244,9 +693,12 @@ class MultiAgentTestGenerator:
         Testes a avaliar:
         {test_code}
         """)
-        self.quality_evaluator = LLMChain(llm=self.llm, prompt=quality_eval_prompt)
+        agents["quality_evaluator"] = LLMChain(llm=llm, prompt=quality_eval_prompt)
+        return agents
 
-    def read_python_files(self, directory_path: str) -> List[Dict[str, str]]:
+    @staticmethod
+    @profiled("discovery")
+    def read_python_files(directory_path: str) -> List[Dict[str, str]]:
         """
         Read all Python files from a directory.
         
@@ -280,25 +732,88 @@ class MultiAgentTestGenerator:
         
         return python_files
 
-    def generate_tests_for_file(self, file_info: Dict[str, str]) -> Dict[str, Any]:
+    @profiled("generate_file")
+    def generate_tests_for_file(self, file_info: Dict[str, str],
+                                graph: Optional[ImportGraph] = None,
+                                tier: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate tests for a specific file.
         
         Args:
             file_info: Dictionary containing file information
+            graph: Import graph of the source tree, used to attach the
+                signatures of the local modules the file imports
+            tier: Routing tier to use; chosen from the file's complexity
+                when routing is enabled and no tier is given
             
         Returns:
             Dictionary containing analysis results and generated tests
         """
         print(f"📁 Processando arquivo: {file_info['filename']}")
-        return self.generate_tests(file_info['content'])
+        if tier is None:
+            if self.templates and template_units(file_info['content']) is not None:
+                tier = TEMPLATE
+            elif self.router is not None:
+                tier = self.router.tier_for(file_info['content'])
+        if tier == TEMPLATE:
+            result = template_result(file_info['content'], file_info['filename'], self.template_style)
+            if result is not None:
+                print("📐 Testes gerados por template, sem chamada ao LLM")
+                result.update(tier=TEMPLATE, model=None)
+                return result
+            # No case ran without error: let the model write the tests
+            tier = self._next_tier(TEMPLATE)
+        if tier is not None:
+            print(f"🧭 Modelo: {self._model_name(tier)} ({tier})")
+        dependencies = graph.context_for(file_info['filename']) if graph is not None else ""
+        return self.generate_tests(file_info['content'], dependencies, tier)
+    
+    def verify_with_escalation(self, file_info: Dict[str, str], graph: Optional[ImportGraph],
+                               result: Dict[str, Any], write_tests: Callable[[Dict[str, Any]], str],
+                               project_dir: str = ".", pool: Optional[PytestPool] = None,
+                               verification: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Verify a file's tests, regenerating them on stronger tiers while they fail.
+        
+        Args:
+            file_info: File the tests were generated for
+            graph: Import graph of its source tree
+            result: Its test generation result
+            write_tests: Writes a result's tests and returns the test file path
+            project_dir: Directory pytest runs from
+            pool: Warm pytest workers to run the tests in (``uv run pytest`` if None)
+            verification: Outcome of the result's tests if they already ran
+            
+        Returns:
+            The last result, with its "verification" outcome
+        """
+        while True:
+            test_file = write_tests(result)
+            result["verification"] = verification or verify_test_file(test_file, project_dir, pool)
+            verification = None
+            next_tier = self._next_tier(result.get("tier"))
+            if result["verification"]["success"] or next_tier is None:
+                return result
+            print(f"⬆️ Testes de {file_info['filename']} falharam, escalando para {self._model_name(next_tier)}")
+            escalated_from = result.get("tier")
+            start = time.perf_counter()
+            result = self.generate_tests_for_file(file_info, graph, next_tier)
+            result["seconds"] = round(time.perf_counter() - start, 3)
+            result["escalated_from"] = escalated_from
 
-    def process_directory(self, directory_path: str) -> Dict[str, Dict[str, Any]]:
+    def process_directory(self, directory_path: str,
+                          checkpoint: Optional[CheckpointJournal] = None,
+                          on_result: Optional[Callable[[Dict[str, str], Dict[str, Any], str], None]] = None
+                          ) -> Dict[str, Dict[str, Any]]:
         """
         Process all Python files in a directory and generate tests.
         
         Args:
             directory_path: Path to the directory containing Python files
+            checkpoint: Journal receiving each finished file; files it already
+                holds for unchanged content are not generated again
+            on_result: Called as each file completes with its file info, result
+                and status ("generated", "resumed", "duplicate" or "error")
             
         Returns:
             Dictionary mapping filenames to their test generation results
@@ -308,15 +823,47 @@ class MultiAgentTestGenerator:
         
         print(f"🔍 Encontrados {len(python_files)} arquivos Python em {directory_path}")
         
+        # Built once per run; each module's summary is rendered at most once
+        with span("import_graph"):
+            graph = ImportGraph(directory_path, python_files)
+        
+        # Copies of a module (same AST up to formatting and docstrings, and
+        # copies of the local modules it imports) reuse the tests generated for the first one
+        with span("dedup"):
+            duplicates = find_duplicates(python_files, graph)
+        if duplicates:
+            print(f"♻️ {len(duplicates)} arquivos duplicados reutilizarão testes de outro arquivo")
+        
         for file_info in python_files:
-            try:
-                results[file_info['filename']] = self.generate_tests_for_file(file_info)
-            except Exception as e:
-                print(f"❌ Erro ao processar {file_info['filename']}: {e}")
-                results[file_info['filename']] = {"error": str(e)}
+            filename = file_info['filename']
+            completed = checkpoint.completed(filename, file_info['content']) if checkpoint is not None else None
+            if filename in duplicates:
+                print(f"♻️ {filename} é cópia de {duplicates[filename]}")
+                results[filename] = fan_out(results[duplicates[filename]], duplicates[filename], filename)
+                status = "duplicate"
+            elif completed is not None:
+                print(f"⏭️ Retomando do checkpoint: {filename}")
+                results[filename] = self._compact(completed)
+                status = "resumed"
+            else:
+                start = time.perf_counter()
+                try:
+                    results[filename] = self._compact(self.generate_tests_for_file(file_info, graph))
+                    results[filename]["seconds"] = round(time.perf_counter() - start, 3)
+                    status = "generated"
+                    if checkpoint is not None:
+                        checkpoint.record(filename, file_info['content'], results[filename])
+                except Exception as e:
+                    print(f"❌ Erro ao processar {filename}: {e}")
+                    results[filename] = self._compact({"error": str(e),
+                                                       "seconds": round(time.perf_counter() - start, 3)})
+                    status = "error"
+            if on_result is not None:
+                on_result(file_info, results[filename], status)
         
         return results
 
+    @profiled("clean_test_content")
     def clean_test_content(self, test_content: str) -> str:
         """
         Remove markdown code annotations from test content.
@@ -353,126 +900,641 @@ class MultiAgentTestGenerator:
         Returns:
             Path to the created test file
         """
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        
-        # Create test filename: calculator.py -> test_calculator.py
-        base_name = Path(original_filename).stem
-        test_filename = f"test_{base_name}.py"
-        test_file_path = output_path / test_filename
+        writer = TestFileWriter(output_dir)
+        # Create test filename: pkg/calculator.py -> pkg/test_calculator.py
+        test_file_path = writer.add(self.clean_test_content(test_content), original_filename)
         
         try:
-            # Clean the test content to remove markdown annotations
-            clean_content = self.clean_test_content(test_content)
-            
-            with open(test_file_path, 'w', encoding='utf-8') as f:
-                f.write(clean_content)
-            print(f"✅ Test file created: {test_file_path}")
+            status = writer.flush()[str(test_file_path)]
+            if status == "unchanged":
+                print(f"⏭️ Test file unchanged: {test_file_path}")
+            else:
+                print(f"✅ Test file created: {test_file_path}")
             return str(test_file_path)
         except Exception as e:
             print(f"❌ Error writing test file {test_file_path}: {e}")
             raise
 
-    def process_directory_with_output(self, directory_path: str, output_dir: str = "tests") -> Dict[str, Dict[str, Any]]:
+    def process_directory_with_output(self, directory_path: str, output_dir: str = "tests",
+                                      checkpoint: Optional[CheckpointJournal] = None,
+                                      on_result: Optional[Callable[[Dict[str, str], Dict[str, Any], str], None]] = None,
+                                      verify_project_dir: Optional[str] = None,
+                                      verify_workers: int = 0
+                                      ) -> Dict[str, Dict[str, Any]]:
         """
         Process all Python files in a directory and write test files.
         
         Args:
             directory_path: Path to the directory containing Python files
             output_dir: Directory where test files will be written
+            checkpoint: Journal of finished files (see ``process_directory``)
+            on_result: Per-file completion callback (see ``process_directory``)
+            verify_project_dir: If given, run each written test file from this
+                directory; with routing, failing files escalate to stronger models
+            verify_workers: Run the verification in this many warm pytest
+                workers (see ``PytestPool``) instead of a subprocess per file
             
         Returns:
             Dictionary mapping filenames to their test generation results
         """
-        results = self.process_directory(directory_path)
+        results = self.process_directory(directory_path, checkpoint, on_result)
+        writer = TestFileWriter(output_dir)
         
-        for filename, result in results.items():
-            if "error" not in result and "generated_tests" in result:
-                try:
-                    test_content = result["generated_tests"]["text"]
-                    test_file_path = self.write_test_file(test_content, filename, output_dir)
-                    result["test_file_path"] = test_file_path
-                except Exception as e:
-                    print(f"❌ Failed to write test for {filename}: {e}")
-                    result["write_error"] = str(e)
+        staged = {}
+        try:
+            for filename, result in results.items():
+                if "error" not in result and "generated_tests" in result:
+                    test_content = self.clean_test_content(result["generated_tests"]["text"])
+                    staged[filename] = str(writer.add(test_content, filename))
+            writer.flush()
+        except Exception as e:
+            print(f"❌ Failed to write test files: {e}")
+            write_error = str(e)
+        else:
+            write_error = None
+        
+        # Batches flushed before an error are complete; later ones were never renamed
+        for filename, test_file_path in staged.items():
+            if test_file_path in writer.statuses:
+                results[filename]["test_file_path"] = test_file_path
+                results[filename]["write_status"] = writer.statuses[test_file_path]
+            else:
+                results[filename]["write_error"] = write_error or "not written"
+        
+        if verify_project_dir is not None:
+            pool = PytestPool(verify_project_dir, verify_workers) if verify_workers else None
+            try:
+                self._verify_written(directory_path, output_dir, results, verify_project_dir, checkpoint, pool)
+            finally:
+                if pool is not None:
+                    pool.close()
         
         return results
+    
+    def write_result(self, result: Dict[str, Any], filename: str, output_dir: str,
+                     duplicates: Sequence[str] = ()) -> Dict[str, Dict[str, Any]]:
+        """
+        Write the tests of one result and of the duplicates of its file.
+        
+        Args:
+            result: Test generation result; gets its "test_file_path"
+            filename: Source file the tests were generated for
+            output_dir: Directory where test files are written
+            duplicates: Copies of the file that share its tests
+            
+        Returns:
+            Results fanned out to each duplicate
+        """
+        writer = TestFileWriter(output_dir)
+        result["test_file_path"] = str(writer.add(self.clean_test_content(result["generated_tests"]["text"]), filename))
+        fanned = {}
+        for duplicate in duplicates:
+            fanned[duplicate] = fan_out(result, filename, duplicate)
+            fanned[duplicate]["test_file_path"] = str(writer.add(
+                self.clean_test_content(fanned[duplicate]["generated_tests"]["text"]), duplicate))
+        writer.flush()
+        return fanned
+    
+    def _verify_written(self, directory_path: str, output_dir: str, results: Dict[str, Dict[str, Any]],
+                        project_dir: str, checkpoint: Optional[CheckpointJournal] = None,
+                        pool: Optional[PytestPool] = None) -> None:
+        """Verify each written test file, replacing results that had to be escalated."""
+        graph = ImportGraph(directory_path)
+        pending = {filename: result for filename, result in results.items()
+                   if "test_file_path" in result and "duplicate_of" not in result}
+        # With a pool the first run of every file happens concurrently
+        verifications = pool.run_many([result["test_file_path"] for result in pending.values()]) \
+            if pool is not None else {}
+        for filename, result in pending.items():
+            full_path = Path(directory_path) / filename
+            file_info = {'filename': filename, 'full_path': str(full_path),
+                         'content': full_path.read_text(encoding='utf-8')}
+            duplicates = [name for name, other in results.items() if other.get("duplicate_of") == filename]
+            
+            def write_tests(result: Dict[str, Any]) -> str:
+                fanned = self.write_result(result, file_info['filename'], output_dir, duplicates)
+                results.update((name, self._compact(other)) for name, other in fanned.items())
+                return result["test_file_path"]
+            
+            results[filename] = self._compact(self.verify_with_escalation(
+                file_info, graph, result, write_tests, project_dir, pool,
+                verifications.get(result["test_file_path"])))
+            if "escalated_from" in results[filename] and checkpoint is not None:
+                checkpoint.record(filename, file_info['content'], results[filename])
 
-    def generate_tests(self, source_code: str) -> dict:
+    def generate_tests(self, source_code: str, dependencies: str = "", tier: Optional[str] = None) -> dict:
         """
         Orchestrate the multi-agent test generation process.
         
         Args:
             source_code: Python source code as string
+            dependencies: Import path and stubs of the local symbols the code
+                imports (see ``ImportGraph.context_for``)
+            tier: Routing tier whose model runs the agents (default model if None)
             
         Returns:
             Dictionary containing analysis results and generated tests
         """
+        usage = {}
+        agents = self._agents_for(tier)
+        
         print("🔎 Analisando o código...")
-        analysis = self.code_analyzer.invoke({"code": source_code})
+        dependencies = dependencies or "Nenhuma"
+        analysis = self._run_agent("code_analysis", agents["code_analyzer"],
+                                   {"code": source_code, "dependencies": dependencies}, usage)
 
         print("🛠️ Gerando testes...")
-        generated_tests = self.test_generator.invoke({"code": source_code})
+        generated_tests = self._run_agent("generated_tests", agents["test_generator"],
+                                          {"code": source_code, "dependencies": dependencies}, usage)
 
         print("🧪 Avaliando padrões de teste...")
-        pattern_evaluation = self.test_specialist.invoke({
+        pattern_evaluation = self._run_agent("pattern_evaluation", agents["test_specialist"], {
             "test_code": generated_tests.get('text', '')
-        })
+        }, usage)
 
         print("📈 Avaliando qualidade dos testes...")
-        quality_evaluation = self.quality_evaluator.invoke({
+        quality_evaluation = self._run_agent("quality_evaluation", agents["quality_evaluator"], {
             "test_code": generated_tests.get('text', '')
-        })
+        }, usage)
 
         return {
             "code_analysis": analysis,
             "generated_tests": generated_tests,
             "pattern_evaluation": pattern_evaluation,
             "quality_evaluation": quality_evaluation,
+            "usage": usage,
+            "tier": tier,
+            "model": self._model_name(tier),
         }
 
+    def _run_agent(self, name: str, chain: LLMChain, inputs: Dict[str, str],
+                   usage: Dict[str, Dict[str, Any]]) -> dict:
+        """Invoke one agent, recording its wall time and estimated token counts."""
+        start = time.perf_counter()
+        with span(f"agent.{name}"):
+            output = chain.invoke(inputs)
+        usage[name] = {
+            "seconds": round(time.perf_counter() - start, 3),
+            "prompt_tokens": estimate_tokens(chain.prompt.format(**inputs)),
+            "completion_tokens": estimate_tokens(output.get('text', '')),
+        }
+        return output
+
+
+# Generators shared by the module-level helpers, one per LLM configuration.
+# Reusing them skips rebuilding the LLM and its four chains, and keeps the
+# model client's connection open between calls.
+_GENERATORS: Dict[str, MultiAgentTestGenerator] = {}
+_GENERATORS_LOCK = threading.Lock()
+
+
+def get_generator(llm_config: Optional[Dict[str, Any]] = None) -> MultiAgentTestGenerator:
+    """
+    Return the shared generator for an LLM configuration, creating it on first use.
+    
+    Args:
+        llm_config: Keyword arguments for get_llm (unset values are ignored)
+        
+    Returns:
+        The generator shared by every caller with the same configuration
+    """
+    config = {key: value for key, value in (llm_config or {}).items() if value is not None}
+    key = json.dumps(config, sort_keys=True, default=str)
+    with _GENERATORS_LOCK:
+        generator = _GENERATORS.get(key)
+        if generator is None:
+            generator = _GENERATORS[key] = MultiAgentTestGenerator(config)
+    return generator
+
 
-def generate_tests_for_code(source_code: str) -> dict:
+def generate_tests_for_code(source_code: str, llm_config: Optional[Dict[str, Any]] = None,
+                            dependencies: str = "") -> dict:
     """
     Convenience function to generate tests for given source code.
     
     Args:
         source_code: Python source code as string
+        llm_config: Keyword arguments for get_llm
+        dependencies: Stubs of the local symbols the code imports
         
     Returns:
         Dictionary containing analysis results and generated tests
     """
-    generator = MultiAgentTestGenerator()
-    return generator.generate_tests(source_code)
+    generator = get_generator(llm_config)
+    return generator.generate_tests(source_code, dependencies)
 
 
-def process_directory(directory_path: str) -> Dict[str, Dict[str, Any]]:
+def process_directory(directory_path: str, llm_config: Optional[Dict[str, Any]] = None,
+                      checkpoint: Optional[CheckpointJournal] = None,
+                      on_result: Optional[Callable[[Dict[str, str], Dict[str, Any], str], None]] = None
+                      ) -> Dict[str, Dict[str, Any]]:
     """
     Convenience function to process all Python files in a directory.
     
     Args:
         directory_path: Path to the directory containing Python files
+        llm_config: Keyword arguments for get_llm
+        checkpoint: Journal of finished files, used to resume interrupted runs
+        on_result: Called as each file completes (e.g. ``RunReport.record``)
         
     Returns:
         Dictionary mapping filenames to their test generation results
     """
-    generator = MultiAgentTestGenerator()
-    return generator.process_directory(directory_path)
+    generator = get_generator(llm_config)
+    return generator.process_directory(directory_path, checkpoint, on_result)
 
 
-def process_directory_with_output(directory_path: str, output_dir: str = "tests") -> Dict[str, Dict[str, Any]]:
+def process_directory_with_output(directory_path: str, output_dir: str = "tests",
+                                  llm_config: Optional[Dict[str, Any]] = None,
+                                  checkpoint: Optional[CheckpointJournal] = None,
+                                  on_result: Optional[Callable[[Dict[str, str], Dict[str, Any], str], None]] = None,
+                                  verify_project_dir: Optional[str] = None,
+                                  verify_workers: int = 0
+                                  ) -> Dict[str, Dict[str, Any]]:
     """
     Convenience function to process directory and write test files.
     
     Args:
         directory_path: Path to the directory containing Python files
         output_dir: Directory where test files will be written
+        llm_config: Keyword arguments for get_llm
+        checkpoint: Journal of finished files, used to resume interrupted runs
+        on_result: Called as each file completes (e.g. ``RunReport.record``)
+        verify_project_dir: Verify each written file from this directory,
+            escalating failures when routing is enabled
+        verify_workers: Warm pytest workers for the verification (0 runs
+            ``uv run pytest`` per file)
         
     Returns:
         Dictionary mapping filenames to their test generation results
     """
-    generator = MultiAgentTestGenerator()
-    return generator.process_directory_with_output(directory_path, output_dir)
+    generator = get_generator(llm_config)
+    return generator.process_directory_with_output(directory_path, output_dir, checkpoint, on_result,
+                                                   verify_project_dir, verify_workers)
+
+def verify_generated_tests(test_dir: str, source_dir: str, project_dir: str = ".") -> Dict[str, Any]:
+    """
+    Run generated tests, re-running only those impacted by source changes.
+
+    Args:
+        test_dir: Directory containing the generated test files
+        source_dir: Source directory measured for per-test coverage
+        project_dir: Directory pytest runs from
+
+    Returns:
+        Dictionary with exit code, success flag and the selected tests
+        (None when the whole directory was run)
+    """
+    project_path = Path(project_dir).resolve()
+    test_path = Path(test_dir).resolve()
+    data_file = project_path / VERIFY_COVERAGE_FILE
+    map_path = project_path / VERIFY_IMPACT_MAP_FILE
+
+    selection = ImpactMap.load(map_path).select(project_path, [test_path])
+    if selection is not None and not selection["tests"]:
+        print("✅ Nenhum teste impactado pelas mudanças, verificação ignorada")
+        return {"exit_code": 0, "success": True, "selected_tests": []}
+
+    cmd = [
+        "uv", "run",
+        "pytest",
+        "-q",
+        f"--cov={Path(source_dir).resolve()}",
+        "--cov-context=test",
+        "--cov-report=",
+        # Node ids must be relative to the project, like the impact map's paths
+        f"--rootdir={project_path}",
+    ]
+    if selection is None:
+        print(f"🧪 Verificando todos os testes em {test_dir}...")
+        cmd.append(str(test_path))
+    else:
+        print(f"🧪 Verificando {len(selection['tests'])} teste(s) impactado(s)...")
+        purge_sources(data_file, project_path, selection["changed_sources"])
+        cmd.append("--cov-append")
+        cmd.extend(selection["tests"])
+
+    try:
+        with span("pytest", tests=len(selection["tests"]) if selection is not None else None):
+            result = subprocess.run(
+                cmd,
+                cwd=project_path,
+                capture_output=True,
+                text=True,
+                timeout=300,
+                env={**os.environ, "COVERAGE_FILE": str(data_file)},
+            )
+    except subprocess.TimeoutExpired:
+        return {"error": "Verification timed out", "success": False}
+
+    # Only a passing run may become the baseline: otherwise the next run with no
+    # changes would select nothing and report the failing tests as passing
+    if data_file.exists() and result.returncode == 0:
+        try:
+            with span("impact_map"):
+                ImpactMap.from_coverage(project_path, data_file, [test_path]).save(map_path)
+        except Exception as e:
+            print(f"⚠️ Não foi possível atualizar o mapa de impacto: {e}")
+
+    return {
+        "exit_code": result.returncode,
+        "success": result.returncode == 0,
+        "selected_tests": None if selection is None else selection["tests"],
+        "output": result.stdout,
+    }
+
+
+@profiled("pytest")
+def verify_test_file(test_file: str, project_dir: str = ".",
+                     pool: Optional[PytestPool] = None) -> Dict[str, Any]:
+    """
+    Run a single generated test file.
+
+    Args:
+        test_file: Test file to run
+        project_dir: Directory pytest runs from
+        pool: Warm pytest workers of ``project_dir``; without one, the file
+            runs in a ``uv run pytest`` subprocess
+
+    Returns:
+        Dictionary with exit code, success flag and the tail of pytest's output
+        (plus per-test outcomes and durations when run in the pool)
+    """
+    if pool is not None:
+        return pool.run(test_file)
+    try:
+        result = subprocess.run(
+            ["uv", "run", "pytest", "-q", f"--rootdir={Path(project_dir).resolve()}", str(Path(test_file).resolve())],
+            cwd=Path(project_dir).resolve(),
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+    except subprocess.TimeoutExpired:
+        return {"error": "Verification timed out", "success": False}
+    return {"exit_code": result.returncode, "success": result.returncode == 0, "output": result.stdout[-2000:]}
+
+
+def enqueue_directory(directory_path: str, output_dir: str = "tests",
+                      queue_path: str = DEFAULT_QUEUE_FILE) -> Dict[str, int]:
+    """
+    Queue one generation job per source file of a directory.
+
+    Duplicated files are attached to their representative's job, which
+    writes their tests too. Files already done with unchanged content are
+    not queued again.
+
+    Args:
+        directory_path: Path to the directory containing Python files
+        output_dir: Directory where workers write test files
+        queue_path: Queue database
+
+    Returns:
+        Number of jobs per status after queueing, plus "queued" for this call
+    """
+    directory = Path(directory_path).resolve()
+    python_files = MultiAgentTestGenerator.read_python_files(str(directory))
+    duplicates = find_duplicates(python_files, ImportGraph(str(directory), python_files))
+
+    jobs = {}
+    for file_info in python_files:
+        if file_info['filename'] not in duplicates:
+            jobs[file_info['filename']] = {
+                "directory": str(directory),
+                "filename": file_info['filename'],
+                "output_dir": str(Path(output_dir).resolve()),
+                "duplicates": [],
+                "hash": CheckpointJournal.content_hash(file_info['content']),
+            }
+    for duplicate, representative in duplicates.items():
+        jobs[representative]["duplicates"].append(duplicate)
+
+    queue = JobQueue(queue_path)
+    try:
+        queued = queue.enqueue(
+            (str(directory / filename), payload["hash"], payload) for filename, payload in jobs.items()
+        )
+        return {**queue.counts(), "queued": queued}
+    finally:
+        queue.close()
+
+
+def _run_job(generator: "MultiAgentTestGenerator", payload: Dict[str, Any], graphs: Dict[str, ImportGraph],
+             verify: bool, project_dir: str, pool: Optional[PytestPool] = None) -> Dict[str, Any]:
+    """Generate, write and optionally verify the tests of one queued file."""
+    directory = payload["directory"]
+    if directory not in graphs:
+        graphs[directory] = ImportGraph(directory)
+    full_path = Path(directory) / payload["filename"]
+    file_info = {
+        'filename': payload["filename"],
+        'full_path': str(full_path),
+        'content': full_path.read_text(encoding='utf-8'),
+    }
+
+    start = time.perf_counter()
+    result = generator.generate_tests_for_file(file_info, graphs[directory])
+    result["seconds"] = round(time.perf_counter() - start, 3)
+
+    def write_tests(result: Dict[str, Any]) -> str:
+        generator.write_result(result, payload["filename"], payload["output_dir"], payload["duplicates"])
+        return result["test_file_path"]
+
+    if not verify:
+        write_tests(result)
+    else:
+        result = generator.verify_with_escalation(file_info, graphs[directory], result, write_tests,
+                                                  project_dir, pool)
+        if not result["verification"]["success"]:
+            # Failing tests are regenerated while the job has attempts left
+            raise RuntimeError(result["verification"].get(
+                "error", f"Generated tests failed (exit code {result['verification'].get('exit_code')})"))
+    return result
+
+
+def run_worker(queue_path: str = DEFAULT_QUEUE_FILE, llm_config: Optional[Dict[str, Any]] = None,
+               verify: bool = False, project_dir: str = ".", max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+               poll_seconds: float = 2.0, verify_workers: int = 0) -> Dict[str, int]:
+    """
+    Claim and process queued jobs until none are pending or leased.
+
+    Args:
+        queue_path: Queue database
+        llm_config: Keyword arguments for get_llm
+        verify: Run each written test file and retry the job if it fails
+        project_dir: Directory pytest runs from when verifying
+        max_attempts: Attempts per job before it is marked failed
+        poll_seconds: Wait between claims while other workers hold leases
+        verify_workers: Keep warm pytest workers for verification instead of
+            starting ``uv run pytest`` per job (jobs run one at a time, so
+            one worker is enough)
+
+    Returns:
+        Number of jobs this worker completed and failed
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue(queue_path, max_attempts=max_attempts)
+    generator = get_generator(llm_config)
+    graphs: Dict[str, ImportGraph] = {}
+    processed = {"completed": 0, "failed": 0}
+    pool = PytestPool(project_dir, verify_workers) if verify and verify_workers else None
+
+    try:
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                counts = queue.counts()
+                if not counts[PENDING] and not counts[LEASED]:
+                    break
+                # Leases held elsewhere may still expire or be retried
+                time.sleep(poll_seconds)
+                continue
+
+            print(f"👷 [{worker_id}] {job['payload']['filename']} (tentativa {job['attempts']})")
+            try:
+                with queue.keep_alive(job["id"], worker_id):
+                    result = _run_job(generator, job["payload"], graphs, verify, project_dir, pool)
+            except Exception as e:
+                print(f"❌ [{worker_id}] Erro em {job['payload']['filename']}: {e}")
+                queue.fail(job["id"], worker_id, str(e))
+                processed["failed"] += 1
+            else:
+                queue.complete(job["id"], worker_id, result)
+                processed["completed"] += 1
+    finally:
+        queue.close()
+        if pool is not None:
+            pool.close()
+    return processed
+
+
+def run_workers(workers: int, queue_path: str = DEFAULT_QUEUE_FILE, **worker_options: Any) -> Dict[str, int]:
+    """
+    Run ``workers`` worker processes against a queue and wait for them.
+
+    Args:
+        workers: Number of processes (1 runs in the current process)
+        queue_path: Queue database
+        worker_options: Keyword arguments for run_worker
+
+    Returns:
+        Number of jobs per status once the workers finish
+    """
+    if workers <= 1:
+        run_worker(queue_path, **worker_options)
+    else:
+        # Spawned rather than forked: the model client's gRPC channels are not fork-safe
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=run_worker, args=(queue_path,), kwargs=worker_options)
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    queue = JobQueue(queue_path)
+    try:
+        return queue.counts()
+    finally:
+        queue.close()
+
+
+def watch_directory(directory_path: str, output_dir: str = "tests",
+                    llm_config: Optional[Dict[str, Any]] = None,
+                    verify_project_dir: Optional[str] = None, verify_workers: int = 0,
+                    debounce: float = DEFAULT_DEBOUNCE, use_events: bool = True) -> None:
+    """
+    Regenerate tests as the files of a directory are edited, until interrupted.
+
+    Each edited file is diffed against its previous version: only the added
+    or edited functions go to the agents and their tests are merged into the
+    existing test file. Edits outside functions, and files without a test
+    file yet, regenerate the whole file. The generator, its response cache
+    and the pytest workers stay warm between edits.
+
+    Args:
+        directory_path: Path to the directory containing Python files
+        output_dir: Directory where test files are written
+        llm_config: Keyword arguments for get_llm
+        verify_project_dir: If given, run each updated test file from this directory
+        verify_workers: Warm pytest workers for the verification (0 runs
+            ``uv run pytest`` per file)
+        debounce: Quiet period, in seconds, that ends a burst of saves
+        use_events: Use filesystem events when ``watchdog`` is installed
+    """
+    generator = get_generator(llm_config)
+    sources = {file_info['filename']: file_info['content']
+               for file_info in MultiAgentTestGenerator.read_python_files(directory_path)}
+    watcher = SourceWatcher(directory_path, ignore=[output_dir], debounce=debounce, use_events=use_events)
+    writer = TestFileWriter(output_dir)
+    pool = PytestPool(verify_project_dir, verify_workers) if verify_project_dir is not None and verify_workers else None
+    
+    mode = "eventos do sistema de arquivos" if watcher.watchdog is not None else "polling"
+    print(f"👀 Observando {directory_path} ({mode}), testes em {output_dir}; Ctrl+C para sair")
+    try:
+        for batch in watcher.changes():
+            graph = ImportGraph(directory_path)
+            for filename in sorted(batch):
+                full_path = Path(directory_path) / filename
+                try:
+                    content = full_path.read_text(encoding='utf-8')
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"⚠️ Erro ao ler arquivo {full_path}: {e}")
+                    continue
+                previous = sources.get(filename)
+                if content == previous:
+                    continue
+                
+                test_path = writer.test_path(filename)
+                names = None
+                # Template tests cost no LLM call, so template files are always regenerated whole
+                if previous is not None and test_path.exists() and not (
+                        generator.templates and template_units(content) is not None):
+                    names = changed_units(previous, content)
+                    if names == []:
+                        print(f"⏭️ {filename}: nenhuma função alterada")
+                        sources[filename] = content
+                        continue
+                if names:
+                    print(f"✏️ {filename}: regenerando {', '.join(names)}")
+                
+                file_info = {'filename': filename, 'full_path': str(full_path),
+                             'content': focus_source(content, names) if names else content}
+                try:
+                    result = generator.generate_tests_for_file(file_info, graph)
+                    tests = generator.clean_test_content(result["generated_tests"]["text"])
+                    if names:
+                        tests = merge_tests(test_path.read_text(encoding='utf-8'), tests)
+                    writer.add(tests, filename)
+                    status = writer.flush()[str(test_path)]
+                except Exception as e:
+                    # The previous version stays the baseline, so the next save retries these functions
+                    print(f"❌ Erro ao processar {filename}: {e}")
+                    continue
+                sources[filename] = content
+                print(f"✅ {test_path} ({'atualizado' if status == 'written' else 'inalterado'})")
+                
+                if verify_project_dir is not None:
+                    report_verification(verify_test_file(str(test_path), verify_project_dir, pool))
+    except KeyboardInterrupt:
+        print("\n👋 Modo watch encerrado")
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def report_verification(verification: Dict[str, Any]) -> None:
+    """Print the outcome of a generated-test verification run."""
+    if "error" in verification:
+        print(f"❌ Erro na verificação: {verification['error']}")
+    elif verification["success"]:
+        print("✅ Testes gerados verificados com sucesso")
+    else:
+        print(f"❌ Testes gerados falharam (exit code {verification['exit_code']})")
+        print(verification.get("output", ""))
+
 
 def main():
     """Main function with command line argument support."""
@@ -498,47 +1560,296 @@ def main():
         action="store_true",
         help="Write generated tests to files"
     )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Run the written tests, re-running only those impacted by source changes"
+    )
+    parser.add_argument(
+        "--project-dir",
+        type=str,
+        default=".",
+        help="Directory pytest runs from when verifying (default: .)"
+    )
+    parser.add_argument(
+        "--verify-workers",
+        type=int,
+        default=0,
+        help="Verify each written file in this many warm pytest processes of the project "
+             "environment instead of a uv run pytest subprocess (default: 0)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=DEFAULT_CHECKPOINT_FILE,
+        help=f"Journal of finished files for directory runs (default: {DEFAULT_CHECKPOINT_FILE})"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip files already completed in the checkpoint journal with unchanged content"
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        help="Stream one JSON-lines record per file to this path and print only a summary"
+    )
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="Queue one job per file of --directory in the job queue"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Watch --directory and regenerate the tests of edited functions into --output "
+             "until interrupted; with --verify, run each updated test file"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help=f"Seconds without saves that end a burst of edits in --watch (default: {DEFAULT_DEBOUNCE})"
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll modification times in --watch even if watchdog is installed"
+    )
+    parser.add_argument(
+        "--consolidate",
+        action="store_true",
+        help="After writing a directory's tests, move shared setUps to conftest.py fixtures, "
+             "remove duplicate tests and parametrize literal-only variants"
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Process queued jobs: generate, write to --output and, with --verify, run the tests"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for --worker (default: 1)"
+    )
+    parser.add_argument(
+        "--queue",
+        type=str,
+        default=DEFAULT_QUEUE_FILE,
+        help=f"Job queue database, can live on a shared filesystem (default: {DEFAULT_QUEUE_FILE})"
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"Attempts per queued job before it is marked failed (default: {DEFAULT_MAX_ATTEMPTS})"
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        help=f"Gemini model to use (default: GEMINI_MODEL or {DEFAULT_MODEL})"
+    )
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        help=f"Sampling temperature (default: TEMPERATURE or {DEFAULT_TEMPERATURE})"
+    )
+    parser.add_argument(
+        "--top-p",
+        type=float,
+        help="Nucleus sampling probability mass (default: TOP_P)"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        help="Number of candidate tokens per step (default: TOP_K)"
+    )
+    parser.add_argument(
+        "--max-output-tokens",
+        type=int,
+        help="Maximum tokens per response (default: MAX_OUTPUT_TOKENS)"
+    )
+    parser.add_argument(
+        "--route",
+        action="store_true",
+        help="Route each file to GEMINI_FAST_MODEL or GEMINI_STRONG_MODEL by AST complexity; "
+             "with --verify, files whose tests fail are escalated to the stronger model"
+    )
+    parser.add_argument(
+        "--templates",
+        action="store_true",
+        help="Test files of pure numeric functions from templates, without an LLM call "
+             "(always on with --route); with --verify, failing files go to the model"
+    )
+    parser.add_argument(
+        "--template-style",
+        choices=["unittest", "pytest"],
+        help="Style of template tests: subTest tables or pytest.mark.parametrize (default: unittest)"
+    )
+    parser.add_argument(
+        "--deterministic",
+        action="store_true",
+        help="Greedy decoding with on-disk response cache for reproducible output"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help=f"Response cache directory for --deterministic (default: {DEFAULT_CACHE_DIR})"
+    )
     parser.add_argument(
         "--example",
         action="store_true",
         help="Run with example code"
     )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        metavar="PATH",
+        help="Profile the run: Chrome trace of the pipeline stages (.json) or cProfile dump (.prof)"
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=DEFAULT_TOP,
+        help=f"Entries in the printed profile summary (default: {DEFAULT_TOP})"
+    )
     
     args = parser.parse_args()
+    with profiling(args.profile, args.profile_top):
+        run(parser, args)
+
+
+def run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Run the mode selected on the command line."""
+    llm_config = {
+        "model": args.model,
+        "temperature": args.temperature,
+        "top_p": args.top_p,
+        "top_k": args.top_k,
+        "max_output_tokens": args.max_output_tokens,
+        "deterministic": args.deterministic,
+        "cache_dir": args.cache_dir,
+        "route": args.route or None,
+        "templates": args.templates or None,
+        "template_style": args.template_style,
+    }
+    # Routing and templates verify file by file so failures can be escalated individually;
+    # the warm pytest pool runs files one by one as well
+    verify_each = (args.route or args.templates or args.verify_workers > 0) and args.verify and args.write_files
+    
+    if args.watch:
+        if not args.directory:
+            parser.error("--watch requires --directory")
+        watch_directory(args.directory, args.output, llm_config,
+                        args.project_dir if args.verify else None, args.verify_workers,
+                        args.debounce, use_events=not args.poll)
     
-    if args.directory:
+    elif args.enqueue or args.worker:
+        if args.enqueue:
+            if not args.directory:
+                parser.error("--enqueue requires --directory")
+            counts = enqueue_directory(args.directory, args.output, args.queue)
+            print(f"📥 {counts['queued']} job(s) enfileirado(s) em {args.queue} "
+                  f"({counts[PENDING]} pendentes, {counts[DONE]} concluídos)")
+        if args.worker:
+            print(f"👷 Iniciando {args.workers} worker(s) na fila {args.queue}")
+            counts = run_workers(args.workers, args.queue, llm_config=llm_config, verify=args.verify,
+                                 project_dir=args.project_dir, max_attempts=args.max_attempts,
+                                 verify_workers=args.verify_workers)
+            print(f"\n📊 Fila: {counts[DONE]} concluídos, {counts[FAILED]} falharam, "
+                  f"{counts[PENDING] + counts[LEASED]} restantes")
+            if counts[FAILED]:
+                queue = JobQueue(args.queue)
+                for key, status, _, error in queue.results():
+                    if status == FAILED:
+                        print(f"❌ {key}: {error}")
+                queue.close()
+    
+    elif args.directory:
         print(f"--- Processando diretório: {args.directory} ---")
         
-        if args.write_files:
-            print(f"📝 Escrevendo arquivos de teste em: {args.output}")
-            results = process_directory_with_output(args.directory, args.output)
+        checkpoint = CheckpointJournal(args.checkpoint, resume=args.resume)
+        if args.resume:
+            print(f"♻️ Retomando execução: {len(checkpoint.entries)} arquivos no checkpoint {args.checkpoint}")
+        report = RunReport(args.report, args.output if args.write_files else None) if args.report else None
+        on_result = report.record if report is not None else None
+        try:
+            if args.write_files:
+                print(f"📝 Escrevendo arquivos de teste em: {args.output}")
+                results = process_directory_with_output(args.directory, args.output, llm_config,
+                                                         checkpoint, on_result,
+                                                         args.project_dir if verify_each else None,
+                                                         args.verify_workers)
+            else:
+                results = process_directory(args.directory, llm_config, checkpoint, on_result)
+        finally:
+            checkpoint.close()
+            if report is not None:
+                report.close()
+        
+        if args.write_files and args.consolidate:
+            consolidated = consolidate_tests(args.output)
+            print(f"🧹 Consolidação: {consolidated['fixtures']} fixtures compartilhadas, "
+                  f"{consolidated['duplicates']} testes duplicados removidos, "
+                  f"{consolidated['merged_tests']} testes unidos em {consolidated['parametrized']} parametrizados "
+                  f"({consolidated['files']} arquivos alterados, {consolidated['deleted_files']} removidos)")
+        
+        if report is not None:
+            # Per-file details are in the report; the console only gets totals
+            summary = report.summary()
+            write_errors = sum(1 for result in results.values() if "write_error" in result)
+            print(f"\n📊 Resumo: {summary['files']} arquivos "
+                  f"({summary['generated']} gerados, {summary['resumed']} retomados, "
+                  f"{summary['duplicate']} duplicados, {summary['error']} com erro)")
+            print(f"⏱️ Tempo total: {summary['wall_seconds']}s (LLM: {summary['llm_seconds']}s)")
+            print(f"🧮 Tokens estimados: {summary['estimated_tokens']}")
+            if summary['average_score'] is not None:
+                print(f"⭐ Nota média: {summary['average_score']}/10")
+            if write_errors:
+                print(f"❌ Falhas ao escrever testes: {write_errors}")
+            print(f"📝 Relatório: {args.report}")
         else:
-            results = process_directory(args.directory)
-        
-        for filename, result in results.items():
-            print(f"\n{'='*60}")
-            print(f"📁 ARQUIVO: {filename}")
-            print('='*60)
-            
-            if "error" in result:
-                print(f"❌ Erro: {result['error']}")
-                continue
-            
-            if args.write_files and "test_file_path" in result:
-                print(f"✅ Arquivo de teste criado: {result['test_file_path']}")
-            
-            if not args.write_files:  # Only show full output if not writing files
-                print("\n## Análise do Código:")
-                print(result["code_analysis"]["text"])
+            for filename, result in results.items():
+                print(f"\n{'='*60}")
+                print(f"📁 ARQUIVO: {filename}")
+                print('='*60)
                 
-                print("\n## Testes Gerados:")
-                print(result["generated_tests"]["text"])
+                if "error" in result:
+                    print(f"❌ Erro: {result['error']}")
+                    continue
                 
-                print("\n## Avaliação de Padrões:")
-                print(result["pattern_evaluation"]["text"])
+                if args.write_files and "test_file_path" in result:
+                    if result.get("write_status") == "unchanged":
+                        print(f"⏭️ Arquivo de teste inalterado: {result['test_file_path']}")
+                    else:
+                        print(f"✅ Arquivo de teste criado: {result['test_file_path']}")
+                elif args.write_files and "write_error" in result:
+                    print(f"❌ Erro ao escrever teste: {result['write_error']}")
                 
-                print("\n## Avaliação de Qualidade:")
-                print(result["quality_evaluation"]["text"])
+                if not args.write_files:  # Only show full output if not writing files
+                    print("\n## Análise do Código:")
+                    print(result["code_analysis"]["text"])
+                
+                    print("\n## Testes Gerados:")
+                    print(result["generated_tests"]["text"])
+                
+                    print("\n## Avaliação de Padrões:")
+                    print(result["pattern_evaluation"]["text"])
+                
+                    print("\n## Avaliação de Qualidade:")
+                    print(result["quality_evaluation"]["text"])
+        
+        if verify_each:
+            verified = [result for result in results.values() if "verification" in result]
+            failed = sum(1 for result in verified if not result["verification"]["success"])
+            escalated = sum(1 for result in verified if "escalated_from" in result)
+            print(f"\n🧪 Verificação por arquivo: {len(verified) - failed} aprovados, {failed} falharam, "
+                  f"{escalated} escalados")
+        elif args.write_files and args.verify:
+            report_verification(
+                verify_generated_tests(args.output, args.directory, args.project_dir)
+            )
     
     elif args.file:
         print(f"--- Processando arquivo: {args.file} ---")
@@ -546,10 +1857,13 @@ def main():
             with open(args.file, 'r', encoding='utf-8') as f:
                 code = f.read()
             
-            results = generate_tests_for_code(code)
+            # The file's directory is taken as the source root for its imports
+            file_path = Path(args.file)
+            graph = ImportGraph(str(file_path.parent))
+            results = generate_tests_for_code(code, llm_config, graph.context_for(file_path.name))
             
             if args.write_files:
-                generator = MultiAgentTestGenerator()
+                generator = get_generator(llm_config)
                 filename = Path(args.file).name
                 test_file_path = generator.write_test_file(
                     results["generated_tests"]["text"], 
@@ -557,6 +1871,11 @@ def main():
                     args.output
                 )
                 print(f"✅ Arquivo de teste criado: {test_file_path}")
+                
+                if args.verify:
+                    report_verification(
+                        verify_generated_tests(args.output, str(Path(args.file).parent), args.project_dir)
+                    )
             else:
                 print("\n## Análise do Código:")
                 print(results["code_analysis"]["text"])
@@ -591,7 +1910,7 @@ def calculate_factorial(n):
         return result
 """
         
-        results = generate_tests_for_code(example_code)
+        results = generate_tests_for_code(example_code, llm_config)
         
         print("\n## Code Analysis:")
         print(results["code_analysis"]["text"])
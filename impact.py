@@ -0,0 +1,268 @@
+"""
+Test Impact Analysis
+
+Maps every function of the measured source files to the tests that execute
+it, using per-test coverage contexts (``pytest --cov-context=test``). The map
+is stored between runs so that, when only function bodies change, just the
+tests that cover the edited files (plus new or edited test files) need to
+run again.
+"""
+
+import ast
+import copy
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Set, Tuple
+
+IMPACT_MAP_FILE = ".impact_map.json"
+MODULE_UNIT = "<module>"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def iter_units(tree: ast.Module) -> Iterable[Tuple[str, ast.AST]]:
+    """Yield (qualified name, node) for module functions and class methods."""
+    def visit(body, prefix):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                yield f"{prefix}{node.name}", node
+            elif isinstance(node, ast.ClassDef):
+                yield from visit(node.body, f"{prefix}{node.name}.")
+
+    yield from visit(tree.body, "")
+
+
+class _StripFunctionBodies(ast.NodeTransformer):
+    """Replace function bodies so only module-level structure remains."""
+
+    def visit_FunctionDef(self, node):
+        node.body = [ast.Pass()]
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+def unit_hashes(source: str) -> Dict[str, str]:
+    """
+    Hash every function of a module independently of formatting.
+
+    Args:
+        source: Python source code
+
+    Returns:
+        Dictionary mapping qualified function names to AST hashes, plus a
+        ``<module>`` entry covering everything outside function bodies
+    """
+    tree = ast.parse(source)
+    hashes = {name: _digest(ast.dump(node)) for name, node in iter_units(tree)}
+    skeleton = _StripFunctionBodies().visit(copy.deepcopy(tree))
+    hashes[MODULE_UNIT] = _digest(ast.dump(skeleton))
+    return hashes
+
+
+def _line_units(source: str) -> Dict[int, str]:
+    """Map each executable body line to the function that owns it."""
+    owners = {}
+    for name, node in iter_units(ast.parse(source)):
+        # The ``def`` line itself runs at import time and belongs to the module
+        for line in range(node.body[0].lineno, node.end_lineno + 1):
+            owners[line] = name
+    return owners
+
+
+def _test_id(context: str) -> str:
+    """Turn a pytest-cov context such as ``tests/t.py::T::test_a|run`` into a node id."""
+    return context.rsplit("|", 1)[0]
+
+
+def _relative(path: Path, root: Path) -> str:
+    """Return ``path`` relative to ``root`` when possible, as a posix string."""
+    try:
+        return path.relative_to(root).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def find_test_files(test_dir: Path) -> List[Path]:
+    """Find test files using the same patterns as pytest's defaults."""
+    files = set(test_dir.rglob("test_*.py")) | set(test_dir.rglob("*_test.py"))
+    return sorted(path for path in files if "__pycache__" not in path.parts)
+
+
+class ImpactMap:
+    """Source-function to test mapping built from per-test coverage contexts."""
+
+    def __init__(self, sources: Optional[Dict[str, Any]] = None, tests: Optional[Dict[str, str]] = None):
+        # {relative source path: {"hash": file hash, "units": {name: {"hash", "tests"}}}}
+        self.sources = sources or {}
+        # {relative test file path: file hash}
+        self.tests = tests or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "ImpactMap":
+        """Load a stored map, returning an empty one if missing or unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(data.get("sources"), data.get("tests"))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path: Path) -> None:
+        """Persist the map as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"sources": self.sources, "tests": self.tests}, f)
+
+    @classmethod
+    def from_coverage(cls, project_path: Path, data_file: Path, test_dirs: List[Path]) -> "ImpactMap":
+        """
+        Build a map from a coverage data file recorded with test contexts.
+
+        Args:
+            project_path: Directory pytest ran from, passed as its
+                ``--rootdir`` so the node ids of the contexts are relative to it
+            data_file: Coverage data file (usually ``.coverage``)
+            test_dirs: Directories whose test files are tracked for changes
+
+        Returns:
+            The new impact map
+        """
+        # Imported lazily so callers without coverage installed can still load maps
+        from coverage import CoverageData
+
+        project_path = Path(project_path).resolve()
+        data = CoverageData(basename=str(data_file))
+        data.read()
+
+        sources = {}
+        for measured in data.measured_files():
+            path = Path(measured)
+            try:
+                relative = path.resolve().relative_to(project_path).as_posix()
+                source = path.read_text(encoding='utf-8')
+                owners = _line_units(source)
+                hashes = unit_hashes(source)
+            except (ValueError, OSError, SyntaxError):
+                continue
+
+            units = {name: {"hash": digest, "tests": set()} for name, digest in hashes.items()}
+            for line, contexts in data.contexts_by_lineno(measured).items():
+                unit = units[owners.get(line, MODULE_UNIT)]
+                unit["tests"].update(_test_id(ctx) for ctx in contexts if ctx)
+
+            for unit in units.values():
+                unit["tests"] = sorted(unit["tests"])
+            sources[relative] = {"hash": _digest(source), "units": units}
+
+        tests = {}
+        for test_dir in test_dirs:
+            for test_file in find_test_files(Path(test_dir).resolve()):
+                relative = _relative(test_file, project_path)
+                tests[relative] = _digest(test_file.read_text(encoding='utf-8'))
+
+        return cls(sources, tests)
+
+    def select(self, project_path: Path, test_dirs: List[Path]) -> Optional[Dict[str, List[str]]]:
+        """
+        Work out which tests are affected by changes since the map was built.
+
+        Args:
+            project_path: Directory pytest runs from and its ``--rootdir``
+            test_dirs: Directories containing the tests to select from
+
+        Returns:
+            ``{"tests": [...], "changed_sources": [...]}`` or None when the
+            whole suite must run (no map, module-level changes, deleted files)
+        """
+        if not self.sources:
+            return None
+
+        project_path = Path(project_path).resolve()
+        changed_sources = []
+        selected = set()
+
+        for relative, info in self.sources.items():
+            path = project_path / relative
+            if not path.exists():
+                return None
+            source = path.read_text(encoding='utf-8')
+            if _digest(source) == info["hash"]:
+                continue
+
+            try:
+                current = unit_hashes(source)
+            except SyntaxError:
+                return None
+            if current.get(MODULE_UNIT) != info["units"].get(MODULE_UNIT, {}).get("hash"):
+                return None
+
+            changed_sources.append(relative)
+            # The file's coverage is purged as a whole before the partial run,
+            # so every test mapped to any of its units must run again; otherwise
+            # the rebuilt map would lose the tests of its unchanged functions
+            for unit in info["units"].values():
+                selected.update(unit["tests"])
+
+        test_roots = []
+        changed_tests = set()
+        for test_dir in test_dirs:
+            test_root = Path(test_dir).resolve()
+            test_roots.append(test_root)
+            for test_file in find_test_files(test_root):
+                relative = _relative(test_file, project_path)
+                if self.tests.get(relative) != _digest(test_file.read_text(encoding='utf-8')):
+                    changed_tests.add(relative)
+
+        # Keep node ids that live in the requested test dirs and whose file is
+        # not already selected as a whole
+        tests = set(changed_tests)
+        for node_id in selected:
+            # Node ids are relative to pytest's rootdir, which callers pin to project_path
+            test_file = node_id.split("::", 1)[0]
+            path = (project_path / test_file).resolve()
+            in_scope = any(path.is_relative_to(root) for root in test_roots)
+            if in_scope and test_file not in changed_tests and path.exists():
+                tests.add(node_id)
+
+        return {"tests": sorted(tests), "changed_sources": changed_sources}
+
+
+def lines_by_test(project_path: Path, data_file: Path) -> Dict[str, Set[Tuple[str, int]]]:
+    """
+    Source lines executed by each test of a run recorded with test contexts.
+
+    Args:
+        project_path: Directory pytest ran from (node ids are relative to it)
+        data_file: Coverage data file (usually ``.coverage``)
+
+    Returns:
+        Dictionary mapping test node ids to (relative path, line) pairs
+    """
+    from coverage import CoverageData
+
+    project_path = Path(project_path).resolve()
+    data = CoverageData(basename=str(data_file))
+    data.read()
+    lines: Dict[str, Set[Tuple[str, int]]] = {}
+    for measured in data.measured_files():
+        relative = _relative(Path(measured).resolve(), project_path)
+        for line, contexts in data.contexts_by_lineno(measured).items():
+            for context in contexts:
+                if context:
+                    lines.setdefault(_test_id(context), set()).add((relative, line))
+    return lines
+
+
+def purge_sources(data_file: Path, project_path: Path, relative_paths: List[str]) -> None:
+    """Drop stale coverage for changed files before appending a partial run."""
+    from coverage import CoverageData
+
+    if not relative_paths or not Path(data_file).exists():
+        return
+    data = CoverageData(basename=str(data_file))
+    data.read()
+    project_path = Path(project_path).resolve()
+    data.purge_files([str(project_path / relative) for relative in relative_paths])
@@ -0,0 +1,203 @@
+"""
+Local Import Graph
+
+Builds the graph of imports between the Python modules of one source tree
+and renders compact stubs (signatures and first docstring lines) of the
+local symbols each module imports. GeniusTest attaches these stubs to the
+prompt of every file, so the context grows with a module's direct
+dependencies instead of with the size of the repository.
+"""
+
+import ast
+import copy
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def module_name(filename: str) -> str:
+    """
+    Convert a path relative to the source root into a dotted module name.
+
+    ``calculator/cli.py`` becomes ``calculator.cli`` and
+    ``calculator/__init__.py`` becomes ``calculator``.
+    """
+    parts = list(Path(filename).with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _stub_function(node: ast.AST) -> ast.AST:
+    """Copy of a function with its body reduced to the docstring summary and ``...``."""
+    stub = copy.deepcopy(node)
+    body = []
+    docstring = ast.get_docstring(node)
+    if docstring:
+        body.append(ast.Expr(ast.Constant(docstring.strip().splitlines()[0])))
+    body.append(ast.Expr(ast.Constant(...)))
+    stub.body = body
+    return stub
+
+
+def _stub_class(node: ast.ClassDef) -> ast.ClassDef:
+    """Copy of a class keeping its docstring summary, attributes and method signatures."""
+    stub = copy.deepcopy(node)
+    body = []
+    docstring = ast.get_docstring(node)
+    if docstring:
+        body.append(ast.Expr(ast.Constant(docstring.strip().splitlines()[0])))
+    for item in node.body:
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not item.name.startswith("_") or item.name == "__init__":
+                body.append(_stub_function(item))
+        elif isinstance(item, ast.AnnAssign):
+            body.append(item)
+    stub.body = body or [ast.Expr(ast.Constant(...))]
+    return stub
+
+
+def summarize_module(source: str, names: Optional[List[str]] = None) -> str:
+    """
+    Render the public API of a module as stub code.
+
+    Args:
+        source: Module source code
+        names: Only include these top-level symbols (all public ones if None)
+
+    Returns:
+        Stub source with signatures, decorators and docstring summaries
+    """
+    stubs = []
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            name = node.name
+            if (names is None and name.startswith("_")) or (names is not None and name not in names):
+                continue
+            stub = _stub_class(node) if isinstance(node, ast.ClassDef) else _stub_function(node)
+            stubs.append(ast.unparse(stub))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            target_names = [t.id for t in targets if isinstance(t, ast.Name)]
+            wanted = any(n in names for n in target_names) if names is not None \
+                else any(n.isupper() for n in target_names)
+            text = ast.unparse(node)
+            if wanted and len(text) <= 120:
+                stubs.append(text)
+    return "\n\n".join(stubs)
+
+
+class ImportGraph:
+    """Imports between the modules of a source tree, with memoized summaries."""
+
+    def __init__(self, root: str, python_files: Optional[List[Dict[str, str]]] = None):
+        """
+        Index every module under ``root``.
+
+        Args:
+            root: Source root; module names are relative to it
+            python_files: Already-read files (``filename``/``content``) to
+                avoid reading them twice; ``__init__.py`` files are read here
+        """
+        self.root = Path(root)
+        self.sources: Dict[str, str] = {}
+        for file_info in python_files or []:
+            self.sources[file_info['filename']] = file_info['content']
+        for file_path in self.root.rglob("*.py"):
+            if ".venv" in file_path.parts or "__pycache__" in file_path.parts:
+                continue
+            filename = str(file_path.relative_to(self.root))
+            if filename not in self.sources:
+                try:
+                    self.sources[filename] = file_path.read_text(encoding='utf-8')
+                except (OSError, UnicodeDecodeError):
+                    continue
+
+        self.modules = {module_name(filename): filename for filename in self.sources}
+        self._edges: Dict[str, List[Tuple[str, Optional[List[str]]]]] = {}
+        self._summaries: Dict[Tuple[str, Optional[Tuple[str, ...]]], str] = {}
+
+    def _package(self, filename: str) -> str:
+        name = module_name(filename)
+        return name if filename.endswith("__init__.py") else name.rpartition(".")[0]
+
+    def _resolve(self, module: str, name: str) -> Tuple[Optional[str], str]:
+        """Find the local file defining ``module.name``, following package re-exports."""
+        if f"{module}.{name}".lstrip(".") in self.modules:
+            return self.modules[f"{module}.{name}".lstrip(".")], None
+        filename = self.modules.get(module)
+        if filename is None:
+            return None, name
+        if filename.endswith("__init__.py"):
+            # from package import Name, where the package does from .sub import Name
+            for target, names in self.dependencies(filename):
+                if names and name in names:
+                    return target, name
+        return filename, name
+
+    def dependencies(self, filename: str) -> List[Tuple[str, Optional[List[str]]]]:
+        """
+        Direct local dependencies of a module.
+
+        Returns:
+            List of (dependency filename, imported names or None for the whole module)
+        """
+        if filename in self._edges:
+            return self._edges[filename]
+
+        self._edges[filename] = []
+        try:
+            tree = ast.parse(self.sources[filename])
+        except SyntaxError:
+            return []
+
+        found: Dict[str, Optional[set]] = {}
+
+        def add(target, name):
+            if target is None or target == filename:
+                return
+            if name is None:
+                found[target] = None
+            elif target not in found:
+                found[target] = {name}
+            elif found[target] is not None:
+                found[target].add(name)
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    add(self.modules.get(alias.name), None)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    package = self._package(filename).split(".") if self._package(filename) else []
+                    package = package[:len(package) - (node.level - 1)] if node.level > 1 else package
+                    base = ".".join(part for part in [*package, base] if part)
+                for alias in node.names:
+                    if alias.name != "*":
+                        add(*self._resolve(base, alias.name))
+
+        edges = [(target, sorted(names) if names is not None else None) for target, names in sorted(found.items())]
+        self._edges[filename] = edges
+        return edges
+
+    def summary(self, filename: str, names: Optional[List[str]] = None) -> str:
+        """Memoized stub summary of a module, optionally limited to some names."""
+        key = (filename, tuple(names) if names is not None else None)
+        if key not in self._summaries:
+            try:
+                self._summaries[key] = summarize_module(self.sources[filename], names)
+            except SyntaxError:
+                self._summaries[key] = ""
+        return self._summaries[key]
+
+    def context_for(self, filename: str) -> str:
+        """
+        Prompt context for one module: its import path and the stubs of the
+        local symbols it imports.
+        """
+        sections = [f"# Módulo sob teste: {module_name(filename)}"]
+        for target, names in self.dependencies(filename):
+            summary = self.summary(target, names)
+            if summary:
+                sections.append(f"# Dependência local: {module_name(target)} ({target})\n{summary}")
+        return "\n\n".join(sections)
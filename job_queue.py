@@ -0,0 +1,194 @@
+"""
+Local Job Queue
+
+SQLite-backed queue of per-file generation jobs shared by worker processes.
+Workers claim a job under a time-limited lease; a job whose worker dies is
+claimed again once the lease expires, and failed jobs are retried until
+``max_attempts`` is reached. The database uses SQLite's default rollback
+journal, so several machines can share it on a network filesystem with
+working file locks.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+DEFAULT_QUEUE_FILE = ".geniustest_queue.db"
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_MAX_ATTEMPTS = 3
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+"""
+
+
+class JobQueue:
+    """Persistent queue of jobs with leasing and bounded retries."""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_FILE, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly where needed
+        self._db = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        self._db.executescript(_SCHEMA)
+
+    def enqueue(self, jobs: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """
+        Add jobs, re-queueing existing ones whose content changed.
+
+        Args:
+            jobs: (key, content hash, payload) tuples
+
+        Returns:
+            Number of jobs added or re-queued
+        """
+        now = time.time()
+        changed = 0
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            for key, content_hash, payload in jobs:
+                cursor = self._db.execute(
+                    """
+                    INSERT INTO jobs (key, content_hash, payload, updated) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        content_hash = excluded.content_hash, payload = excluded.payload,
+                        status = 'pending', attempts = 0, lease_owner = NULL, lease_expires = NULL,
+                        result = NULL, error = NULL, updated = excluded.updated
+                    WHERE jobs.content_hash != excluded.content_hash OR jobs.status = 'failed'
+                    """,
+                    (key, content_hash, json.dumps(payload), now),
+                )
+                changed += cursor.rowcount
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return changed
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Lease the next available job.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+
+        Returns:
+            ``{"id", "key", "attempts", "payload"}`` or None when no job is available
+        """
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that used up their attempts will never be retried
+            self._db.execute(
+                "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired'), updated = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = self._db.execute(
+                "SELECT id, key, attempts, payload FROM jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                self._db.execute("COMMIT")
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated = ? WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row[0]),
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return {"id": row[0], "key": row[1], "attempts": row[2] + 1, "payload": json.loads(row[3])}
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend a lease; returns False if the job is no longer leased to this worker."""
+        cursor = self._db.execute(
+            "UPDATE jobs SET lease_expires = ?, updated = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (time.time() + self.lease_seconds, time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    @contextmanager
+    def keep_alive(self, job_id: int, worker_id: str) -> Iterator[None]:
+        """Renew a job's lease from a background thread while the block runs."""
+        stop = threading.Event()
+
+        def renew():
+            # SQLite connections belong to one thread, so the renewer opens its own
+            queue = JobQueue(str(self.path), self.lease_seconds, self.max_attempts)
+            try:
+                while not stop.wait(self.lease_seconds / 3):
+                    if not queue.heartbeat(job_id, worker_id):
+                        break
+            finally:
+                queue.close()
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, job_id: int, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Store a job's result; ignored if the lease was lost to another worker."""
+        cursor = self._db.execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (json.dumps(result, default=str), time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Record a failed attempt, re-queueing the job while attempts remain."""
+        cursor = self._db.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_owner = NULL, lease_expires = NULL, updated = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (self.max_attempts, error, time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for status, count in self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def results(self) -> Iterable[Tuple[str, str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield (key, status, result, error) for every job, in queue order."""
+        for key, status, result, error in self._db.execute(
+                "SELECT key, status, result, error FROM jobs ORDER BY id"):
+            yield key, status, json.loads(result) if result else None, error
+
+    def close(self) -> None:
+        self._db.close()
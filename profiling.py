@@ -0,0 +1,151 @@
+"""
+Pipeline Profiling
+
+Opt-in instrumentation shared by geniustest.py and benchmark.py. Stages are
+marked with ``span()`` or the ``profiled`` decorator; while no profiler is
+active they reduce to a shared no-op context manager, so instrumented code
+runs at full speed in normal runs.
+
+An active profiler records every span and, on exit, prints the N stages with
+the most total time and writes either a Chrome trace (``.json``, for
+chrome://tracing or https://ui.perfetto.dev) or a cProfile dump of the whole
+run (``.prof``, for ``pstats`` or snakeviz) with the top-N functions by
+cumulative time added to the summary. Spans are recorded in the current
+process only; worker processes are not traced.
+"""
+
+import cProfile
+import contextlib
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_TOP = 20
+
+_ACTIVE: Optional["Profiler"] = None
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Profiler:
+    """Records spans and exports them when stopped."""
+
+    def __init__(self, path: str, top: int = DEFAULT_TOP):
+        """
+        Configure the profiler.
+
+        Args:
+            path: Output file; a ``.prof`` or ``.pstats`` suffix selects a
+                cProfile dump, anything else a Chrome trace JSON
+            top: Number of entries in the printed summary
+        """
+        self.path = Path(path)
+        self.top = top
+        self.events: List[Dict[str, Any]] = []
+        self._cprofile = cProfile.Profile() if self.path.suffix in (".prof", ".pstats") else None
+        self._origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        """Record the duration of the block as a complete ("X") trace event."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": round((start - self._origin) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            })
+
+    def start(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> str:
+        """
+        Write the output file.
+
+        Returns:
+            Summary of the stages and, for cProfile dumps, of the functions
+            with the most cumulative time
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(str(self.path))
+        else:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f, default=str)
+        return self.summary()
+
+    def summary(self) -> str:
+        totals: Dict[str, List[float]] = {}
+        for event in self.events:
+            total = totals.setdefault(event["name"], [0, 0.0])
+            total[0] += 1
+            total[1] += event["dur"] / 1e6
+        lines = [f"{'stage':<32} {'calls':>7} {'total (s)':>10} {'mean (ms)':>10}"]
+        for name, (calls, seconds) in sorted(totals.items(), key=lambda item: -item[1][1])[:self.top]:
+            lines.append(f"{name:<32} {calls:>7} {seconds:>10.3f} {seconds / calls * 1000:>10.2f}")
+
+        if self._cprofile is not None:
+            stream = io.StringIO()
+            pstats.Stats(self._cprofile, stream=stream).sort_stats("cumulative").print_stats(self.top)
+            lines.extend(["", stream.getvalue().strip()])
+        return "\n".join(lines)
+
+
+def span(name: str, **args: Any):
+    """Context manager recording a stage on the active profiler, if any."""
+    if _ACTIVE is None:
+        return _NO_SPAN
+    return _ACTIVE.span(name, **args)
+
+
+def profiled(name: str) -> Callable:
+    """Decorator recording every call of a function as a span."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE is None:
+                return func(*args, **kwargs)
+            with _ACTIVE.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def profiling(path: Optional[str], top: int = DEFAULT_TOP) -> Iterator[Optional[Profiler]]:
+    """
+    Profile the block if ``path`` is given, printing the summary on exit.
+
+    Args:
+        path: Output file (see ``Profiler``), or None to run unprofiled
+        top: Number of entries in the printed summary
+    """
+    global _ACTIVE
+    if not path:
+        yield None
+        return
+
+    profiler = Profiler(path, top)
+    _ACTIVE = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        _ACTIVE = None
+        summary = profiler.stop()
+        print(f"\n⏱️ Profile written to {profiler.path}\n{summary}")
@@ -0,0 +1,297 @@
+"""
+Warm Pytest Runner Pool
+
+Keeps a pool of long-lived worker processes in the project's environment
+that have already imported pytest and its plugins, and runs test files in
+them on demand. Verifying a generated test file then costs one in-process
+``pytest.main`` call instead of a ``uv run pytest`` subprocess that resolves
+the environment and starts an interpreter every time.
+
+Each worker runs this file as a script and answers JSON-lines requests on
+stdin/stdout, so it only needs the standard library and pytest. Between runs
+a worker forgets the modules imported from outside the interpreter's own
+library directories (the project's sources and the tests), so edited files
+are reloaded while third-party packages stay warm. Workers are replaced
+after ``max_runs`` runs, or when a run times out, to bound leaked state.
+"""
+
+import contextlib
+import io
+import json
+import os
+import queue
+import subprocess
+import sys
+import sysconfig
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+# Interpreter that runs the workers, resolved from the project directory
+DEFAULT_COMMAND = ("uv", "run", "python")
+DEFAULT_MAX_RUNS = 100
+DEFAULT_TIMEOUT = 300
+OUTPUT_TAIL = 2000
+
+
+class _Collector:
+    """Pytest plugin recording the outcome and duration of every test."""
+
+    def __init__(self):
+        self.tests: List[Dict[str, Any]] = []
+        self.collection_errors: List[str] = []
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == "call" or report.outcome != "passed":
+            # Failed setup or teardown counts as an error of the test
+            outcome = report.outcome if report.when == "call" or report.skipped else "error"
+            self.tests.append({"nodeid": report.nodeid, "outcome": outcome,
+                               "when": report.when, "duration": round(report.duration, 6)})
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self.collection_errors.append(report.nodeid)
+
+
+def _library_dirs() -> tuple:
+    paths = sysconfig.get_paths()
+    return tuple({os.path.abspath(paths[key]) + os.sep
+                  for key in ("stdlib", "platstdlib", "purelib", "platlib")})
+
+
+def _forget_local_modules(keep: set, library_dirs: tuple) -> None:
+    """Drop modules imported during a run from outside the library directories."""
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if name not in keep and path and not os.path.abspath(path).startswith(library_dirs):
+            del sys.modules[name]
+
+
+def _run_file(pytest, test_file: str, args: Sequence[str]) -> Dict[str, Any]:
+    """Run one test file in this process and summarize the outcome."""
+    collector = _Collector()
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            exit_code = int(pytest.main(["-q", "-p", "no:cacheprovider", *args, test_file],
+                                        plugins=[collector]))
+    except Exception as e:
+        return {"error": f"pytest crashed: {e}", "success": False}
+
+    counts = {"passed": 0, "failed": 0, "skipped": 0, "error": 0}
+    for test in collector.tests:
+        counts[test["outcome"]] = counts.get(test["outcome"], 0) + 1
+    return {
+        "exit_code": exit_code,
+        "success": exit_code == 0,
+        "passed": counts["passed"],
+        "failed": counts["failed"],
+        "skipped": counts["skipped"],
+        "errors": counts["error"] + len(collector.collection_errors),
+        "tests": collector.tests,
+        "seconds": round(time.perf_counter() - start, 3),
+        "output": output.getvalue()[-OUTPUT_TAIL:],
+    }
+
+
+def _serve() -> None:
+    """Worker loop: answer one JSON request per line until stdin closes."""
+    # Replies use a private copy of stdout; fd 1 goes to /dev/null so tests
+    # writing to it directly cannot corrupt the protocol
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    import pytest
+
+    keep = set(sys.modules)
+    library_dirs = _library_dirs()
+    base_path = list(sys.path)
+    channel.write(json.dumps({"ready": True}) + "\n")
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            reply = _run_file(pytest, request["test_file"], request.get("args", []))
+        finally:
+            _forget_local_modules(keep, library_dirs)
+            sys.path[:] = base_path
+        channel.write(json.dumps(reply, default=str) + "\n")
+
+
+class _Worker:
+    """One warm worker process and the thread reading its replies."""
+
+    def __init__(self, command: Sequence[str], cwd: Path):
+        self.process = subprocess.Popen(
+            [*command, str(Path(__file__).resolve())],
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self.runs = 0
+        self.ready = False
+        self._replies: "queue.Queue[Optional[str]]" = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.process.stdout:
+            self._replies.put(line)
+        self._replies.put(None)
+
+    def _reply(self, timeout: float) -> Dict[str, Any]:
+        line = self._replies.get(timeout=timeout)
+        if line is None:
+            raise RuntimeError(f"worker exited with code {self.process.wait()}")
+        return json.loads(line)
+
+    def request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send a request; raises queue.Empty if no reply arrives in time."""
+        deadline = time.monotonic() + timeout
+        if not self.ready:
+            self._reply(timeout)
+            self.ready = True
+        self.process.stdin.write(json.dumps(payload) + "\n")
+        self.process.stdin.flush()
+        return self._reply(max(deadline - time.monotonic(), 0))
+
+    def close(self, kill: bool = False) -> None:
+        if self.process.poll() is None:
+            if kill:
+                self.process.kill()
+            else:
+                with contextlib.suppress(OSError):
+                    self.process.stdin.close()
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+        self.process.wait()
+
+
+class PytestPool:
+    """Pool of warm pytest workers for one project directory."""
+
+    def __init__(self, project_dir: str = ".", workers: Optional[int] = None,
+                 max_runs: int = DEFAULT_MAX_RUNS, timeout: float = DEFAULT_TIMEOUT,
+                 command: Optional[Sequence[str]] = None, pytest_args: Sequence[str] = ()):
+        """
+        Configure the pool; workers are started on first use.
+
+        Args:
+            project_dir: Directory the workers run from
+            workers: Maximum number of worker processes (default: CPU count)
+            max_runs: Runs after which a worker is replaced
+            timeout: Seconds allowed per run, including a new worker's startup
+            command: Python interpreter command of the project environment
+                (default: ``uv run python``)
+            pytest_args: Extra arguments for every pytest run
+        """
+        self.project_dir = Path(project_dir).resolve()
+        self.workers = max(workers or os.cpu_count() or 1, 1)
+        self.max_runs = max_runs
+        self.timeout = timeout
+        self.command = tuple(command or DEFAULT_COMMAND)
+        self.pytest_args = list(pytest_args)
+        self._idle: List[_Worker] = []
+        self._started = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __enter__(self) -> "PytestPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start every worker now instead of on demand."""
+        with self._condition:
+            missing = self.workers - self._started
+            self._started += missing
+        for _ in range(missing):
+            self._release(self._spawn())
+
+    def _spawn(self) -> Optional[_Worker]:
+        try:
+            return _Worker(self.command, self.project_dir)
+        except OSError:
+            return None
+
+    def _acquire(self) -> Optional[_Worker]:
+        with self._condition:
+            while not self._idle and self._started >= self.workers:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        return self._spawn()
+
+    def _release(self, worker: Optional[_Worker]) -> None:
+        """Return a worker to the pool, or free its slot if it was discarded."""
+        with self._condition:
+            if worker is not None and not self._closed:
+                self._idle.append(worker)
+            else:
+                self._started -= 1
+                if worker is not None:
+                    worker.close()
+            self._condition.notify()
+
+    def run(self, test_file: str) -> Dict[str, Any]:
+        """
+        Run one test file in a warm worker.
+
+        Returns:
+            Dictionary with exit code, success flag, per-outcome counts, the
+            outcome and duration of every test and the tail of pytest's
+            output; or an "error" entry if the worker failed or timed out
+        """
+        worker = self._acquire()
+        if worker is None:
+            self._release(None)
+            return {"error": f"Could not start {' '.join(self.command)}", "success": False}
+
+        payload = {"test_file": str(Path(test_file).resolve()), "args": self.pytest_args}
+        try:
+            result = worker.request(payload, self.timeout)
+        except queue.Empty:
+            worker.close(kill=True)
+            self._release(None)
+            return {"error": "Verification timed out", "success": False}
+        except (OSError, RuntimeError, ValueError) as e:
+            worker.close(kill=True)
+            self._release(None)
+            return {"error": f"Test worker failed: {e}", "success": False}
+
+        worker.runs += 1
+        if worker.runs >= self.max_runs:
+            worker.close()
+            worker = None
+        self._release(worker)
+        return result
+
+    def run_many(self, test_files: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Run test files concurrently, one per worker; returns results by file."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return dict(zip(test_files, executor.map(self.run, test_files)))
+
+    def close(self) -> None:
+        """Stop the idle workers; busy ones stop when their run is released."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+        for worker in idle:
+            worker.close()
+
+
+if __name__ == "__main__":
+    _serve()
@@ -0,0 +1,96 @@
+"""
+Model Routing
+
+Scores the complexity of a source file from its AST and picks the model
+tier that generates its tests: files of pure numeric functions get template
+tests without an LLM call, simple files go to a fast, cheap model and
+complex ones to a stronger model. Files whose tests fail verification are
+escalated to the next tier.
+"""
+
+import ast
+import os
+from typing import Optional
+
+from templates import template_units
+
+TEMPLATE, FAST, STRONG = "template", "fast", "strong"
+# Ordered from cheapest to strongest; the template tier makes no LLM call
+TIERS = (TEMPLATE, FAST, STRONG)
+
+DEFAULT_FAST_MODEL = "gemini-2.0-flash-lite"
+DEFAULT_STRONG_MODEL = "gemini-2.5-pro"
+DEFAULT_THRESHOLD = 40
+
+_BRANCHES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.Try, ast.ExceptHandler,
+             ast.With, ast.AsyncWith, ast.IfExp, ast.comprehension, ast.Assert)
+
+
+def complexity_score(source: str) -> Optional[int]:
+    """
+    Estimate how hard a module is to test.
+
+    Counts functions and classes plus every decision point (branches, loops,
+    exception handlers, boolean operators), roughly the summed cyclomatic
+    complexity of the module.
+
+    Returns:
+        The score, or None if the source does not parse
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    score = 0
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            score += 1
+        elif isinstance(node, _BRANCHES):
+            score += 1
+        elif isinstance(node, ast.BoolOp):
+            score += len(node.values) - 1
+        elif isinstance(node, ast.match_case):
+            score += 1
+    return score
+
+
+class ModelRouter:
+    """Chooses a model tier per file and escalates failed files."""
+
+    def __init__(self, fast_model: Optional[str] = None, strong_model: Optional[str] = None,
+                 threshold: Optional[int] = None):
+        """
+        Configure the tiers.
+
+        Args:
+            fast_model: Model for simple files (default: GEMINI_FAST_MODEL)
+            strong_model: Model for complex or escalated files (default: GEMINI_STRONG_MODEL)
+            threshold: Complexity score from which files start on the strong
+                tier (default: GENIUSTEST_ROUTE_THRESHOLD)
+        """
+        self.models = {
+            FAST: fast_model or os.getenv("GEMINI_FAST_MODEL", DEFAULT_FAST_MODEL),
+            STRONG: strong_model or os.getenv("GEMINI_STRONG_MODEL", DEFAULT_STRONG_MODEL),
+        }
+        if threshold is None:
+            threshold = int(os.getenv("GENIUSTEST_ROUTE_THRESHOLD", DEFAULT_THRESHOLD))
+        self.threshold = threshold
+
+    def tier_for(self, source: str) -> str:
+        """Tier a file starts on; unparseable files go straight to the strong tier."""
+        if template_units(source) is not None:
+            return TEMPLATE
+        score = complexity_score(source)
+        return FAST if score is not None and score < self.threshold else STRONG
+
+    def model_for(self, tier: str) -> str:
+        return self.models[tier]
+
+    @staticmethod
+    def escalate(tier: Optional[str]) -> Optional[str]:
+        """Next stronger tier, or None if ``tier`` is already the strongest."""
+        if tier not in TIERS:
+            return None
+        index = TIERS.index(tier) + 1
+        return TIERS[index] if index < len(TIERS) else None
@@ -0,0 +1,449 @@
+"""
+Template Test Generator
+
+Generates tests without an LLM for modules whose public API is made of pure
+numeric functions: typed ``int``/``float`` parameters, explicit ``raise``
+guards and a ``return`` of an arithmetic expression. Such functions are
+detected from the AST, run on boundary values in a namespace without
+builtins, and the observed results become ``unittest`` subTest tables or
+``pytest.mark.parametrize`` cases, with ``assertRaises``/``pytest.raises``
+for the inputs that raise.
+
+The node whitelist limits the functions to arithmetic, but arithmetic alone
+can still build huge numbers or strings (``10 ** 10 ** 8``, ``"x" * 10 ** 9``).
+Powers, products, left shifts and ``%`` therefore check the size of their
+operands first; inputs whose result would exceed ``MAX_INT_BITS`` or
+``MAX_STR_LENGTH`` are left out of the tables.
+"""
+
+import ast
+import builtins
+import copy
+import itertools
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from import_graph import module_name
+
+TEMPLATE_MARKER = "# Generated by GeniusTest (template generator)"
+
+BOUNDARY_VALUES = {
+    # Small magnitudes keep chained powers such as a ** b ** c cheap
+    "int": (0, 1, -1, 2),
+    "float": (0.0, 1.5, -2.5),
+}
+MAX_PARAMETERS = 3
+# Larger integer results are left out of the tables
+MAX_INT_RESULT = 10 ** 15
+# Intermediate values beyond these sizes are not computed
+MAX_INT_BITS = 4096
+MAX_STR_LENGTH = 10_000
+
+_NUMERIC_ANNOTATIONS = {
+    "int": "int",
+    "float": "float",
+    "Union[int, float]": "float",
+    "Union[float, int]": "float",
+    "int | float": "float",
+    "float | int": "float",
+}
+
+_SAFE_CALLS = {"abs": abs, "min": min, "max": max, "round": round}
+_EXCEPTIONS = {
+    name: getattr(builtins, name) for name in (
+        "ValueError", "TypeError", "ZeroDivisionError", "ArithmeticError",
+        "OverflowError", "NotImplementedError",
+    )
+}
+
+_ALLOWED_NODES = (
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Name, ast.Constant, ast.Call,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop, ast.expr_context,
+)
+
+
+class _TooLarge(Exception):
+    """An operation would build a value too large to evaluate cheaply."""
+
+
+def _checked_pow(base, exponent):
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1 \
+            and exponent * base.bit_length() > MAX_INT_BITS:
+        raise _TooLarge
+    return base ** exponent
+
+
+def _checked_mult(left, right):
+    for sequence, count in ((left, right), (right, left)):
+        if isinstance(sequence, str) and isinstance(count, int) and len(sequence) * count > MAX_STR_LENGTH:
+            raise _TooLarge
+    if isinstance(left, int) and isinstance(right, int) \
+            and left.bit_length() + right.bit_length() > MAX_INT_BITS:
+        raise _TooLarge
+    return left * right
+
+
+def _checked_lshift(left, right):
+    if isinstance(left, int) and isinstance(right, int) and left.bit_length() + right > MAX_INT_BITS:
+        raise _TooLarge
+    return left << right
+
+
+def _checked_mod(left, right):
+    # printf-style formatting accepts arbitrary field widths
+    if isinstance(left, str):
+        raise _TooLarge
+    return left % right
+
+
+_GUARDS = {ast.Pow: _checked_pow, ast.Mult: _checked_mult, ast.LShift: _checked_lshift, ast.Mod: _checked_mod}
+
+
+class _GuardOperators(ast.NodeTransformer):
+    """Route the operators that can build huge values through the size checks."""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        guard = _GUARDS.get(type(node.op))
+        if guard is None:
+            return node
+        call = ast.Call(func=ast.Name(id=guard.__name__, ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return ast.copy_location(call, node)
+
+
+class _Unit:
+    """One template-testable function or method."""
+
+    def __init__(self, node: ast.FunctionDef, params: List[Tuple[str, str]], owner: Optional[str] = None):
+        self.node = node
+        self.params = params
+        self.owner = owner
+
+    @property
+    def name(self) -> str:
+        return self.node.name
+
+
+def _numeric_aliases(tree: ast.Module) -> Dict[str, str]:
+    """Module-level aliases such as ``Number = Union[int, float]``."""
+    aliases = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            kind = _NUMERIC_ANNOTATIONS.get(ast.unparse(node.value))
+            if kind:
+                aliases[node.targets[0].id] = kind
+    return aliases
+
+
+def _safe_expression(node: ast.AST, names: set) -> bool:
+    """Whether an expression only does arithmetic on known names."""
+    for child in ast.walk(node):
+        if not isinstance(child, _ALLOWED_NODES):
+            return False
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load) and child.id not in names \
+                and child.id not in _SAFE_CALLS:
+            return False
+        if isinstance(child, ast.Constant) and not isinstance(child.value, (int, float, str)):
+            return False
+        if isinstance(child, ast.Call) and (not isinstance(child.func, ast.Name)
+                                            or child.func.id not in _SAFE_CALLS or child.keywords):
+            return False
+    return True
+
+
+def _safe_raise(node: ast.Raise, names: set) -> bool:
+    exc = node.exc
+    if node.cause is not None or exc is None:
+        return False
+    if isinstance(exc, ast.Name):
+        return exc.id in _EXCEPTIONS
+    return (isinstance(exc, ast.Call) and isinstance(exc.func, ast.Name) and exc.func.id in _EXCEPTIONS
+            and not exc.keywords and all(_safe_expression(arg, names) for arg in exc.args))
+
+
+def _pure_body(body: List[ast.stmt], names: set) -> bool:
+    """Guards (``if ...: raise``), local assignments and a final ``return``."""
+    names = set(names)
+    for index, stmt in enumerate(body):
+        last = index == len(body) - 1
+        if isinstance(stmt, ast.Return):
+            return last and stmt.value is not None and _safe_expression(stmt.value, names)
+        if isinstance(stmt, ast.If):
+            if stmt.orelse or len(stmt.body) != 1 or not isinstance(stmt.body[0], ast.Raise):
+                return False
+            if not _safe_expression(stmt.test, names) or not _safe_raise(stmt.body[0], names):
+                return False
+        elif isinstance(stmt, ast.Assign):
+            if len(stmt.targets) != 1 or not isinstance(stmt.targets[0], ast.Name) \
+                    or not _safe_expression(stmt.value, names):
+                return False
+            names.add(stmt.targets[0].id)
+        else:
+            return False
+    return False
+
+
+def _template_unit(node: ast.AST, aliases: Dict[str, str], owner: Optional[str] = None) -> Optional[_Unit]:
+    """Return the unit if a function can be tested from a template, else None."""
+    if not isinstance(node, ast.FunctionDef):
+        return None
+    args = node.args
+    if args.vararg or args.kwarg or args.kwonlyargs or args.posonlyargs:
+        return None
+
+    positional = list(args.args)
+    decorators = [ast.unparse(decorator) for decorator in node.decorator_list]
+    static = decorators == ["staticmethod"]
+    if decorators and not (owner is not None and static):
+        return None
+    if owner is not None and not static:
+        if not positional:
+            return None
+        # The body may not use ``self``: it is excluded from the known names
+        positional = positional[1:]
+
+    params = []
+    for arg in positional:
+        if arg.annotation is None:
+            return None
+        annotation = ast.unparse(arg.annotation)
+        kind = _NUMERIC_ANNOTATIONS.get(annotation) or aliases.get(annotation)
+        if kind is None:
+            return None
+        params.append((arg.arg, kind))
+    if not params or len(params) > MAX_PARAMETERS:
+        return None
+
+    body = node.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        body = body[1:]
+    if not _pure_body(body, {name for name, _ in params}):
+        return None
+    return _Unit(node, params, owner)
+
+
+def _template_class(node: ast.ClassDef, aliases: Dict[str, str]) -> Optional[List[_Unit]]:
+    """Units of a class whose public methods are all template-testable."""
+    if node.bases or node.keywords or node.decorator_list:
+        return None
+    units = []
+    for item in node.body:
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if item.name == "__init__":
+                # Tests build instances without arguments
+                if len(item.args.args) != 1 or item.args.vararg or item.args.kwonlyargs:
+                    return None
+                continue
+            if item.name.startswith("_"):
+                if item.name.startswith("__"):
+                    return None
+                continue
+            unit = _template_unit(item, aliases, owner=node.name)
+            if unit is None:
+                return None
+            units.append(unit)
+    return units or None
+
+
+def template_units(source: str) -> Optional[List[_Unit]]:
+    """
+    Find the units of a module if every public one can be template-tested.
+
+    Returns:
+        The units, or None when any public function or class needs the LLM
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    aliases = _numeric_aliases(tree)
+    units = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.name.startswith("_"):
+                continue
+            unit = _template_unit(node, aliases)
+            if unit is None:
+                return None
+            units.append(unit)
+        elif isinstance(node, ast.ClassDef):
+            if node.name.startswith("_"):
+                continue
+            class_units = _template_class(node, aliases)
+            if class_units is None:
+                return None
+            units.extend(class_units)
+    return units or None
+
+
+def _compile_unit(unit: _Unit):
+    """Build a callable from a whitelisted function body, with size-checked operators and no builtins."""
+    node = copy.deepcopy(unit.node)
+    node.decorator_list = []
+    node.returns = None
+    # Without ``self`` and annotations, which would need names from the module
+    node.args = ast.arguments(posonlyargs=[], args=[ast.arg(arg=name) for name, _ in unit.params],
+                              vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[])
+    node = _GuardOperators().visit(node)
+    module = ast.fix_missing_locations(ast.Module(body=[node], type_ignores=[]))
+    guards = {guard.__name__: guard for guard in _GUARDS.values()}
+    namespace = {"__builtins__": {**_SAFE_CALLS, **_EXCEPTIONS, **guards}}
+    exec(compile(module, "<template>", "exec"), namespace)
+    return namespace[unit.name]
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return f"float('{value}')"
+    return repr(value)
+
+
+def _cases(unit: _Unit) -> Tuple[List[Tuple[tuple, Any]], List[Tuple[tuple, str]]]:
+    """Run a unit on boundary values, splitting returned and raised outcomes."""
+    function = _compile_unit(unit)
+    returned, raised = [], []
+    for args in itertools.product(*(BOUNDARY_VALUES[kind] for _, kind in unit.params)):
+        try:
+            value = function(*args)
+        except _TooLarge:
+            continue
+        except Exception as e:
+            if type(e).__name__ in _EXCEPTIONS:
+                raised.append((args, type(e).__name__))
+            continue
+        if isinstance(value, float) and not math.isnan(value) \
+                or isinstance(value, int) and abs(value) <= MAX_INT_RESULT:
+            returned.append((args, value))
+    return returned, raised
+
+
+def _call(unit: _Unit, style: str) -> str:
+    if unit.owner is None:
+        return unit.name
+    return f"self.instance.{unit.name}" if style == "unittest" else f"{unit.owner}().{unit.name}"
+
+
+def _table(rows: List[Tuple[tuple, Any]], indent: str, literal=_literal) -> str:
+    lines = []
+    for args, value in rows:
+        arguments = ", ".join(_literal(arg) for arg in args) + ("," if len(args) == 1 else "")
+        lines.append(f"{indent}(({arguments}), {literal(value)}),")
+    return "\n".join(lines)
+
+
+def _unittest_class(unit: _Unit, returned, raised) -> str:
+    qualname = f"{unit.owner}.{unit.name}" if unit.owner else unit.name
+    class_name = "Test" + "".join(part[:1].upper() + part[1:] for part in qualname.replace(".", "_").split("_"))
+    call = _call(unit, "unittest")
+    lines = [f"class {class_name}(unittest.TestCase):", f'    """Boundary values for {qualname}."""', ""]
+    if unit.owner:
+        lines += ["    def setUp(self):", f"        self.instance = {unit.owner}()", ""]
+    if returned:
+        lines += [
+            f"    def test_{unit.name}_boundary_values(self):",
+            "        cases = [",
+            _table(returned, " " * 12),
+            "        ]",
+            "        for args, expected in cases:",
+            "            with self.subTest(args=args):",
+            f"                self.assertAlmostEqual({call}(*args), expected)",
+            "",
+        ]
+    if raised:
+        lines += [
+            f"    def test_{unit.name}_raises(self):",
+            "        cases = [",
+            _table(raised, " " * 12, literal=str),
+            "        ]",
+            "        for args, error in cases:",
+            "            with self.subTest(args=args):",
+            "                with self.assertRaises(error):",
+            f"                    {call}(*args)",
+            "",
+        ]
+    return "\n".join(lines).rstrip()
+
+
+def _pytest_functions(unit: _Unit, returned, raised) -> str:
+    call = _call(unit, "pytest")
+    prefix = f"{unit.owner.lower()}_" if unit.owner else ""
+    blocks = []
+    if returned:
+        blocks.append("\n".join([
+            '@pytest.mark.parametrize("args, expected", [',
+            _table(returned, " " * 4),
+            "])",
+            f"def test_{prefix}{unit.name}_boundary_values(args, expected):",
+            f"    assert {call}(*args) == pytest.approx(expected)",
+        ]))
+    if raised:
+        blocks.append("\n".join([
+            '@pytest.mark.parametrize("args, error", [',
+            _table(raised, " " * 4, literal=str),
+            "])",
+            f"def test_{prefix}{unit.name}_raises(args, error):",
+            "    with pytest.raises(error):",
+            f"        {call}(*args)",
+        ]))
+    return "\n\n\n".join(blocks)
+
+
+def generate_template_tests(source: str, filename: str, style: str = "unittest") -> Optional[str]:
+    """
+    Generate tests for a module without an LLM.
+
+    Args:
+        source: Module source code
+        filename: Path relative to the source root, used for the import
+        style: "unittest" (subTest tables) or "pytest" (parametrize)
+
+    Returns:
+        Test module source, or None if the module needs the LLM pipeline
+    """
+    units = template_units(source)
+    if units is None:
+        return None
+
+    blocks = []
+    for unit in units:
+        returned, raised = _cases(unit)
+        if not returned and not raised:
+            continue
+        if style == "pytest":
+            blocks.append(_pytest_functions(unit, returned, raised))
+        else:
+            blocks.append(_unittest_class(unit, returned, raised))
+    if not blocks:
+        return None
+
+    names = sorted({unit.owner or unit.name for unit in units})
+    header = [TEMPLATE_MARKER, "import pytest" if style == "pytest" else "import unittest", "",
+              f"from {module_name(filename)} import {', '.join(names)}"]
+    footer = [] if style == "pytest" else ["", "", "if __name__ == '__main__':", "    unittest.main()"]
+    return "\n".join(header) + "\n\n\n" + "\n\n\n".join(blocks) + "\n" + "\n".join(footer) + "\n"
+
+
+def template_result(source: str, filename: str, style: str = "unittest") -> Optional[Dict[str, Any]]:
+    """
+    Template tests shaped like a multi-agent result.
+
+    Returns:
+        Dictionary with the same keys as ``MultiAgentTestGenerator.generate_tests``,
+        or None if the module needs the LLM pipeline
+    """
+    tests = generate_template_tests(source, filename, style)
+    if tests is None:
+        return None
+    units = template_units(source)
+    analysis = "Funções puras testadas por template (sem LLM): " + ", ".join(
+        f"{unit.owner}.{unit.name}" if unit.owner else unit.name for unit in units)
+    note = "Gerado por template a partir da AST; valores esperados obtidos executando o código em valores de fronteira."
+    return {
+        "code_analysis": {"text": analysis},
+        "generated_tests": {"text": tests},
+        "pattern_evaluation": {"text": note},
+        "quality_evaluation": {"text": note},
+        "usage": {},
+    }
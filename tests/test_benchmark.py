@@ -0,0 +1,77 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmark import BenchmarkAnalyzer
+
+SOURCE = """import time
+
+
+def power(a, b):
+    return a ** b
+
+
+def wait(a):
+    time.sleep(0.3)
+    return a
+"""
+
+TESTS = """import unittest
+from pkg.m import power, wait
+
+
+class TestM(unittest.TestCase):
+    def test_power(self):
+        self.assertEqual(power(2, 3), 8)
+
+    def test_power_slowly(self):
+        # Clearly the slowest, so it is the one pruned
+        wait(wait(1))
+        self.assertEqual(power(2, 10), 1024)
+
+    def test_wait(self):
+        self.assertEqual(wait(2), 2)
+"""
+
+
+class TestPrune(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        # An ini file above the project would make its parent pytest's rootdir
+        (Path(self.tmpdir.name) / "pytest.ini").write_text("[pytest]\n")
+        self.project = Path(self.tmpdir.name) / "project"
+        (self.project / "src" / "pkg").mkdir(parents=True)
+        (self.project / "src" / "pkg" / "__init__.py").write_text("")
+        (self.project / "src" / "pkg" / "m.py").write_text(SOURCE)
+        (self.project / "tests").mkdir()
+        (self.project / "tests" / "test_m.py").write_text(TESTS)
+        (self.project / "conftest.py").write_text(
+            "import sys, pathlib\nsys.path.insert(0, str(pathlib.Path(__file__).parent / 'src'))\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_prunes_slow_test_with_redundant_coverage(self):
+        analyzer = BenchmarkAnalyzer(str(self.project), str(self.project / "tests"), prune=True,
+                                     slow_threshold=0.2, pytest_command=[sys.executable, "-m", "pytest"])
+        coverage_data = analyzer.run_coverage_analysis("src")
+
+        self.assertTrue(coverage_data["success"], coverage_data.get("stdout"))
+        self.assertEqual(coverage_data["tests_timed"], 3)
+        self.assertGreaterEqual(coverage_data["slowest_tests"][0]["duration"], 0.2)
+        self.assertEqual(coverage_data["pruning"]["pruned_tests"], ["tests/test_m.py::TestM::test_power_slowly"])
+
+        remaining = (self.project / "tests" / "test_m.py").read_text()
+        self.assertNotIn("test_power_slowly", remaining)
+        self.assertIn("def test_wait", remaining)
+        result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                                 f"--rootdir={self.project}"],
+                                cwd=self.project, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from consolidate import CONFTEST, consolidate_tests, remove_tests
+
+COUNTER_TESTS = '''import unittest
+from collections import Counter
+
+
+class Test{name}(unittest.TestCase):
+
+    def setUp(self):
+        self.counter = Counter()
+
+    def test_{name}_update(self):
+        self.counter.update("{name}{name}x")
+        self.assertEqual(self.counter["{name}"], 2)
+'''
+
+FUNCTION_TESTS = '''def test_upper_a():
+    assert "a".upper() == "A"
+
+
+def test_upper_b():
+    assert "b".upper() == "B"
+'''
+
+
+class TestConsolidate(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, content):
+        (self.root / name).write_text(content)
+
+    def run_pytest(self):
+        return subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                               f"--rootdir={self.root}", str(self.root)],
+                              capture_output=True, text=True)
+
+    def test_shared_setup_becomes_fixture(self):
+        self.write("test_a.py", COUNTER_TESTS.format(name="a"))
+        self.write("test_b.py", COUNTER_TESTS.format(name="b"))
+
+        counts = consolidate_tests(str(self.root))
+
+        self.assertEqual(counts["fixtures"], 1)
+        conftest = (self.root / CONFTEST).read_text()
+        self.assertIn("def setup_counter(request):", conftest)
+        self.assertIn("request.instance.counter = Counter()", conftest)
+        test_a = (self.root / "test_a.py").read_text()
+        self.assertIn('@pytest.mark.usefixtures("setup_counter")', test_a)
+        self.assertNotIn("def setUp", test_a)
+        result = self.run_pytest()
+        self.assertEqual(result.returncode, 0, result.stdout)
+
+    def test_rerun_reuses_existing_fixture(self):
+        for _ in range(3):
+            # Regenerated files bring their setUp back, as with --resume
+            self.write("test_a.py", COUNTER_TESTS.format(name="a"))
+            self.write("test_b.py", COUNTER_TESTS.format(name="b"))
+            consolidate_tests(str(self.root))
+
+        conftest = (self.root / CONFTEST).read_text()
+        self.assertEqual(conftest.count("@pytest.fixture"), 1)
+        self.assertNotIn("setup_counter_2", conftest)
+        test_b = (self.root / "test_b.py").read_text()
+        self.assertEqual(test_b.count("usefixtures"), 1)
+
+    def test_single_file_reuses_existing_fixture(self):
+        self.write("test_a.py", COUNTER_TESTS.format(name="a"))
+        self.write("test_b.py", COUNTER_TESTS.format(name="b"))
+        consolidate_tests(str(self.root))
+        self.write("test_c.py", COUNTER_TESTS.format(name="c"))
+
+        consolidate_tests(str(self.root))
+
+        self.assertIn('@pytest.mark.usefixtures("setup_counter")', (self.root / "test_c.py").read_text())
+        self.assertEqual((self.root / CONFTEST).read_text().count("@pytest.fixture"), 1)
+
+    def test_file_of_duplicates_is_deleted(self):
+        self.write("test_a.py", COUNTER_TESTS.format(name="a"))
+        # Same tests under another file name
+        self.write("test_copy.py", COUNTER_TESTS.format(name="a"))
+
+        counts = consolidate_tests(str(self.root))
+
+        self.assertEqual(counts["duplicates"], 1)
+        self.assertEqual(counts["deleted_files"], 1)
+        self.assertTrue((self.root / "test_a.py").exists())
+        self.assertFalse((self.root / "test_copy.py").exists())
+
+    def test_literal_variants_are_parametrized(self):
+        self.write("test_upper.py", FUNCTION_TESTS)
+
+        counts = consolidate_tests(str(self.root))
+
+        self.assertEqual((counts["parametrized"], counts["merged_tests"]), (1, 2))
+        content = (self.root / "test_upper.py").read_text()
+        self.assertIn("@pytest.mark.parametrize", content)
+        self.assertIn("import pytest", content)
+        self.assertEqual(content.count("def test_upper"), 1)
+        result = self.run_pytest()
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertIn("2 passed", result.stdout)
+
+
+class TestRemoveTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        (self.root / "tests").mkdir()
+        self.path = self.root / "tests" / "test_a.py"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_removes_method_and_function(self):
+        self.path.write_text(COUNTER_TESTS.format(name="a").replace(
+            "    def test_a_update", "    def test_a_total(self):\n        self.assertEqual(self.counter.total(), 0)\n\n"
+                                    "    def test_a_update") + "\n\n" + FUNCTION_TESTS)
+
+        removed = remove_tests(str(self.root), ["tests/test_a.py::Testa::test_a_update",
+                                                "tests/test_a.py::test_upper_b",
+                                                "tests/test_a.py::test_upper_a[1]"])
+
+        self.assertEqual(removed, 2)
+        content = self.path.read_text()
+        self.assertNotIn("test_a_update", content)
+        self.assertNotIn("test_upper_b", content)
+        self.assertIn("def test_a_total", content)
+        self.assertIn("def test_upper_a", content)
+        compile(content, str(self.path), "exec")
+
+    def test_removing_every_test_deletes_file(self):
+        self.path.write_text(COUNTER_TESTS.format(name="a"))
+
+        removed = remove_tests(str(self.root), ["tests/test_a.py::Testa::test_a_update"])
+
+        self.assertEqual(removed, 1)
+        self.assertFalse(self.path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
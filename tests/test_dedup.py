@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from dedup import find_duplicates
+from import_graph import ImportGraph
+
+MODULE = '''from .util import offset
+
+
+def shift(x):
+    return x + offset()
+'''
+
+
+class TestFindDuplicates(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def duplicates(self, files):
+        for filename, content in files.items():
+            path = self.root / filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        python_files = [{"filename": filename, "content": content} for filename, content in files.items()]
+        return find_duplicates(python_files, ImportGraph(str(self.root), python_files))
+
+    def test_copies_ignore_formatting_and_docstrings(self):
+        duplicates = self.duplicates({
+            "a.py": "def f(x):\n    return x + 1\n",
+            "b.py": '"""Copy."""\n\n\ndef f(x):  # same\n    """Add one."""\n    return (x + 1)\n',
+            "c.py": "def f(x):\n    return x + 2\n",
+        })
+        self.assertEqual(duplicates, {"b.py": "a.py"})
+
+    def test_relative_imports_of_different_modules_are_not_copies(self):
+        duplicates = self.duplicates({
+            "pkg_a/mod.py": MODULE,
+            "pkg_a/util.py": "def offset():\n    return 1\n",
+            "pkg_b/mod.py": MODULE,
+            "pkg_b/util.py": "def offset():\n    return 2\n",
+        })
+        self.assertEqual(duplicates, {})
+
+    def test_relative_imports_of_copied_modules_are_copies(self):
+        duplicates = self.duplicates({
+            "pkg_a/mod.py": MODULE,
+            "pkg_a/util.py": "def offset():\n    return 1\n",
+            "pkg_b/mod.py": MODULE,
+            "pkg_b/util.py": "def offset():\n    return 1\n",
+        })
+        self.assertEqual(duplicates, {"pkg_b/mod.py": "pkg_a/mod.py", "pkg_b/util.py": "pkg_a/util.py"})
+
+    def test_transitive_dependencies_count(self):
+        files = {
+            "pkg_a/mod.py": MODULE,
+            "pkg_a/util.py": "from .base import BASE\n\n\ndef offset():\n    return BASE\n",
+            "pkg_a/base.py": "BASE = 1\n",
+            "pkg_b/mod.py": MODULE,
+            "pkg_b/util.py": "from .base import BASE\n\n\ndef offset():\n    return BASE\n",
+            "pkg_b/base.py": "BASE = 2\n",
+        }
+        self.assertEqual(self.duplicates(files), {})
+
+    def test_import_cycles_terminate(self):
+        duplicates = self.duplicates({
+            "pkg_a/one.py": "from .two import g\n\n\ndef f():\n    return g()\n",
+            "pkg_a/two.py": "from .one import f\n\n\ndef g():\n    return 1\n",
+            "pkg_b/one.py": "from .two import g\n\n\ndef f():\n    return g()\n",
+            "pkg_b/two.py": "from .one import f\n\n\ndef g():\n    return 1\n",
+        })
+        self.assertEqual(duplicates, {"pkg_b/one.py": "pkg_a/one.py", "pkg_b/two.py": "pkg_a/two.py"})
+
+
+if __name__ == '__main__':
+    unittest.main()
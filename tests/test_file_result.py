@@ -0,0 +1,91 @@
+import copy
+import json
+import threading
+import unittest
+
+from dedup import fan_out
+from file_result import AGENT_KEYS, FileResult, TextSpill
+
+RESULT = {
+    "code_analysis": {"text": "Analisa funções: área, π", "input": "def area(r): ..."},
+    "generated_tests": {"text": "import unittest\nfrom pkg.shapes import area\n"},
+    "pattern_evaluation": {"text": ""},
+    "usage": {"total_tokens": 120},
+    "seconds": 1.5,
+}
+
+
+class TestFileResult(unittest.TestCase):
+
+    def setUp(self):
+        self.spill = TextSpill()
+
+    def tearDown(self):
+        self.spill.close()
+
+    def test_round_trip_through_spill(self):
+        result = FileResult(RESULT, self.spill)
+
+        for key in ("code_analysis", "generated_tests", "pattern_evaluation"):
+            self.assertEqual(result[key], {"text": RESULT[key]["text"]})
+        self.assertEqual(result["usage"], {"total_tokens": 120})
+        self.assertEqual(result.get("seconds"), 1.5)
+        self.assertNotIn("quality_evaluation", result)
+        self.assertEqual(set(result), set(RESULT))
+        # Only references stay in memory; the echoed inputs are dropped
+        self.assertTrue(all(isinstance(ref, tuple) for ref in result._texts.values()))
+        self.assertEqual(json.loads(json.dumps(dict(result)))["code_analysis"],
+                         {"text": "Analisa funções: área, π"})
+
+    def test_in_memory_without_spill(self):
+        result = FileResult(RESULT)
+        self.assertEqual(result["generated_tests"]["text"], RESULT["generated_tests"]["text"])
+        self.assertTrue(all(isinstance(text, str) for text in result._texts.values()))
+
+    def test_overwriting_entries(self):
+        result = FileResult(RESULT, self.spill)
+        result["generated_tests"] = {"text": "novo"}
+        result["code_analysis"] = "not a mapping"
+        del result["usage"]
+
+        self.assertEqual(result["generated_tests"], {"text": "novo"})
+        self.assertEqual(result["code_analysis"], "not a mapping")
+        self.assertNotIn("usage", result)
+        self.assertEqual(len(result), len(RESULT) - 1)
+
+    def test_copy_shares_spill_but_not_entries(self):
+        result = FileResult(RESULT, self.spill)
+        duplicate = copy.copy(result)
+        duplicate["generated_tests"] = {"text": "outro"}
+
+        self.assertEqual(result["generated_tests"]["text"], RESULT["generated_tests"]["text"])
+        self.assertIs(duplicate._spill, self.spill)
+
+    def test_fan_out_rewrites_spilled_tests(self):
+        result = FileResult(RESULT, self.spill)
+        fanned = FileResult(fan_out(result, "pkg/shapes.py", "vendor/shapes.py"), self.spill)
+
+        self.assertIn("from vendor.shapes import area", fanned["generated_tests"]["text"])
+        self.assertEqual(fanned["duplicate_of"], "pkg/shapes.py")
+        self.assertNotIn("usage", fanned)
+        self.assertIn("from pkg.shapes import area", result["generated_tests"]["text"])
+
+    def test_concurrent_writers(self):
+        results = {}
+
+        def worker(index):
+            results[index] = FileResult({key: {"text": f"{key}-{index}" * 50} for key in AGENT_KEYS}, self.spill)
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for index, result in results.items():
+            for key in AGENT_KEYS:
+                self.assertEqual(result[key]["text"], f"{key}-{index}" * 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
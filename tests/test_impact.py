@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from coverage import CoverageData
+
+from impact import ImpactMap, purge_sources
+
+SOURCE = """def f(x):
+    return x + {f}
+
+
+def g(x):
+    return x * {g}
+"""
+# Body lines of f and g in SOURCE
+F_LINE, G_LINE = 2, 6
+TESTS = {
+    "tests/test_mod.py::test_f": [F_LINE],
+    "tests/test_mod.py::test_g": [G_LINE],
+}
+
+
+class TestImpactMap(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.project = Path(self.tmpdir.name).resolve()
+        self.source = self.project / "mod.py"
+        self.test_dir = self.project / "tests"
+        self.test_dir.mkdir()
+        (self.test_dir / "test_mod.py").write_text("def test_f(): pass\n\n\ndef test_g(): pass\n")
+        self.data_file = self.project / ".coverage"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_source(self, f=1, g=2):
+        self.source.write_text(SOURCE.format(f=f, g=g))
+
+    def run_tests(self, tests):
+        """Record coverage contexts as ``pytest --cov-context=test --cov-append`` would."""
+        data = CoverageData(basename=str(self.data_file))
+        data.read()
+        for test in tests:
+            data.set_context(f"{test}|run")
+            data.add_lines({str(self.source): TESTS[test]})
+        data.write()
+        return ImpactMap.from_coverage(self.project, self.data_file, [self.test_dir])
+
+    def run_selection(self, impact_map):
+        """Apply a selection the way the benchmark and --verify do."""
+        selection = impact_map.select(self.project, [self.test_dir])
+        purge_sources(self.data_file, self.project, selection["changed_sources"])
+        return selection, self.run_tests(selection["tests"])
+
+    def test_unchanged_function_keeps_its_tests_after_partial_run(self):
+        self.write_source()
+        impact_map = self.run_tests(TESTS)
+
+        self.write_source(f=10)
+        selection, impact_map = self.run_selection(impact_map)
+        self.assertIn("tests/test_mod.py::test_f", selection["tests"])
+        self.assertEqual(impact_map.sources["mod.py"]["units"]["g"]["tests"], ["tests/test_mod.py::test_g"])
+
+        self.write_source(f=10, g=20)
+        selection, _ = self.run_selection(impact_map)
+        self.assertIn("tests/test_mod.py::test_g", selection["tests"])
+
+    def test_unchanged_file_selects_nothing(self):
+        self.write_source()
+        impact_map = self.run_tests(TESTS)
+        self.assertEqual(impact_map.select(self.project, [self.test_dir]),
+                         {"tests": [], "changed_sources": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
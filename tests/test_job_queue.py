@@ -0,0 +1,84 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from job_queue import DONE, FAILED, LEASED, PENDING, JobQueue
+
+LEASE = 0.2
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmpdir.name) / "queue.db")
+        self.queue = JobQueue(self.path, lease_seconds=LEASE, max_attempts=2)
+        self.queue.enqueue([("a.py", "h1", {"filename": "a.py"})])
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmpdir.cleanup()
+
+    def test_claim_leases_each_job_once(self):
+        job = self.queue.claim("w1")
+        self.assertEqual((job["key"], job["attempts"], job["payload"]), ("a.py", 1, {"filename": "a.py"}))
+        self.assertIsNone(self.queue.claim("w2"))
+        self.assertEqual(self.queue.counts()[LEASED], 1)
+
+    def test_expired_lease_is_claimed_again(self):
+        first = self.queue.claim("w1")
+        time.sleep(LEASE * 1.5)
+
+        second = self.queue.claim("w2")
+
+        self.assertEqual((second["id"], second["attempts"]), (first["id"], 2))
+        # The worker that lost its lease can no longer report
+        self.assertFalse(self.queue.heartbeat(first["id"], "w1"))
+        self.assertFalse(self.queue.complete(first["id"], "w1", {"ok": False}))
+        self.assertTrue(self.queue.complete(second["id"], "w2", {"ok": True}))
+        self.assertEqual(list(self.queue.results()), [("a.py", DONE, {"ok": True}, None)])
+
+    def test_expired_lease_without_attempts_left_fails(self):
+        self.queue.claim("w1")
+        time.sleep(LEASE * 1.5)
+        self.queue.claim("w2")
+        time.sleep(LEASE * 1.5)
+
+        self.assertIsNone(self.queue.claim("w3"))
+        self.assertEqual(list(self.queue.results()), [("a.py", FAILED, None, "lease expired")])
+
+    def test_failed_job_is_retried_up_to_max_attempts(self):
+        job = self.queue.claim("w1")
+        self.assertTrue(self.queue.fail(job["id"], "w1", "rate limit"))
+        self.assertEqual(self.queue.counts()[PENDING], 1)
+
+        job = self.queue.claim("w2")
+        self.assertEqual(job["attempts"], 2)
+        self.queue.fail(job["id"], "w2", "rate limit")
+
+        self.assertIsNone(self.queue.claim("w3"))
+        self.assertEqual(list(self.queue.results()), [("a.py", FAILED, None, "rate limit")])
+        # Queueing the directory again gives failed jobs a new round of attempts
+        self.assertEqual(self.queue.enqueue([("a.py", "h1", {"filename": "a.py"})]), 1)
+        self.assertEqual(self.queue.claim("w4")["attempts"], 1)
+
+    def test_enqueue_requeues_only_changed_content(self):
+        job = self.queue.claim("w1")
+        self.queue.complete(job["id"], "w1", {})
+
+        self.assertEqual(self.queue.enqueue([("a.py", "h1", {"filename": "a.py"})]), 0)
+        self.assertEqual(self.queue.counts()[DONE], 1)
+        self.assertEqual(self.queue.enqueue([("a.py", "h2", {"filename": "a.py"})]), 1)
+        self.assertEqual(self.queue.counts()[PENDING], 1)
+
+    def test_keep_alive_renews_lease(self):
+        job = self.queue.claim("w1")
+        with self.queue.keep_alive(job["id"], "w1"):
+            time.sleep(LEASE * 2)
+            self.assertIsNone(self.queue.claim("w2"))
+        self.assertTrue(self.queue.complete(job["id"], "w1", {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
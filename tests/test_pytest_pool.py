@@ -0,0 +1,80 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from pytest_pool import PytestPool
+
+TEST = "from mod import VALUE\n\n\ndef test_value():\n    assert VALUE == {expected}\n"
+
+
+class TestPytestPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.project = Path(self.tmpdir.name)
+        self.pool = None
+
+    def tearDown(self):
+        if self.pool is not None:
+            self.pool.close()
+        self.tmpdir.cleanup()
+
+    def make_pool(self, workers=1, command=(sys.executable,), **kwargs):
+        self.pool = PytestPool(str(self.project), workers=workers, command=command, **kwargs)
+        return self.pool
+
+    def write(self, name, content):
+        path = self.project / name
+        path.write_text(content)
+        return str(path)
+
+    def test_edited_sources_and_tests_are_reloaded(self):
+        self.make_pool()
+        self.write("mod.py", "VALUE = 1\n")
+        test_file = self.write("test_mod.py", TEST.format(expected=1))
+        self.assertTrue(self.pool.run(test_file)["success"])
+
+        # A different size, so a cached bytecode file cannot be mistaken for fresh
+        self.write("mod.py", "VALUE = 20\n")
+        result = self.pool.run(test_file)
+        self.assertEqual((result["passed"], result["failed"]), (0, 1))
+
+        self.write("test_mod.py", TEST.format(expected=20))
+        result = self.pool.run(test_file)
+        self.assertEqual((result["passed"], result["failed"]), (1, 0))
+        # All three runs went to the same warm worker
+        self.assertEqual([worker.runs for worker in self.pool._idle], [3])
+
+    def test_run_many_reloads_between_runs(self):
+        self.make_pool(workers=2)
+        self.write("mod.py", "VALUE = 1\n")
+        files = [self.write("test_one.py", TEST.format(expected=1)),
+                 self.write("test_two.py", TEST.format(expected=1))]
+        results = self.pool.run_many(files)
+        self.assertEqual(list(results), files)
+        self.assertTrue(all(result["success"] for result in results.values()))
+
+        self.write("mod.py", "VALUE = 300\n")
+        results = self.pool.run_many(files)
+        self.assertEqual([result["failed"] for result in results.values()], [1, 1])
+        self.assertLessEqual(len(self.pool._idle), 2)
+
+    def test_worker_replaced_after_max_runs(self):
+        self.make_pool(max_runs=1)
+        self.write("mod.py", "VALUE = 1\n")
+        test_file = self.write("test_mod.py", TEST.format(expected=1))
+
+        self.assertTrue(self.pool.run(test_file)["success"])
+        self.assertEqual(self.pool._idle, [])
+        self.assertTrue(self.pool.run(test_file)["success"])
+
+    def test_missing_interpreter_is_reported(self):
+        self.make_pool(command=("no-such-python-binary",))
+        result = self.pool.run(self.write("test_mod.py", TEST.format(expected=1)))
+        self.assertFalse(result["success"])
+        self.assertIn("Could not start", result["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
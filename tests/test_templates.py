@@ -0,0 +1,51 @@
+import unittest
+
+from templates import generate_template_tests, template_units, _cases
+
+ARITHMETIC = '''def power(a: int, b: int) -> int:
+    if b < 0:
+        raise ValueError("negative exponent")
+    return a ** b
+
+
+def scale(x: float) -> float:
+    return 10.0 ** (x * 400)
+'''
+
+
+def cases(source):
+    unit, = template_units(source)
+    return _cases(unit)
+
+
+class TestTemplateCases(unittest.TestCase):
+
+    def test_results_and_raises(self):
+        power, scale = template_units(ARITHMETIC)
+        returned, raised = _cases(power)
+        self.assertIn(((2, 2), 4), returned)
+        self.assertIn(((0, -1), "ValueError"), raised)
+        # Genuine overflows of the function are still recorded
+        _, raised = _cases(scale)
+        self.assertIn(((1.5,), "OverflowError"), raised)
+
+    def test_huge_power_is_not_evaluated(self):
+        returned, raised = cases("def f(a: int) -> int:\n    return a * 10 ** 10 ** 8\n")
+        self.assertEqual((returned, raised), ([], []))
+        returned, _ = cases("def f(a: int) -> int:\n    return (a + 3) ** 10 ** 9 - a\n")
+        self.assertEqual(returned, [])
+        returned, _ = cases("def f(a: int) -> int:\n    return 1 << 10 ** 12 if a else a\n")
+        self.assertEqual(returned, [((0,), 0)])
+
+    def test_huge_string_is_not_built(self):
+        returned, _ = cases('def f(a: int) -> int:\n    return a if "x" * 10 ** 10 else 0\n')
+        self.assertEqual(returned, [])
+        returned, _ = cases('def f(a: int) -> int:\n    return a if "%0999999999d" % a else 0\n')
+        self.assertEqual(returned, [])
+
+    def test_module_without_cases_needs_llm(self):
+        self.assertIsNone(generate_template_tests("def f(a: int) -> int:\n    return a * 10 ** 10 ** 8\n", "m.py"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import ast
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import geniustest
+from watch import changed_units, merge_tests
+
+SOURCE = '''import math
+
+RATE = 2
+
+
+def area(r):
+    return math.pi * r ** 2
+
+
+class Box:
+    def volume(self, side):
+        return side ** 3
+'''
+
+EXISTING_TESTS = '''import unittest
+from shapes import area  # used by every test
+
+
+class TestArea(unittest.TestCase):
+    def test_unit(self):
+        self.assertEqual(area(0), 0)
+
+    def test_kept(self):
+        # Hand-written, must survive the merge
+        self.assertGreater(area(1), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
+'''
+
+GENERATED_TESTS = '''import unittest
+from shapes import area, Box
+
+
+class TestArea(unittest.TestCase):
+    def test_unit(self):
+        self.assertAlmostEqual(area(1), 3.14159, places=4)
+
+    def test_negative(self):
+        self.assertEqual(area(-1), area(1))
+
+
+class TestBox(unittest.TestCase):
+    def test_volume(self):
+        self.assertEqual(Box().volume(2), 8)
+'''
+
+
+class TestChangedUnits(unittest.TestCase):
+
+    def test_unchanged_or_reformatted(self):
+        self.assertEqual(changed_units(SOURCE, SOURCE), [])
+        self.assertEqual(changed_units(SOURCE, SOURCE.replace("r ** 2", "r**2")), [])
+
+    def test_edited_and_added_functions(self):
+        edited = SOURCE.replace("side ** 3", "side * side * side")
+        self.assertEqual(changed_units(SOURCE, edited), ["Box.volume"])
+        added = edited + "\n\ndef perimeter(r):\n    return 2 * math.pi * r\n"
+        self.assertEqual(changed_units(SOURCE, added), ["Box.volume", "perimeter"])
+
+    def test_whole_file_needed(self):
+        self.assertIsNone(changed_units(SOURCE, SOURCE.replace("RATE = 2", "RATE = 3")))
+        self.assertIsNone(changed_units(SOURCE, SOURCE.replace("import math", "import cmath as math")))
+        self.assertIsNone(changed_units(SOURCE, SOURCE.split("\n\nclass Box")[0]))
+        self.assertIsNone(changed_units(SOURCE, SOURCE + "def broken(:\n"))
+
+
+class TestMergeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.merged = merge_tests(EXISTING_TESTS, GENERATED_TESTS)
+        self.tree = ast.parse(self.merged)
+
+    def test_keeps_existing_code_and_comments(self):
+        self.assertIn("from shapes import area  # used by every test", self.merged)
+        self.assertIn("# Hand-written, must survive the merge", self.merged)
+        self.assertIn("def test_kept", self.merged)
+
+    def test_adds_only_missing_imports(self):
+        self.assertIn("from shapes import Box\n", self.merged)
+        self.assertEqual(self.merged.count("import unittest"), 1)
+
+    def test_replaces_and_appends_tests(self):
+        self.assertIn("assertAlmostEqual(area(1), 3.14159", self.merged)
+        self.assertNotIn("assertEqual(area(0), 0)", self.merged)
+        test_area = next(node for node in self.tree.body if getattr(node, "name", None) == "TestArea")
+        methods = [node.name for node in test_area.body]
+        self.assertEqual(methods, ["test_unit", "test_kept", "test_negative"])
+
+    def test_new_classes_go_before_main_guard(self):
+        names = [getattr(node, "name", type(node).__name__) for node in self.tree.body]
+        self.assertEqual(names[-3:], ["TestArea", "TestBox", "If"])
+
+    def test_unparsable_existing_file_is_replaced(self):
+        self.assertEqual(merge_tests("def broken(:\n", GENERATED_TESTS), GENERATED_TESTS)
+
+
+class FlakyGenerator:
+    """Stand-in for the agents whose first call fails like an API error."""
+
+    templates = False
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_tests_for_file(self, file_info, graph):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("rate limit exceeded")
+        return {"generated_tests": {"text": "def test_area():\n    assert True\n"}}
+
+    def clean_test_content(self, text):
+        return text
+
+
+class TestWatchDirectory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source_dir = Path(self.tmpdir.name) / "src"
+        self.source_dir.mkdir()
+        self.output_dir = Path(self.tmpdir.name) / "tests"
+        (self.source_dir / "shapes.py").write_text(SOURCE)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_generation_error_does_not_stop_watching(self):
+        generator = FlakyGenerator()
+        edits = [SOURCE.replace("r ** 2", "r * r"), SOURCE.replace("r ** 2", "r * r * 1")]
+
+        def changes(watcher):
+            for edit in edits:
+                (self.source_dir / "shapes.py").write_text(edit)
+                yield {"shapes.py"}
+            raise KeyboardInterrupt
+
+        with mock.patch.object(geniustest, "get_generator", return_value=generator), \
+                mock.patch.object(geniustest.SourceWatcher, "changes", changes), \
+                mock.patch("builtins.print"):
+            geniustest.watch_directory(str(self.source_dir), str(self.output_dir), use_events=False)
+
+        self.assertEqual(generator.calls, 2)
+        self.assertIn("def test_area", (self.output_dir / "test_shapes.py").read_text())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,311 @@
+"""
+Source Watcher
+
+Detects edits to the Python files of a source tree, with filesystem events
+when the optional ``watchdog`` package is installed and by polling
+modification times otherwise, and groups bursts of saves into one batch.
+For each edited file it finds the functions whose AST changed, so only
+their tests have to be regenerated, and merges the regenerated tests into
+the existing test file.
+"""
+
+import ast
+import copy
+import queue
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from impact import MODULE_UNIT, iter_units, unit_hashes
+
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_POLL_INTERVAL = 1.0
+
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+class _StripFunctions(ast.NodeTransformer):
+    """Drop every function so only the module's other code remains."""
+
+    def visit_FunctionDef(self, node):
+        return None
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+def _outer_hash(tree: ast.Module) -> str:
+    return ast.dump(_StripFunctions().visit(copy.deepcopy(tree)))
+
+
+def changed_units(old_source: str, new_source: str) -> Optional[List[str]]:
+    """
+    Functions and methods of a module that were added or edited.
+
+    Args:
+        old_source: Previous version of the module
+        new_source: Current version
+
+    Returns:
+        Sorted qualified names (``func`` or ``Class.method``), or None when
+        the whole file must be regenerated: code outside functions changed,
+        a function was removed, or either version does not parse
+    """
+    try:
+        old_tree, new_tree = ast.parse(old_source), ast.parse(new_source)
+        old_units, new_units = unit_hashes(old_source), unit_hashes(new_source)
+    except SyntaxError:
+        return None
+    old_units.pop(MODULE_UNIT)
+    new_units.pop(MODULE_UNIT)
+    if _outer_hash(old_tree) != _outer_hash(new_tree) or set(old_units) - set(new_units):
+        return None
+    return sorted(name for name, digest in new_units.items() if old_units.get(name) != digest)
+
+
+def focus_source(source: str, names: Sequence[str]) -> str:
+    """
+    Reduce a module to what the tests of some of its functions need.
+
+    Functions outside ``names`` keep their signature and docstring but lose
+    their body, and a leading comment lists the functions to test.
+    """
+    tree = ast.parse(source)
+    wanted = set(names)
+    for name, node in iter_units(tree):
+        if name not in wanted:
+            docstring = node.body[0] if ast.get_docstring(node) is not None else None
+            node.body = [docstring] if docstring is not None else []
+            node.body.append(ast.Expr(ast.Constant(...)))
+    header = f"# Funções alteradas (gere testes apenas para elas): {', '.join(sorted(wanted))}\n"
+    return header + ast.unparse(tree) + "\n"
+
+
+def _start(node: ast.AST) -> int:
+    """First line of a definition, including its decorators."""
+    return min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", [])])
+
+
+def _segment(lines: List[str], node: ast.AST, indent: int) -> str:
+    """Source of a node re-indented from its own column to ``indent``."""
+    text = []
+    for line in lines[_start(node) - 1:node.end_lineno]:
+        if not line.strip():
+            text.append("\n")
+            continue
+        if line[:node.col_offset].strip():
+            # Indented less than the node: part of a multi-line string, kept as is
+            text.append(line)
+        else:
+            text.append(" " * indent + line[node.col_offset:])
+    return "".join(text)
+
+
+def _imported(node: ast.AST, alias: ast.alias) -> Tuple[Optional[str], int, str, Optional[str]]:
+    """Identity of one name bound by an import statement."""
+    return getattr(node, "module", None), getattr(node, "level", 0), alias.name, alias.asname
+
+
+def _is_main_guard(node: ast.AST) -> bool:
+    test = node.test if isinstance(node, ast.If) else None
+    return isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+
+
+def _merge_class(old: ast.ClassDef, new: ast.ClassDef, new_lines: List[str]) -> List[Tuple[int, int, str]]:
+    """Edits replacing the methods of ``old`` redefined in ``new`` and appending the others."""
+    methods = {node.name: node for node in old.body if isinstance(node, _FUNCTIONS)}
+    indent = old.body[0].col_offset
+    edits, appended = [], []
+    for node in new.body:
+        if not isinstance(node, _FUNCTIONS):
+            continue
+        if node.name in methods:
+            existing = methods[node.name]
+            edits.append((_start(existing) - 1, existing.end_lineno, _segment(new_lines, node, existing.col_offset)))
+        else:
+            appended.append("\n" + _segment(new_lines, node, indent))
+    if appended:
+        edits.append((old.end_lineno, old.end_lineno, "".join(appended)))
+    return edits
+
+
+def merge_tests(existing: str, generated: str) -> str:
+    """
+    Merge regenerated tests into an existing test file.
+
+    Imports missing from the existing file are added after its imports;
+    test functions and classes replace those of the same name, new ones are
+    appended before the ``__main__`` guard; methods of classes present in
+    both files are merged the same way. Everything else in the existing
+    file, comments included, is kept as it was.
+
+    Returns:
+        The merged file, or ``generated`` if the existing file does not parse
+    """
+    try:
+        old_tree, new_tree = ast.parse(existing), ast.parse(generated)
+    except SyntaxError:
+        return generated
+    if existing and not existing.endswith("\n"):
+        existing += "\n"
+    old_lines = existing.splitlines(keepends=True)
+    new_lines = generated.splitlines(keepends=True)
+    if new_lines and not new_lines[-1].endswith("\n"):
+        new_lines[-1] += "\n"
+
+    edits: List[Tuple[int, int, str]] = []
+    imports = [node for node in old_tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    known = {_imported(node, alias) for node in imports for alias in node.names}
+    missing = []
+    for node in new_tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            # Only the names not imported yet, so "from m import a, b" does not repeat a
+            names = [alias for alias in node.names if _imported(node, alias) not in known]
+            if names:
+                statement = copy.copy(node)
+                statement.names = names
+                missing.append(ast.unparse(statement) + "\n")
+    if missing:
+        at = imports[-1].end_lineno if imports else 0
+        edits.append((at, at, "".join(missing)))
+
+    definitions = {node.name: node for node in old_tree.body if isinstance(node, _DEFINITIONS)}
+    appended = []
+    for node in new_tree.body:
+        if not isinstance(node, _DEFINITIONS):
+            continue
+        old = definitions.get(node.name)
+        if old is None:
+            appended.append("\n\n" + _segment(new_lines, node, 0))
+        elif isinstance(old, ast.ClassDef) and isinstance(node, ast.ClassDef):
+            edits.extend(_merge_class(old, node, new_lines))
+        else:
+            edits.append((_start(old) - 1, old.end_lineno, _segment(new_lines, node, old.col_offset)))
+    if appended:
+        guard = next((node for node in old_tree.body if _is_main_guard(node)), None)
+        if guard is not None:
+            edits.append((guard.lineno - 1, guard.lineno - 1, "".join(appended).lstrip("\n") + "\n\n"))
+        else:
+            edits.append((len(old_lines), len(old_lines), "".join(appended)))
+
+    # Applied bottom-up so earlier line numbers stay valid
+    for start, end, text in sorted(edits, key=lambda edit: edit[0], reverse=True):
+        old_lines[start:end] = [text]
+    return "".join(old_lines)
+
+
+def _load_watchdog():
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:  # Modification times are polled instead
+        return None
+    return Observer, FileSystemEventHandler
+
+
+class SourceWatcher:
+    """Yields batches of edited Python files under a directory."""
+
+    def __init__(self, directory: str, ignore: Sequence[str] = (), debounce: float = DEFAULT_DEBOUNCE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, use_events: bool = True):
+        """
+        Configure the watcher.
+
+        Args:
+            directory: Source root; reported filenames are relative to it
+            ignore: Directories whose files are never reported (e.g. the
+                test output directory when it lies inside the source root)
+            debounce: Quiet period, in seconds, that ends a batch of saves
+            poll_interval: Seconds between scans when polling
+            use_events: Use filesystem events if ``watchdog`` is installed
+        """
+        self.directory = Path(directory).resolve()
+        self.ignore = [Path(path).resolve() for path in ignore]
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.watchdog = _load_watchdog() if use_events else None
+
+    def _relative(self, path: Path) -> Optional[str]:
+        """Filename of a watched source file, or None if it is not one."""
+        path = Path(path).resolve()
+        if path.suffix != ".py" or path.name == "__init__.py":
+            return None
+        if ".venv" in path.parts or "__pycache__" in path.parts:
+            return None
+        if any(path.is_relative_to(ignored) for ignored in self.ignore):
+            return None
+        try:
+            return str(path.relative_to(self.directory))
+        except ValueError:
+            return None
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Modification time and size of every watched file."""
+        files = {}
+        for path in self.directory.rglob("*.py"):
+            filename = self._relative(path)
+            if filename is not None:
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files[filename] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def changes(self) -> Iterator[Set[str]]:
+        """Block until files change and yield each debounced batch of existing files."""
+        if self.watchdog is not None:
+            yield from self._event_batches(*self.watchdog)
+        else:
+            yield from self._poll_batches()
+
+    def _poll_batches(self) -> Iterator[Set[str]]:
+        previous = self.snapshot()
+        while True:
+            time.sleep(self.poll_interval)
+            current = self.snapshot()
+            changed = {name for name, stat in current.items() if previous.get(name) != stat}
+            if not changed:
+                previous = current
+                continue
+            # Keep scanning until the tree has been quiet for the debounce period
+            while True:
+                time.sleep(self.debounce)
+                later = self.snapshot()
+                burst = {name for name, stat in later.items() if current.get(name) != stat}
+                current = later
+                if not burst:
+                    break
+                changed |= burst
+            previous = current
+            yield {name for name in changed if name in current}
+
+    def _event_batches(self, observer_class, handler_class) -> Iterator[Set[str]]:
+        events: "queue.Queue[str]" = queue.Queue()
+
+        class Handler(handler_class):
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    # Editors often save through a temporary file renamed over the target
+                    for path in (event.src_path, getattr(event, "dest_path", None)):
+                        if path:
+                            events.put(path)
+
+        observer = observer_class()
+        observer.schedule(Handler(), str(self.directory), recursive=True)
+        observer.start()
+        try:
+            while True:
+                paths = {events.get()}
+                while True:
+                    try:
+                        paths.add(events.get(timeout=self.debounce))
+                    except queue.Empty:
+                        break
+                changed = {name for name in map(self._relative, paths)
+                           if name is not None and (self.directory / name).is_file()}
+                if changed:
+                    yield changed
+        finally:
+            observer.stop()
+            observer.join()